@@ -0,0 +1,752 @@
+# Headless benchmark for the game in main.py.
+# Plays the whole date from a scripted input sequence on a virtual clock, with
+# no window and no waiting, so it runs as fast as the CPU allows:
+#     python3 benchmark.py [runs]
+import asyncio
+import bisect
+import hashlib
+import importlib
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ["FIRSTDATE_HEADLESS"] = "1"
+os.environ.setdefault("FIRSTDATE_SPRITE_CACHE", "")  # no sprite cache in ~/.cache unless asked for
+
+import pygame
+from PIL import Image
+
+import main as game
+
+
+def taps(start, key, count=1, gap=150, hold=30):
+    """`count` short presses of `key`, `gap` ms apart (scrolling text boxes, menu keys)."""
+    return [(start + i * gap, key, hold) for i in range(count)]
+
+
+# (time_ms, key, hold_ms) on the virtual clock, from the title screen to the last text box
+ARROWS = [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT]
+PLAYTHROUGH = (
+    # Scene 0-1: start, cycle right until Molly appears, go back to meet her, ride to the pub
+    taps(100, pygame.K_RETURN, hold=50)
+    + taps(500, pygame.K_DOWN, 3)
+    + [(1000, pygame.K_RIGHT, 2700)]
+    + taps(6300, pygame.K_DOWN, 2)
+    + [(6800, pygame.K_LEFT, 1900)]
+    + taps(8900, pygame.K_DOWN, 5)
+    + [(9800, pygame.K_RIGHT, 2400), (14000, pygame.K_RETURN, 300)]
+    # Scene 2: walk to the bar
+    + [(17709, pygame.K_RIGHT, 3000)]
+    + taps(22909, pygame.K_DOWN)
+    # Scene 3: walk to the table, play the drinking game by cycling through the arrows, leave
+    + [(24018, pygame.K_RIGHT, 1100)]
+    + taps(25618, pygame.K_DOWN)
+    + taps(25818, pygame.K_RETURN)
+    + [(26018 + i * 70, ARROWS[i % 4], 30) for i in range(39)]
+    + taps(29418, pygame.K_DOWN, 3)
+    + [(29918, pygame.K_UP, 1100), (31118, pygame.K_RIGHT, 2600)]
+    + taps(33818, pygame.K_DOWN)
+    # Scene 4: favourite birds, the picture, out of the door
+    + taps(38327, pygame.K_DOWN, 4)
+    + [(39027, pygame.K_1, 100)]
+    + taps(39233, pygame.K_DOWN, 2)
+    + taps(39633, pygame.K_DOWN, 2)
+    + taps(40033, pygame.K_DOWN, 2)
+    + taps(40433, pygame.K_DOWN)
+    + taps(40627, pygame.K_RETURN)
+    + [(41100, pygame.K_DOWN, 30)]
+    + taps(41333, pygame.K_DOWN, 3)
+    + [(41827, pygame.K_RIGHT, 1600)]
+    + taps(43533, pygame.K_DOWN, 2)
+    # Scene 5: the wobbly walk home
+    + taps(44866, pygame.K_DOWN, 2)
+    + taps(45236, pygame.K_RETURN)
+    + [(45436, pygame.K_RIGHT, 5000), (45436, pygame.K_DOWN, 1600)]
+    + taps(51442, pygame.K_DOWN)
+    # Scene 6: Maggie, Mike, Maggie again, the sofa, the kiss, the ending
+    + [(52522, pygame.K_LEFT, 1500), (52522, pygame.K_DOWN, 1000)]
+    + taps(56610, pygame.K_DOWN, 2)
+    + [(57022, pygame.K_RIGHT, 600)]
+    + taps(57577, pygame.K_DOWN, 3)
+    + [(58122, pygame.K_LEFT, 1150)]
+    + taps(59443, pygame.K_DOWN, 2)
+    + [(59822, pygame.K_RIGHT, 350), (59822, pygame.K_UP, 1100)]
+    + taps(61410, pygame.K_DOWN)
+    + taps(61622, pygame.K_RETURN)
+    + [(61672, pygame.K_SPACE, 30)]
+    + taps(61910, pygame.K_DOWN)
+    + taps(67909, pygame.K_DOWN, 4)
+)
+
+
+class CountingSurface(pygame.Surface):
+    """A stand-in for the screen that counts the blits and fills drawn on it."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.draws = 0
+
+    def blit(self, *args, **kwargs):
+        self.draws += 1
+        return super().blit(*args, **kwargs)
+
+    def fill(self, *args, **kwargs):
+        self.draws += 1
+        return super().fill(*args, **kwargs)
+
+
+class ShadowDisplay:
+    """
+    What a real display would be showing: flip() copies the whole screen into it,
+    update(rects) only those rects. After every present it should match the screen,
+    or a partial update missed something that was drawn.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.surface = screen.copy()
+        self.mismatches = 0
+
+    def flip(self):
+        self.surface.blit(self.screen, (0, 0))
+
+    def update(self, rects):
+        for rect in rects:
+            self.surface.blit(self.screen, rect, rect)
+
+    def check(self):
+        if self.surface.get_view("2").raw != self.screen.get_view("2").raw:
+            self.mismatches += 1
+
+
+def play(script=PLAYTHROUGH, seed=0, fingerprint=False, profile=False, count_draws=False, check_display=False):
+    """Fresh game state, one headless run. Returns run_headless' stats plus per-scene frames.
+
+    With `fingerprint`, every presented frame is also hashed into stats["screens"] (slow).
+    With `profile`, the game's FrameProfiler runs (without its overlay) and is left in game.profiler.
+    With `count_draws`, the game draws on a CountingSurface and stats["scene_draws"] has the
+    blits and fills per scene.
+    With `check_display`, stats["display_mismatches"] counts the frames where the display
+    would not have shown what was drawn (see ShadowDisplay).
+    """
+    if profile:
+        os.environ["FIRSTDATE_PROFILE"] = "1"
+    else:
+        os.environ.pop("FIRSTDATE_PROFILE", None)
+    importlib.reload(game)
+    game.profiler.overlay = False
+    if count_draws:
+        game.screen = CountingSurface(game.screen.get_size(), 0, game.screen)  # same pixel format
+    frames = {}
+    draws = {}
+    screens = hashlib.sha1()
+    show_frame = game.show_frame
+
+    def counted_show_frame(partial):
+        show_frame(partial)
+        frames[game.scene] = frames.get(game.scene, 0) + 1
+        if count_draws:
+            draws[game.scene] = draws.get(game.scene, 0) + game.screen.draws
+            game.screen.draws = 0
+        if fingerprint:
+            screens.update(game.screen.get_view("2").raw)
+
+    game.show_frame = counted_show_frame
+    shadow = ShadowDisplay(game.screen)
+    if check_display:
+        flip, update = pygame.display.flip, pygame.display.update
+        pygame.display.flip, pygame.display.update = shadow.flip, shadow.update
+        game.show_frame = lambda partial: (counted_show_frame(partial), shadow.check())
+    try:
+        stats = game.run_headless(script, seed=seed)
+    finally:
+        if check_display:
+            pygame.display.flip, pygame.display.update = flip, update
+    stats["display_mismatches"] = shadow.mismatches
+    stats["scene_frames"] = frames
+    stats["frame_scheduler"] = game.frame_scheduler
+    stats["scene_draws"] = draws
+    stats["text_cache"] = game.text_cache
+    stats["screens"] = screens.hexdigest()
+    return stats
+
+
+def bench_playthrough(runs):
+    """Frames per second for a full scripted playthrough, and whether two runs are identical."""
+    results = [play() for _ in range(runs)]
+    first = results[0]
+    print(f"finished {first['finished']}   scene {first['scene']}   {first['frames']} frames   "
+          f"{first['virtual_seconds']:.1f} s of game time")
+    for scene, count in sorted(first["scene_frames"].items()):
+        print(f"  scene {scene}   {count:5d} frames")
+    walls = [r["wall_seconds"] for r in results]
+    print(f"wall time {1000 * min(walls):7.1f} ms best {1000 * sum(walls) / len(walls):7.1f} ms avg   "
+          f"{first['frames'] / min(walls):7.0f} frames/s   "
+          f"{first['virtual_seconds'] / min(walls):5.1f}x real time")
+    text = first["text_cache"]
+    print(f"text cache {text.hits} hits {text.misses} misses ({100 * text.hits / max(text.hits + text.misses, 1):.1f}% hit rate)   "
+          f"{len(text.surfaces)} surfaces {text.bytes / 1024:.0f} KiB   {text.evictions} evictions")
+    presents = first["frame_scheduler"]
+    print(f"present() calls {presents.requests}   frames presented {presents.presents}   "
+          f"redundant {presents.redundant} ({100 * presents.redundant / max(presents.requests, 1):.1f}%, each used to be a flip)")
+    same = all(r["frames"] == first["frames"] for r in results)
+    same = same and play(fingerprint=True)["screens"] == play(fingerprint=True)["screens"]
+    print(f"deterministic (frame counts across {runs} runs, every frame of 2 runs): {same}")
+
+
+def bench_profile():
+    """Where the frame time goes in each scene, from the in-game FrameProfiler."""
+    play(profile=True)
+    frames = game.profiler.frames
+    names = sorted({name for record in frames for name in record} - {"frame", "scene", "frame_ms"})
+    print("scene  frames  frame_ms  " + "  ".join(f"{name:>14}" for name in names))
+    for scene in sorted({record["scene"] for record in frames}):
+        averages = game.profiler.averages([record for record in frames if record["scene"] == scene])
+        print(f"{scene:5d}  {sum(record['scene'] == scene for record in frames):6d}  {averages['frame_ms']:8.3f}  "
+              + "  ".join(f"{averages.get(name, 0.0):14.3f}" for name in names))
+
+
+def bench_text(repeats=2000):
+    """The strings of one drinking-game frame, rendered with font.render() vs. through the text cache."""
+    importlib.reload(game)  # a finished playthrough has shut pygame down
+    strings = [(game.font_small, "Sobriety"), (game.font_small, "Press: up"), (game.font, "\u25BC")]
+    timings = {}
+    for name, render in (("font.render", lambda font, text: font.render(text, True, game.WHITE)),
+                         ("render_text", lambda font, text: game.render_text(font, text, True, game.WHITE))):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for font, text in strings:
+                render(font, text)
+        timings[name] = (time.perf_counter() - start) / repeats * 1e6
+    print(f"text per frame  font.render {timings['font.render']:7.1f} us   render_text {timings['render_text']:6.1f} us   "
+          f"{timings['font.render'] / timings['render_text']:5.1f}x")
+
+
+def bench_gif():
+    """LHA.gif: cold decode into the GifCache, its memory, and what entering scene_2 costs once prefetched."""
+    importlib.reload(game)
+    cache = game.gif_cache
+    start = time.perf_counter()
+    frames, durations = cache.get(game.gif_path)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    cache.get(game.gif_path)
+    warm = time.perf_counter() - start
+    print(f"gif decode      {len(frames)} frames {frames[0].get_width()}x{frames[0].get_height()}   "
+          f"cold {1000 * cold:6.1f} ms   cached {1e6 * warm:5.1f} us   {cache.memory_bytes() / 2**20:5.1f} MiB")
+
+
+def synthetic_gif(frames, size=(16, 16), seed=0):
+    """A GIF of `frames` distinct flat-colour frames lasting 20-120 ms each; returns its path."""
+    rng = random.Random(seed)
+    path = os.path.join(tempfile.mkdtemp(), "synthetic.gif")
+    images = [Image.new("RGB", size, (i % 256, 40 * (i // 256), 255 - i % 256)) for i in range(frames)]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=[rng.randint(20, 120) for _ in images])
+    return path
+
+
+def bench_gif_schedule(frames=500, seed=0):
+    """Frame lookup on a synthetic 500-frame GIF: the old running sum vs. bisecting cumulative end times."""
+    importlib.reload(game)
+    path = synthetic_gif(frames, seed=seed)
+    _, durations = game.gif_cache.get(path)
+    frame_ends = list(itertools.accumulate(durations))
+
+    def running_sum(times):
+        """The old loop: an O(n) sum every iteration, advancing at most one frame."""
+        current = 0
+        for elapsed in times:
+            if elapsed > sum(durations[: current + 1]):
+                current = (current + 1) % len(durations)
+        return current
+
+    def bisected(times):
+        current = 0
+        for elapsed in times:
+            current = game.gif_frame_at(frame_ends, elapsed)
+        return current
+
+    # Cost: a lookup every 5 ms of animation, so the old loop keeps up and only the sum differs
+    dense = list(range(0, frame_ends[-1], 5))
+    timings = {}
+    for name, schedule in (("sum", running_sum), ("bisect", bisected)):
+        start = time.perf_counter()
+        schedule(dense)
+        timings[name] = (time.perf_counter() - start) / len(dense) * 1e6
+    print(f"gif schedule    {len(durations)} frames   sum {timings['sum']:6.2f} us/lookup   "
+          f"bisect {timings['bisect']:5.2f} us/lookup   {timings['sum'] / timings['bisect']:5.1f}x")
+
+    # Drift: a loop that only gets round every 150 ms, slower than most frames last
+    slow = list(range(0, frame_ends[-1] - 1, 150))
+    print(f"                at {slow[-1] / 1000:.1f} s with a 150 ms loop: the running sum shows frame {running_sum(slow)}, "
+          f"bisect shows frame {bisected(slow)}, the right one is {bisect.bisect_right(frame_ends, slow[-1])}")
+
+
+def bench_gif_stream(frames=300, size=(296, 300)):
+    """A long synthetic GIF: full preload vs. streaming, time to first frame and memory held."""
+    importlib.reload(game)
+    path = synthetic_gif(frames, size)
+    start = time.perf_counter()
+    preloaded, durations = game.gif_cache.get(path)
+    preload_first = time.perf_counter() - start
+    frame_bytes = preloaded[0].get_bytesize() * size[0] * size[1]
+    print(f"gif preload     {frames} frames {size[0]}x{size[1]}   first frame {1000 * preload_first:6.1f} ms   "
+          f"{game.gif_cache.memory_bytes() / 2**20:5.1f} MiB held")
+    total = sum(durations)
+    for threaded in (False, True):
+        stream = game.GifStream(path, threaded=threaded)
+        start = time.perf_counter()
+        stream.frame_at(0)
+        first = time.perf_counter() - start
+        # Play one loop at 60 fps, counting the frames held: the queue, the one on show, the one being decoded
+        held = 0
+        for elapsed in range(0, total, 1000 // 60):
+            stream.frame_at(elapsed)
+            held = max(held, (stream.queue.qsize() + 2) if threaded else 1)
+            if threaded:
+                time.sleep(0.001)  # let the worker run, as the game's frame pacing would
+        stream.close()
+        print(f"gif stream      {'worker thread' if threaded else 'on demand    '}   first frame {1000 * first:6.1f} ms   "
+              f"at most {held} frames {held * frame_bytes / 2**20:5.2f} MiB held   {stream.decoded} decoded")
+
+
+STARTUP = """
+import os, sys, time
+start = time.perf_counter()
+os.environ["FIRSTDATE_HEADLESS"] = "1"
+import main as game
+if sys.argv[1] == "eager":  # what importing main used to do: every sprite loaded before the window
+    for name in game.SPRITE_MANIFEST:
+        game.sprites.get(name[0])
+show_frame = game.show_frame
+first = []
+
+def timed_show_frame(partial):
+    show_frame(partial)
+    if not first:
+        first.append(time.perf_counter())
+    elif len(first) == 1:
+        # The sprites scene 1 needs, bound on the next frame as if ENTER were pressed straight away
+        game.bind_sprites()
+        first[0] -= start
+        first.append(time.perf_counter() - start - first[0])
+
+game.show_frame = timed_show_frame
+game.run_headless([], linger=100)
+print(*first)
+"""
+
+
+def startup(mode, runs=5, sprite_cache=""):
+    """Best (first frame, first frame to sprites bound) seconds over `runs` fresh interpreters."""
+    env = dict(os.environ, FIRSTDATE_SPRITE_CACHE=sprite_cache)
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", STARTUP, mode], capture_output=True, text=True, env=env,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+        results.append([float(value) for value in out.split()[-2:]])
+    return min(result[0] for result in results), min(result[1] for result in results)
+
+
+def bench_startup():
+    """Cold start to the title screen's first frame, each in a fresh interpreter: sprites loaded eagerly vs. prefetched after it."""
+    for mode in ("eager", "lazy"):
+        first_frame, bind = startup(mode, runs=10)
+        print(f"startup {mode:5}   first frame {1000 * first_frame:6.1f} ms   sprites ready for scene 1 after {1000 * bind:5.1f} ms more")
+
+
+def bench_sprite_cache(repeats=5):
+    """Loading every manifest sprite from the PNGs vs. from the on-disk cache of scaled sprites."""
+    importlib.reload(game)
+    cache_dir = tempfile.mkdtemp()
+    timings = {}
+    for name, directory in (("no cache", None), ("cold cache", cache_dir), ("warm cache", cache_dir)):
+        best = None
+        for _ in range(1 if name == "cold cache" else repeats):
+            manager = game.SpriteManager(game.SPRITE_MANIFEST, cache_dir=directory, scale=game.SPRITE_SCALER)
+            start = time.perf_counter()
+            for sprite in manager.manifest:
+                manager.get(sprite)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    print("sprite load     " + "   ".join(f"{name} {1000 * seconds:5.1f} ms" for name, seconds in timings.items())
+          + f"   {timings['no cache'] / timings['warm cache']:4.1f}x")
+    # The whole start, with every sprite loaded before the first frame as main.py used to
+    cold = min(startup("eager", runs=1, sprite_cache=tempfile.mkdtemp())[0] for _ in range(10))
+    warm = startup("eager", runs=10, sprite_cache=cache_dir)[0]
+    print(f"startup eager   first frame, cold sprite cache {1000 * cold:6.1f} ms   warm {1000 * warm:6.1f} ms")
+
+
+def bench_atlas(repeats=10):
+    """Loading every manifest sprite from twelve PNGs vs. from the one atlas built by build_atlas.py."""
+    importlib.reload(game)
+    if not game.sprites.atlas_rects:
+        print("sprite atlas    not built, run build_atlas.py")
+        return
+    sources = {
+        "pngs": [os.path.join(game.BASE_PATH, path) for path, _ in game.sprites.manifest.values()],
+        "atlas": [game.sprites.atlas_path, game.SPRITE_ATLAS_INDEX],
+    }
+    timings = {}
+    for name in sources:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            manager = game.SpriteManager(game.SPRITE_MANIFEST)
+            if name == "atlas":
+                manager.use_atlas(game.SPRITE_ATLAS_INDEX)
+            for sprite in manager.manifest:
+                manager.get(sprite)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    print("sprite atlas    " + "   ".join(
+        f"{name} {len(files)} files {sum(os.path.getsize(path) for path in files) / 1024:4.0f} KiB {1000 * timings[name]:5.1f} ms"
+        for name, files in sources.items()) + f"   {timings['pngs'] / timings['atlas']:4.1f}x")
+
+
+def bench_variants(repeats=200):
+    """The heart minigame's 80x80 heart: loaded and scaled from heart.png on every call vs. SpriteManager.get_variant()."""
+    importlib.reload(game)
+    path = os.path.join(game.BASE_PATH, "assets/sprites/heart.png")
+    start = time.perf_counter()
+    for _ in range(repeats):
+        pygame.transform.scale(pygame.image.load(path), (80, 80))
+    reload_us = (time.perf_counter() - start) / repeats * 1e6
+    sprites = game.sprites
+    start = time.perf_counter()
+    for _ in range(repeats):
+        sprites.get_variant("heart", size=(80, 80))
+    variant_us = (time.perf_counter() - start) / repeats * 1e6
+    # A few more variants, to show the counters and the byte budget at work
+    for angle in range(0, 360, 15):
+        sprites.get_variant("bike", flip=(True, False), rotation=angle)
+    print(f"sprite variant  load+scale {reload_us:7.1f} us   get_variant {variant_us:5.2f} us   {reload_us / variant_us:6.0f}x   "
+          f"{sprites.variant_hits} hits {sprites.variant_misses} misses {len(sprites.variants)} variants "
+          f"{sprites.variant_bytes / 1024:.0f} KiB {sprites.variant_evictions} evictions")
+
+
+def bench_backgrounds():
+    """Blits and fills per frame in each scene, with the props drawn every frame vs. cached in background layers."""
+    results = {}
+    for setting in ("0", "1"):
+        os.environ["FIRSTDATE_BACKGROUND_CACHE"] = setting
+        results[setting] = play(count_draws=True)
+    del os.environ["FIRSTDATE_BACKGROUND_CACHE"]
+    print("scene  draws/frame uncached  cached")
+    for scene in sorted(results["1"]["scene_frames"]):
+        before, after = (results[setting]["scene_draws"][scene] / results[setting]["scene_frames"][scene] for setting in ("0", "1"))
+        print(f"{scene:5d}  {before:20.2f}  {after:6.2f}")
+    print(f"layers composed {game.backgrounds.builds}")
+
+
+def bench_dirty_rects():
+    """Pixels pushed to the display per frame: a full flip every frame vs. dirty rects, and whether the display stayed right."""
+    results = {}
+    for setting in ("0", "1"):
+        os.environ["FIRSTDATE_DIRTY_RECTS"] = setting
+        stats = play(check_display=True)
+        results[setting] = (game.dirty, stats)
+    del os.environ["FIRSTDATE_DIRTY_RECTS"]
+    for setting, name in (("0", "full flips"), ("1", "dirty rects")):
+        dirty, stats = results[setting]
+        frames = dirty.partial_frames + dirty.full_frames
+        full_pixels = dirty.full_frames * game.WIDTH * game.HEIGHT
+        partial = (dirty.pixels - full_pixels) / max(dirty.partial_frames, 1)
+        print(f"{name:<12}  {dirty.pixels / frames / 1000:6.1f} kpixels/frame ({partial / 1000:5.1f} in a partial frame)   "
+              f"{dirty.partial_frames:4d} partial {dirty.full_frames:4d} full frames   {stats['display_mismatches']} frames shown wrong")
+
+
+def old_scene_transition():
+    """The scene transition before the Transitions engine: a fresh overlay per step, darkened cumulatively."""
+    allocations = 0
+    for pause in (0.033, 0.03):
+        for alpha in range(0, 256, 10):
+            overlay = pygame.Surface((game.WIDTH, game.HEIGHT))
+            allocations += 1
+            overlay.set_alpha(alpha)
+            overlay.fill(game.BLACK)
+            game.screen.blit(overlay, (0, 0))
+            game.present()
+            asyncio.run(game.clock.sleep(pause))
+        if pause == 0.033:
+            game.screen.fill(game.BLACK)
+            game.present()
+            asyncio.run(game.clock.sleep(0.033))
+    return allocations
+
+
+def new_scene_transition(kind, incoming):
+    """One Transitions.run of `kind`; returns the surfaces it allocated."""
+    allocations = game.transitions.allocations
+    asyncio.run(game.transitions.run(kind, incoming=incoming))
+    return game.transitions.allocations - allocations
+
+
+def bench_transitions(repeats=5):
+    """One scene transition, old vs. each Transitions kind: game time, frames, wall time and surfaces allocated."""
+    importlib.reload(game)
+    incoming = pygame.Surface(game.screen.get_size()).convert()
+    incoming.fill((255, 192, 203))
+    kinds = [("old fade", old_scene_transition)] + [
+        (kind, lambda kind=kind: new_scene_transition(kind, incoming)) for kind in ("fade", "wipe", "crossfade")]
+    for name, run in kinds:
+        ticks, frames = game.clock.ticks, game.clock.frames
+        start = time.perf_counter()
+        allocations = sum(run() for _ in range(repeats))
+        wall = (time.perf_counter() - start) / repeats
+        print(f"transition {name:<10} {(game.clock.ticks - ticks) / repeats:6.0f} ms of game time  "
+              f"{(game.clock.frames - frames) / repeats:4.0f} frames  {1000 * wall:6.2f} ms wall  "
+              f"{allocations:3d} surfaces allocated over {repeats}")
+
+
+def fireworks_finale(fireworks, frames, seed=0):
+    """game_completed's fireworks loop without the clock: returns (particle updates, seconds in draw_fireworks)."""
+    colors = [(128, 0, 128), (0, 255, 0), (0, 0, 255), (255, 255, 255)]
+    rng = random.Random(seed)
+    particles = 0
+    seconds = 0.0
+
+    async def finale():
+        nonlocal particles, seconds
+        for _ in range(frames):
+            game.screen.fill(game.BLACK)
+            if rng.random() < 0.35:
+                fireworks.append({
+                    "position": [rng.randint(100, game.WIDTH - 100), game.HEIGHT],
+                    "speed": rng.uniform(10, 15),
+                    "explosion_height": rng.randint(100, game.HEIGHT // 2),
+                    "color": rng.choice(colors),
+                    "state": "ascending",
+                    "particles": [],
+                })
+            if isinstance(fireworks, list):
+                particles += sum(len(firework["particles"]) for firework in fireworks if firework["state"] == "exploding")
+            start = time.perf_counter()
+            await game.draw_fireworks(fireworks)
+            seconds += time.perf_counter() - start
+
+    asyncio.run(finale())
+    if not isinstance(fireworks, list):
+        particles = fireworks.particle_frames
+    return particles, seconds
+
+
+def bench_fireworks(frames=300):
+    """The finale's fireworks: particles updated and drawn per second, dicts vs. the NumPy Fireworks, at 1x and 10x bursts."""
+    importlib.reload(game)
+    colors = [(128, 0, 128), (0, 255, 0), (0, 0, 255), (255, 255, 255)]
+    for name, fireworks in (("dicts 60/burst", []),
+                            ("numpy 60/burst", game.Fireworks(colors)),
+                            ("numpy 600/burst", game.Fireworks(colors, burst=600))):
+        particles, seconds = fireworks_finale(fireworks, frames)
+        print(f"fireworks {name:<16} {particles / frames:7.0f} particles/frame  {1000 * seconds / frames:6.2f} ms/frame  "
+              f"{particles / seconds / 1e6:5.2f} M particles/s")
+
+
+def list_bubbles(beers, orange, bubbles):
+    """draw_beers' bubbles before Bubbles: a list of [x, y, dx] lists per beer, rebuilt every frame."""
+    for i, beer in enumerate(beers):
+        if orange[i] is None:
+            bubbles[i] = []
+            continue
+        orange_top, orange_height = orange[i]
+        if random.random() < 0.2:
+            x = random.randint(beer.x + 3, beer.x + beer.width - 3)
+            y = random.randint(orange_top, orange_top + orange_height - 3)
+            dx = random.choice([-1, 0, 1])
+            bubbles[i].append([x, y, dx])
+        for bubble in bubbles[i]:
+            bubble[0] += bubble[2]
+            bubble[1] -= 1
+            if bubble[0] < beer.x + 3 or bubble[0] > beer.x + beer.width - 3:
+                bubble[0] = max(beer.x + 3, min(bubble[0], beer.x + beer.width - 3))
+        bubbles[i] = [bubble for bubble in bubbles[i] if bubble[1] > orange_top]
+        for x, y, _ in bubbles[i]:
+            pygame.draw.circle(game.screen, game.WHITE, (x, y), 2)
+
+
+def pooled_bubbles(beers, orange, bubbles):
+    """The same frame with draw_beers' Bubbles calls."""
+    for i, beer in enumerate(beers):
+        if orange[i] is None:
+            bubbles.clear(i)
+        else:
+            orange_top, orange_height = orange[i]
+            bubbles.spawn(i, beer.x + 3, beer.x + beer.width - 3, orange_top, orange_top + orange_height - 3)
+    bubbles.step(game.screen)
+
+
+def bubble_frames(draw, bubbles, frames, seed=0, trace=False):
+    """Five beers' bubbles for `frames` frames, the beers sipped down as it goes.
+
+    Returns the seconds spent in `draw` and a hash of every frame, or with `trace`
+    the bytes allocated and freed again within a frame, per frame.
+    """
+    random.seed(seed)
+    beers = [pygame.Rect(300 + i * 30, 250, 20, 50) for i in range(5)]
+    fills = [(250, 50), (250 + 50 // 3, 50 * 2 // 3), (250 + 50 * 2 // 3, 50 // 3), None]  # draw_beers' four states
+    screens = hashlib.sha1()
+    seconds = 0.0
+    transient = 0
+    if trace:
+        tracemalloc.start()
+    for frame in range(frames):
+        # Full beers for the first half, then drunk one after another
+        orange = [fills[min(max(0, (frame - frames // 2) * 20 // frames - 2 * i), 3)] for i in range(5)]
+        game.screen.fill(game.BLACK)
+        if trace:
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            draw(beers, orange, bubbles)
+            transient += tracemalloc.get_traced_memory()[1] - current
+            continue
+        start = time.perf_counter()
+        draw(beers, orange, bubbles)
+        seconds += time.perf_counter() - start
+        screens.update(game.screen.get_view("2").raw)
+    if trace:
+        tracemalloc.stop()
+        return transient / frames
+    return seconds, screens.hexdigest()
+
+
+def bench_bubbles(frames=2000):
+    """Beer bubbles as lists of lists vs. the pooled Bubbles: time and transient memory per frame, and the same pixels."""
+    importlib.reload(game)
+    pools = {"lists": (list_bubbles, lambda: [[] for _ in range(5)]), "pool": (pooled_bubbles, lambda: game.Bubbles(5))}
+    screens = {}
+    for name, (draw, pool) in pools.items():
+        seconds, screens[name] = bubble_frames(draw, pool(), frames)
+        transient = bubble_frames(draw, pool(), frames, trace=True)
+        print(f"bubbles {name:<6} {1e6 * seconds / frames:6.1f} us/frame   {transient:6.0f} bytes allocated and freed per frame")
+    print(f"bubbles identical frames: {screens['lists'] == screens['pool']}")
+
+
+def minigame_frames(frames, seed=0):
+    """minigame_scene_3's frame body, drawing its beers as they are drunk: seconds per frame."""
+    random.seed(seed)
+    table = game.sprites.get("table")
+    table_rect = table.get_rect(center=(game.WIDTH // 2, game.HEIGHT // 2))
+    beers = [pygame.Rect(table_rect.x + 40 + i * 30, table_rect.y - 22, 20, 50) for i in range(5)]
+    bubbles = game.Bubbles(5)
+    start = time.perf_counter()
+    for frame in range(frames):
+        sips = frame * 20 // frames
+        beer_states = [min(max(sips - 3 * i, 0), 3) for i in range(5)]
+        game.screen.fill(game.BLACK)
+        game.screen.blit(table, (table_rect.x, table_rect.y))
+        game.draw_beers(beers, beer_states, bubbles)
+        pygame.draw.rect(game.screen, (0, 255, 0), (50, 20, (100 - 7 * sips) * 3, 20))
+        game.screen.blit(game.render_text(game.font_small, "Sobriety", True, game.WHITE), (50, 50))
+        prompt_text = game.render_text(game.font_small, "Press: up", True, game.WHITE)
+        game.screen.blit(prompt_text, (game.WIDTH // 2 - prompt_text.get_width() // 2, game.HEIGHT // 2 + 50))
+    return (time.perf_counter() - start) / frames
+
+
+def bench_beer_glasses(frames=3000, repeats=3):
+    """minigame_scene_3 frames with the glasses drawn rect by rect vs. blitted from BeerGlasses."""
+    importlib.reload(game)
+    glasses = game.beer_glasses
+    glass = {}
+    frame = {}
+    for enabled in (False, True):
+        glasses.enabled = enabled
+        frame[enabled] = min(minigame_frames(frames) for _ in range(repeats))
+        beers = [pygame.Rect(300 + i * 30, 250, 20, 50) for i in range(4)]
+        start = time.perf_counter()
+        for _ in range(frames):
+            for state, beer in enumerate(beers):
+                glasses.draw(beer, state)
+        glass[enabled] = (time.perf_counter() - start) / (4 * frames)
+    for enabled, name in ((False, "rects"), (True, "cached")):
+        print(f"beer glasses {name:<7} {1e6 * glass[enabled]:5.2f} us/glass   minigame frame {1e6 * frame[enabled]:6.1f} us")
+    print(f"beer glasses rendered {glasses.renders}   {frame[False] / frame[True]:.2f}x per minigame frame")
+
+
+def bench_scene_3_memory(frames=600):
+    """
+    Memory allocated and freed again within a scene_3 frame (Sam standing still, the beers
+    bubbling), from tracemalloc: the frame as it was, rebuilding the geometry and the bubbles
+    every time, vs. scene_3 with its state kept in a BarScene.
+    """
+    importlib.reload(game)
+    game.bind_sprites()
+    random.seed(0)
+    keys = game.ScriptedKeys(frozenset())
+    rebuilt_bubbles = game.Bubbles(5)
+
+    async def rebuilt_frame():
+        """scene_3's frame before BarScene: rects, zones and the compose closure made again, the bubbles cleared."""
+        table_rect = game.table.get_rect(center=(game.WIDTH // 2, game.HEIGHT // 2))
+        door_rect = game.door.get_rect(midtop=(game.WIDTH - 75, 50))
+        beers = [pygame.Rect(table_rect.x + 40 + i * 30, table_rect.y - 22, 20, 50) for i in range(5)]
+        rebuilt_bubbles.clear()
+
+        def compose(layer):
+            layer.fill(game.BLACK)
+            layer.blit(game.table, (table_rect.x, table_rect.y))
+            layer.blit(game.door, (door_rect.x, door_rect.y))
+
+        game.backgrounds.draw("scene_3", compose)
+        game.draw_beers(beers, game.beer_states, rebuilt_bubbles)
+        game.draw_sprite(game.sam, (game.sam_pos.x, game.sam_pos.y))
+        game.draw_sprite(game.molly, (game.molly_pos.x, game.molly_pos.y))
+        game.move_sam(keys, game.sam_pos)
+        game.follow_sam(game.sam_pos, game.molly_pos)
+        game.molly_pos.distance_to(game.sam_pos) < 50
+        sam_rect = pygame.Rect(game.sam_pos.x, game.sam_pos.y, game.SPRITE_WIDTH, game.SPRITE_HEIGHT)
+        sam_rect.colliderect(table_rect.inflate(1, 1))
+        sam_rect.colliderect(door_rect.inflate(1, 1))
+
+    async def measure(frame):
+        """Peak allocation above the frame's start, averaged over `frames` frames."""
+        transient = 0
+        tracemalloc.start()
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await frame()
+            transient += tracemalloc.get_traced_memory()[1] - before
+            game.present(partial=True)
+            game.frame_scheduler.flush()
+        tracemalloc.stop()
+        return transient / frames
+
+    async def run():
+        await game.scene_3(keys)  # the scene is set up on its first frame
+        game.present(partial=True)
+        game.frame_scheduler.flush()
+        return await measure(rebuilt_frame), await measure(lambda: game.scene_3(keys))
+
+    rebuilt, persistent = asyncio.run(run())
+    print(f"scene_3 memory  rebuilt {rebuilt:6.0f} bytes/frame   BarScene {persistent:6.0f} bytes/frame   "
+          f"{rebuilt / persistent:4.2f}x   {len(game.bubbles.live)} bubbles in the beers after {frames} frames")
+    assert persistent < rebuilt, f"BarScene allocates {persistent:.0f} bytes/frame, the rebuilt frame {rebuilt:.0f}"
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    bench_playthrough(runs)
+    bench_profile()
+    bench_text()
+    bench_gif()
+    bench_gif_schedule()
+    bench_gif_stream()
+    bench_startup()
+    bench_sprite_cache()
+    bench_atlas()
+    bench_variants()
+    bench_backgrounds()
+    bench_dirty_rects()
+    bench_transitions()
+    bench_fireworks()
+    bench_bubbles()
+    bench_beer_glasses()
+    bench_scene_3_memory()
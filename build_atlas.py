@@ -0,0 +1,94 @@
+# Packs the game's scaled sprites into one atlas image with a JSON index of where each one is:
+#     python3 build_atlas.py
+# Writes assets/sprites/atlas.png and assets/sprites/atlas.json, which main.py loads instead
+# of the individual PNGs. Run it again after changing a sprite or SPRITE_MANIFEST.
+#     python3 build_atlas.py --check
+# Fails if the index no longer matches a sprite's path, size or PNG contents; main.py trusts
+# the index, so the deploy runs this first.
+#     python3 build_atlas.py --prune
+# Checks, then deletes the PNGs the atlas covers, so the web bundle ships only the atlas.
+import json
+import os
+import sys
+
+os.environ["FIRSTDATE_HEADLESS"] = "1"
+os.environ["FIRSTDATE_SPRITE_CACHE"] = ""  # always scale from the source PNGs
+os.environ["FIRSTDATE_SPRITE_ATLAS"] = "0"
+
+import pygame
+
+import main as game
+
+ATLAS_WIDTH = 512
+PADDING = 1
+SPRITES_DIR = os.path.join(game.BASE_PATH, "assets", "sprites")
+
+
+def pack(sizes, width=ATLAS_WIDTH, padding=PADDING):
+    """
+    Shelf packing: tallest first, left to right along rows as tall as their first sprite.
+    Returns ({name: (x, y, w, h)}, atlas height).
+    """
+    rects = {}
+    x = y = shelf_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w > width:
+            x, y, shelf_height = 0, y + shelf_height + padding, 0
+        rects[name] = (x, y, w, h)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return rects, y + shelf_height
+
+
+def source_hash(path):
+    """The sprite cache's content hash of the PNG at `path`, relative to the game directory."""
+    with open(os.path.join(game.BASE_PATH, path), "rb") as source_file:
+        return game.sprites.source_digest(source_file.read())
+
+
+def build(directory=SPRITES_DIR, image_name="atlas.png"):
+    images = {name: game.sprites.decode(name) for name in game.sprites.manifest}
+    rects, height = pack({name: image.get_size() for name, image in images.items()})
+    atlas = pygame.Surface((ATLAS_WIDTH, height), pygame.SRCALPHA)
+    for name, image in images.items():
+        atlas.blit(image, rects[name][:2], special_flags=pygame.BLEND_RGBA_MAX)  # copy, not blend onto the empty atlas
+    pygame.image.save(atlas, os.path.join(directory, image_name))
+
+    index = {"image": image_name, "size": [ATLAS_WIDTH, height], "sprites": {}}
+    for name, (path, size) in game.sprites.manifest.items():
+        index["sprites"][name] = {"path": path, "size": game.sprites.size_key(size), "hash": source_hash(path), "rect": list(rects[name])}
+    with open(os.path.join(directory, "atlas.json"), "w") as index_file:
+        json.dump(index, index_file, indent=2)
+        index_file.write("\n")
+    print(f"{len(images)} sprites packed into {ATLAS_WIDTH}x{height} {os.path.join(directory, image_name)}")
+
+
+def stale(directory=SPRITES_DIR):
+    """Names of the manifest sprites whose path, size or PNG contents the atlas index no longer matches."""
+    with open(os.path.join(directory, "atlas.json")) as index_file:
+        entries = json.load(index_file)["sprites"]
+    names = []
+    for name, (path, size) in game.sprites.manifest.items():
+        entry = entries.get(name)
+        if entry is None or (entry["path"], entry["size"], entry.get("hash")) != (path, game.sprites.size_key(size), source_hash(path)):
+            names.append(name)
+    return names
+
+
+def prune():
+    """Delete the source PNGs of every sprite in the atlas; main.py never loads them then."""
+    for path, _ in game.sprites.manifest.values():
+        os.remove(os.path.join(game.BASE_PATH, path))
+    print(f"{len(game.sprites.manifest)} sprite PNGs removed, the atlas covers them")
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv or "--prune" in sys.argv:
+        names = stale()
+        if names:
+            sys.exit(f"atlas.json is out of date for {', '.join(names)}: run build_atlas.py")
+        print("atlas.json matches every sprite")
+        if "--prune" in sys.argv:
+            prune()
+    else:
+        build()
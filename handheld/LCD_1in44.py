@@ -42,6 +42,16 @@ if LCD_1IN8 == 1:
 	LCD_X = 1
 	LCD_Y = 2
 
+SPI_CHUNK = 4096	#bytes per SPI transfer (spidev default bufsiz)
+
+#dirty-rectangle updates
+DIRTY_TILE = 8		#diff granularity in pixels
+DIRTY_MAX_RECTS = 8	#more windows than this get merged together
+DIRTY_MAX_AREA = 0.5	#above this fraction of the screen, push the full frame
+WINDOW_CMD_BYTES = 11	#CASET + RASET + RAMWR bytes per window
+
+FILL_CACHE_SIZE = 16	#pre-packed solid colours kept by LCD_WritePixels
+
 LCD_X_MAXPIXEL = 132  #LCD width maximum memory 
 LCD_Y_MAXPIXEL = 162  #LCD height maximum memory
 
@@ -57,6 +67,93 @@ D2U_R2L = 8
 SCAN_DIR_DFT = U2D_R2L
 
 
+#/********************************************************************************
+#function:	Pack 8-bit red, green, blue into an RGB565 value
+#********************************************************************************/
+def rgb565(r, g, b):
+	return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+#/********************************************************************************
+#function:	Precompile (register, data bytes) commands for LCD_WriteSequence
+#********************************************************************************/
+def compile_sequence(commands):
+	return tuple((reg, bytes(data)) for reg, data in commands)
+
+#ST7735S register initialization, sent by LCD_InitReg
+INIT_SEQUENCE = compile_sequence((
+	#ST7735R Frame Rate
+	(0xB1, (0x01, 0x2C, 0x2D)),
+	(0xB2, (0x01, 0x2C, 0x2D)),
+	(0xB3, (0x01, 0x2C, 0x2D, 0x01, 0x2C, 0x2D)),
+	#Column inversion
+	(0xB4, (0x07,)),
+	#ST7735R Power Sequence
+	(0xC0, (0xA2, 0x02, 0x84)),
+	(0xC1, (0xC5,)),
+	(0xC2, (0x0A, 0x00)),
+	(0xC3, (0x8A, 0x2A)),
+	(0xC4, (0x8A, 0xEE)),
+	(0xC5, (0x0E,)),	#VCOM
+	#ST7735R Gamma Sequence
+	(0xe0, (0x0f, 0x1a, 0x0f, 0x18, 0x2f, 0x28, 0x20, 0x22,
+		0x1f, 0x1b, 0x23, 0x37, 0x00, 0x07, 0x02, 0x10)),
+	(0xe1, (0x0f, 0x1b, 0x0f, 0x17, 0x33, 0x2c, 0x29, 0x2e,
+		0x30, 0x30, 0x39, 0x3f, 0x00, 0x07, 0x03, 0x10)),
+	#Enable test command
+	(0xF0, (0x01,)),
+	#Disable ram power save mode
+	(0xF6, (0x00,)),
+	#65k mode
+	(0x3A, (0x05,)),
+))
+
+#/********************************************************************************
+#function:	Turn a changed-pixel mask into a few merged rectangles
+#parameter:
+#	changed :   2D bool array, True where the pixel differs from the panel
+#return:	list of (Xstart, Ystart, Xend, Yend), end exclusive
+#********************************************************************************/
+def dirty_rects(changed, tile = DIRTY_TILE, max_rects = DIRTY_MAX_RECTS):
+	height, width = changed.shape
+	rows, cols = -(-height // tile), -(-width // tile)
+	if rows * tile != height or cols * tile != width:
+		padded = np.zeros((rows * tile, cols * tile), dtype = bool)
+		padded[:height, :width] = changed
+		changed = padded
+	tiles = changed.reshape(rows, tile, cols, tile).any(axis = (1, 3))
+
+	#runs of dirty tiles in each tile row, stacked while the run repeats below
+	rects = []
+	open_runs = {}
+	for row in range(rows + 1):
+		runs = set()
+		if row < rows:
+			edges = np.flatnonzero(np.diff(np.concatenate(([0], tiles[row].view(np.int8), [0]))))
+			runs = set(zip(edges[::2].tolist(), edges[1::2].tolist()))
+		for run in list(open_runs):
+			if run not in runs:
+				rects.append([run[0], open_runs.pop(run), run[1], row])
+		for run in runs:
+			open_runs.setdefault(run, row)
+
+	#merge the cheapest pair until few enough windows remain
+	while len(rects) > max_rects:
+		best = None
+		for i in range(len(rects)):
+			for j in range(i + 1, len(rects)):
+				a, b = rects[i], rects[j]
+				union = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+				cost = (union[2] - union[0]) * (union[3] - union[1]) \
+					- (a[2] - a[0]) * (a[3] - a[1]) - (b[2] - b[0]) * (b[3] - b[1])
+				if best is None or cost < best[0]:
+					best = (cost, i, j, union)
+		_, i, j, union = best
+		rects[i] = union
+		del rects[j]
+
+	return [(x0 * tile, y0 * tile, min(x1 * tile, width), min(y1 * tile, height)) for x0, y0, x1, y1 in rects]
+
+
 class LCD(config.RaspberryPi):
 
 	width = LCD_WIDTH
@@ -84,106 +181,49 @@ class LCD(config.RaspberryPi):
 		self.spi_writebyte([Data])
 
 	def LCD_WriteData_NLen16Bit(self, Data, DataLen):
+		self.LCD_WritePixels(Data, DataLen)
+
+	#/********************************************************************************
+	#function:	Write DataLen pixels of one RGB565 colour into the current window,
+	#			from a cached chunk of the pre-packed colour
+	#********************************************************************************/
+	def LCD_WritePixels(self, Color, DataLen):
+		if getattr(self, '_fill_patterns', None) is None:
+			self._fill_patterns = {}
+		patterns = self._fill_patterns
+		pattern = patterns.get(Color)
+		if pattern is None:
+			if len(patterns) >= FILL_CACHE_SIZE:
+				patterns.clear()
+			pattern = memoryview(bytes((Color >> 8, Color & 0xff)) * (SPI_CHUNK // 2))
+			patterns[Color] = pattern
 		self.digital_write(self.GPIO_DC_PIN, True)
-		for i in range(0, DataLen):
-			self.spi_writebyte([Data >> 8])
-			self.spi_writebyte([Data & 0xff])
+		remaining = DataLen * 2
+		while remaining > 0:
+			self.spi_writebuffer(pattern[:min(remaining, SPI_CHUNK)])
+			remaining -= SPI_CHUNK
 		
+	#/********************************************************************************
+	#function:	Write a register followed by its data payload
+	#			(DC low for the register byte, high once for the whole payload)
+	#parameter:
+	#	Reg	:   register address
+	#	Data	:   bytes-like payload, may be empty
+	#********************************************************************************/
+	def LCD_WriteCommand(self, Reg, Data = b''):
+		self.digital_write(self.GPIO_DC_PIN, False)
+		self.spi_writebuffer(bytes((Reg,)))
+		if Data:
+			self.digital_write(self.GPIO_DC_PIN, True)
+			self.spi_writebuffer(Data)
+
+	def LCD_WriteSequence(self, Sequence):
+		for Reg, Data in Sequence:
+			self.LCD_WriteCommand(Reg, Data)
+
 	"""    Common register initialization    """
 	def LCD_InitReg(self):
-		#ST7735R Frame Rate
-		self.LCD_WriteReg(0xB1)
-		self.LCD_WriteData_8bit(0x01)
-		self.LCD_WriteData_8bit(0x2C)
-		self.LCD_WriteData_8bit(0x2D)
-
-		self.LCD_WriteReg(0xB2)
-		self.LCD_WriteData_8bit(0x01)
-		self.LCD_WriteData_8bit(0x2C)
-		self.LCD_WriteData_8bit(0x2D)
-
-		self.LCD_WriteReg(0xB3)
-		self.LCD_WriteData_8bit(0x01)
-		self.LCD_WriteData_8bit(0x2C)
-		self.LCD_WriteData_8bit(0x2D)
-		self.LCD_WriteData_8bit(0x01)
-		self.LCD_WriteData_8bit(0x2C)
-		self.LCD_WriteData_8bit(0x2D)
-		
-		#Column inversion 
-		self.LCD_WriteReg(0xB4)
-		self.LCD_WriteData_8bit(0x07)
-		
-		#ST7735R Power Sequence
-		self.LCD_WriteReg(0xC0)
-		self.LCD_WriteData_8bit(0xA2)
-		self.LCD_WriteData_8bit(0x02)
-		self.LCD_WriteData_8bit(0x84)
-		self.LCD_WriteReg(0xC1)
-		self.LCD_WriteData_8bit(0xC5)
-
-		self.LCD_WriteReg(0xC2)
-		self.LCD_WriteData_8bit(0x0A)
-		self.LCD_WriteData_8bit(0x00)
-
-		self.LCD_WriteReg(0xC3)
-		self.LCD_WriteData_8bit(0x8A)
-		self.LCD_WriteData_8bit(0x2A)
-		self.LCD_WriteReg(0xC4)
-		self.LCD_WriteData_8bit(0x8A)
-		self.LCD_WriteData_8bit(0xEE)
-		
-		self.LCD_WriteReg(0xC5)#VCOM 
-		self.LCD_WriteData_8bit(0x0E)
-		
-		#ST7735R Gamma Sequence
-		self.LCD_WriteReg(0xe0)
-		self.LCD_WriteData_8bit(0x0f)
-		self.LCD_WriteData_8bit(0x1a)
-		self.LCD_WriteData_8bit(0x0f)
-		self.LCD_WriteData_8bit(0x18)
-		self.LCD_WriteData_8bit(0x2f)
-		self.LCD_WriteData_8bit(0x28)
-		self.LCD_WriteData_8bit(0x20)
-		self.LCD_WriteData_8bit(0x22)
-		self.LCD_WriteData_8bit(0x1f)
-		self.LCD_WriteData_8bit(0x1b)
-		self.LCD_WriteData_8bit(0x23)
-		self.LCD_WriteData_8bit(0x37)
-		self.LCD_WriteData_8bit(0x00)
-		self.LCD_WriteData_8bit(0x07)
-		self.LCD_WriteData_8bit(0x02)
-		self.LCD_WriteData_8bit(0x10)
-
-		self.LCD_WriteReg(0xe1)
-		self.LCD_WriteData_8bit(0x0f)
-		self.LCD_WriteData_8bit(0x1b)
-		self.LCD_WriteData_8bit(0x0f)
-		self.LCD_WriteData_8bit(0x17)
-		self.LCD_WriteData_8bit(0x33)
-		self.LCD_WriteData_8bit(0x2c)
-		self.LCD_WriteData_8bit(0x29)
-		self.LCD_WriteData_8bit(0x2e)
-		self.LCD_WriteData_8bit(0x30)
-		self.LCD_WriteData_8bit(0x30)
-		self.LCD_WriteData_8bit(0x39)
-		self.LCD_WriteData_8bit(0x3f)
-		self.LCD_WriteData_8bit(0x00)
-		self.LCD_WriteData_8bit(0x07)
-		self.LCD_WriteData_8bit(0x03)
-		self.LCD_WriteData_8bit(0x10) 
-		
-		#Enable test command
-		self.LCD_WriteReg(0xF0)
-		self.LCD_WriteData_8bit(0x01)
-		
-		#Disable ram power save mode
-		self.LCD_WriteReg(0xF6)
-		self.LCD_WriteData_8bit(0x00)
-		
-		#65k mode
-		self.LCD_WriteReg(0x3A)
-		self.LCD_WriteData_8bit(0x05)
+		self.LCD_WriteSequence(INIT_SEQUENCE)
 
 	#********************************************************************************
 	#function:	Set the display scan and color transfer modes
@@ -228,11 +268,11 @@ class LCD(config.RaspberryPi):
 			self.LCD_Y_Adjust = LCD_Y
 		
 		# Set the read / write scan direction of the frame memory
-		self.LCD_WriteReg(0x36)		#MX, MY, RGB mode 
+		#MX, MY, RGB mode
 		if LCD_1IN44 == 1:
-			self.LCD_WriteData_8bit( MemoryAccessReg_Data | 0x08)	#0x08 set RGB
+			self.LCD_WriteCommand(0x36, bytes((MemoryAccessReg_Data | 0x08,)))	#0x08 set RGB
 		else:
-			self.LCD_WriteData_8bit( MemoryAccessReg_Data & 0xf7)	#RGB color filter panel
+			self.LCD_WriteCommand(0x36, bytes((MemoryAccessReg_Data & 0xf7,)))	#RGB color filter panel
 
 	#/********************************************************************************
 	#function:	
@@ -272,42 +312,132 @@ class LCD(config.RaspberryPi):
 	#********************************************************************************/
 	def LCD_SetWindows(self, Xstart, Ystart, Xend, Yend):
 		#set the X coordinates
-		self.LCD_WriteReg(0x2A)
-		self.LCD_WriteData_8bit(0x00)
-		self.LCD_WriteData_8bit((Xstart & 0xff) + self.LCD_X_Adjust)
-		self.LCD_WriteData_8bit(0x00)
-		self.LCD_WriteData_8bit(((Xend - 1) & 0xff) + self.LCD_X_Adjust)
+		self.LCD_WriteCommand(0x2A, bytes((0x00, (Xstart & 0xff) + self.LCD_X_Adjust,
+			0x00, ((Xend - 1) & 0xff) + self.LCD_X_Adjust)))
 
 		#set the Y coordinates
-		self.LCD_WriteReg (0x2B)
-		self.LCD_WriteData_8bit(0x00)
-		self.LCD_WriteData_8bit((Ystart & 0xff) + self.LCD_Y_Adjust)
-		self.LCD_WriteData_8bit(0x00)
-		self.LCD_WriteData_8bit(((Yend - 1) & 0xff )+ self.LCD_Y_Adjust)
+		self.LCD_WriteCommand(0x2B, bytes((0x00, (Ystart & 0xff) + self.LCD_Y_Adjust,
+			0x00, ((Yend - 1) & 0xff) + self.LCD_Y_Adjust)))
+
+		self.LCD_WriteCommand(0x2C)
 
-		self.LCD_WriteReg(0x2C)
+	#/********************************************************************************
+	#function:	Fill a window with one colour
+	#parameter:
+	#	Color	:   RGB565 value (see rgb565) or an (r, g, b) tuple
+	#	Xstart, Ystart, Xend, Yend : window, end exclusive, default whole screen
+	#********************************************************************************/
+	def LCD_FillWindow(self, Color, Xstart = 0, Ystart = 0, Xend = None, Yend = None):
+		if isinstance(Color, tuple):
+			Color = rgb565(*Color)
+		if Xend is None:
+			Xend = self.width
+		if Yend is None:
+			Yend = self.height
+		self.LCD_SetWindows(Xstart, Ystart, Xend, Yend)
+		self.LCD_WritePixels(Color, (Xend - Xstart) * (Yend - Ystart))
+		if getattr(self, '_sent', None) is not None:	#keep the dirty-rect diff in step
+			self._sent[Ystart:Yend, Xstart:Xend] = Color
 
 	def LCD_Clear(self):
 		#hello
-		_buffer = [0xff]*(self.width * self.height * 2)
-		self.LCD_SetWindows(0, 0, self.width, self.height)
-		self.digital_write(self.GPIO_DC_PIN, True)
-		for i in range(0,len(_buffer),4096):
-			self.spi_writebyte(_buffer[i:i+4096])
+		self.LCD_FillWindow(0xFFFF)
 
-	def LCD_ShowImage(self,Image,Xstart,Ystart):
-		if (Image == None):
-			return
-		imwidth, imheight = Image.size
+	#/********************************************************************************
+	#function:	Pack an RGB image into the reusable RGB565 frame buffer
+	#parameter:
+	#	Image	:   PIL RGB image, pygame Surface or (h, w, 3) uint8 array, display sized
+	#return:	memoryview over the big-endian RGB565 bytes (valid until next pack)
+	#********************************************************************************/
+	def LCD_PackImage(self, Image):
+		if hasattr(Image, 'get_view'):	#pygame Surface, viewed in place as (w, h, 3)
+			imwidth, imheight = Image.get_size()
+			img = np.asarray(Image.get_view('3')).swapaxes(0, 1)
+		elif isinstance(Image, np.ndarray):
+			imheight, imwidth = Image.shape[:2]
+			img = Image
+		else:
+			imwidth, imheight = Image.size
+			img = np.asarray(Image)
 		if imwidth != self.width or imheight != self.height:
 			raise ValueError('Image must be same dimensions as display \
 				({0}x{1}).' .format(self.width, self.height))
-		img = np.asarray(Image)
-		pix = np.zeros((self.width,self.height,2), dtype = np.uint8)
-		pix[...,[0]] = np.add(np.bitwise_and(img[...,[0]],0xF8),np.right_shift(img[...,[1]],5))
-		pix[...,[1]] = np.add(np.bitwise_and(np.left_shift(img[...,[1]],3),0xE0),np.right_shift(img[...,[2]],3))
-		pix = pix.flatten().tolist()
-		self.LCD_SetWindows(0, 0, self.width , self.height)
+
+		if getattr(self, '_frame', None) is None or self._frame.shape != (imheight, imwidth):
+			self._pix = np.empty((imheight, imwidth), dtype = np.uint16)
+			self._scratch = np.empty((imheight, imwidth), dtype = np.uint16)
+			self._frame = np.empty((imheight, imwidth), dtype = '>u2')
+			self._frame_bytes = memoryview(self._frame.view(np.uint8).reshape(-1))
+		pix = self._pix
+		scratch = self._scratch
+
+		#RRRRRGGG GGGBBBBB, computed in place with no temporaries
+		np.copyto(pix, img[..., 0])
+		pix &= 0xF8
+		pix <<= 8
+		np.copyto(scratch, img[..., 1])
+		scratch &= 0xFC
+		scratch <<= 3
+		pix |= scratch
+		np.copyto(scratch, img[..., 2])
+		scratch >>= 3
+		pix |= scratch
+		np.copyto(self._frame, pix)	#byte swap to the panel's big-endian order
+		return self._frame_bytes
+
+	#/********************************************************************************
+	#function:	Send one window of the packed frame and count the bytes
+	#********************************************************************************/
+	def LCD_SendWindow(self, Xstart, Ystart, Xend, Yend):
+		if Xstart == 0 and Xend == self._frame.shape[1]:	#whole rows are already contiguous
+			row_bytes = Xend * 2
+			buf = self._frame_bytes[Ystart * row_bytes:Yend * row_bytes]
+		else:
+			buf = memoryview(np.ascontiguousarray(self._frame[Ystart:Yend, Xstart:Xend]).view(np.uint8).reshape(-1))
+		self.LCD_SetWindows(Xstart, Ystart, Xend, Yend)
 		self.digital_write(self.GPIO_DC_PIN, True)
-		for i in range(0,len(pix),4096):
-			self.spi_writebyte(pix[i:i+4096])
+		for i in range(0, len(buf), SPI_CHUNK):
+			self.spi_writebuffer(buf[i:i + SPI_CHUNK])
+		return len(buf) + WINDOW_CMD_BYTES
+
+	def LCD_FrameSent(self, nbytes):
+		#remember what the panel shows so the next frame can be diffed
+		if getattr(self, '_sent', None) is None or self._sent.shape != self._pix.shape:
+			self._sent = np.empty_like(self._pix)
+		np.copyto(self._sent, self._pix)
+		self.bytes_last_frame = nbytes
+		self.bytes_total = getattr(self, 'bytes_total', 0) + nbytes
+		self.frames_total = getattr(self, 'frames_total', 0) + 1
+
+	def LCD_ShowImage(self,Image,Xstart,Ystart):
+		if (Image is None):
+			return
+		self.LCD_PackImage(Image)
+		self.LCD_FrameSent(self.LCD_SendWindow(0, 0, self.width, self.height))
+
+	#/********************************************************************************
+	#function:	Show an image, sending only the windows that changed since the
+	#			last frame (full frame when more than max_area of it changed)
+	#parameter:
+	#	Image	:   PIL RGB image, pygame Surface or (h, w, 3) uint8 array, display sized
+	#	max_area:   fraction of the screen above which a full push is cheaper
+	#return:	list of windows sent (empty for an unchanged frame)
+	#********************************************************************************/
+	def LCD_ShowImageDirty(self, Image, max_area = DIRTY_MAX_AREA):
+		if (Image is None):
+			return []
+		self.LCD_PackImage(Image)
+		if getattr(self, '_sent', None) is None or self._sent.shape != self._pix.shape:
+			rects = None
+		else:
+			rects = dirty_rects(self._pix != self._sent)
+			area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+			if area > max_area * self.width * self.height:
+				rects = None
+		if rects is None:
+			rects = [(0, 0, self.width, self.height)]
+		nbytes = 0
+		for rect in rects:
+			nbytes += self.LCD_SendWindow(*rect)
+		self.LCD_FrameSent(nbytes)
+		return rects
@@ -102,6 +102,11 @@ class RaspberryPi:
         if self.SPI!=None :
             self.SPI.writebytes(data)
 
+    def spi_writebuffer(self, data):
+        # bytes / memoryview / numpy buffer, sent without building a list
+        if self.SPI!=None :
+            self.SPI.writebytes2(data)
+
     def bl_DutyCycle(self, duty):
         self.GPIO_BL_PIN.value = duty / 100
         
@@ -0,0 +1,67 @@
+# -*- coding:utf-8 -*-
+##
+ #  @filename   :   fake_spi.py
+ #  @brief      :   Stand-in for spidev/GPIO so the LCD driver runs off the Pi
+ #
+ #  Call install() before importing config or LCD_1in44. It registers a fake
+ #  `spidev` module and switches gpiozero to its mock pin factory, so the
+ #  driver, benchmarks and demos work on a plain Linux box.
+ #
+
+import sys
+import time
+import types
+
+
+class FakeSpiDev:
+    """Records every SPI transfer instead of sending it to hardware.
+
+    With simulate_latency set, each transfer also blocks for as long as the
+    bytes would take on the wire at max_speed_hz, plus a fixed per-transfer
+    overhead, so threading and frame pacing can be exercised realistically.
+    """
+
+    simulate_latency = False
+    transfer_overhead = 0.00005  # seconds per ioctl on a Pi Zero, roughly
+
+    def __init__(self, bus=0, device=0):
+        self.bus = bus
+        self.device = device
+        self.max_speed_hz = 0
+        self.mode = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.bytes_written = 0
+        self.transfers = 0
+
+    def _account(self, nbytes):
+        self.bytes_written += nbytes
+        self.transfers += 1
+        if self.simulate_latency and self.max_speed_hz:
+            time.sleep(self.transfer_overhead + nbytes * 8 / self.max_speed_hz)
+
+    def writebytes(self, data):
+        if len(data) > 4096:
+            raise OverflowError("spidev.writebytes accepts at most 4096 bytes")
+        self._account(len(data))
+
+    def writebytes2(self, data):
+        self._account(memoryview(data).nbytes)
+
+    def close(self):
+        pass
+
+
+def install(simulate_latency=False):
+    """Register the fake spidev module and gpiozero mock pins."""
+    FakeSpiDev.simulate_latency = simulate_latency
+    module = types.ModuleType("spidev")
+    module.SpiDev = FakeSpiDev
+    sys.modules["spidev"] = module
+
+    from gpiozero import Device
+    from gpiozero.pins.mock import MockFactory, MockPWMPin
+
+    Device.pin_factory = MockFactory(pin_class=MockPWMPin)
+    return module
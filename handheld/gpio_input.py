@@ -0,0 +1,122 @@
+# -*- coding:utf-8 -*-
+##
+ #  @filename   :   gpio_input.py
+ #  @brief      :   Waveshare HAT keys -> pygame KEYDOWN/KEYUP events
+ #
+ #  Replaces the retrogame daemon and busy polling: gpiozero edge callbacks
+ #  on the config.RaspberryPi key pins post keyboard events straight into the
+ #  pygame queue, with software debouncing. Works with gpiozero's mock pin
+ #  factory (see fake_spi.install) for testing off the Pi.
+ #
+
+import threading
+import time
+from collections import deque
+
+import pygame
+
+# config.RaspberryPi key device -> key the game listens for
+KEYMAP = (
+    ("GPIO_KEY_UP_PIN", pygame.K_UP),
+    ("GPIO_KEY_DOWN_PIN", pygame.K_DOWN),
+    ("GPIO_KEY_LEFT_PIN", pygame.K_LEFT),
+    ("GPIO_KEY_RIGHT_PIN", pygame.K_RIGHT),
+    ("GPIO_KEY_PRESS_PIN", pygame.K_SPACE),  # joystick click
+    ("GPIO_KEY1_PIN", pygame.K_1),
+    ("GPIO_KEY2_PIN", pygame.K_2),
+    ("GPIO_KEY3_PIN", pygame.K_RETURN),
+)
+
+DEBOUNCE = 0.02  # seconds a key must settle before another change is reported
+
+
+class KeyState:
+    """Stands in for pygame.key.get_pressed(): keys[pygame.K_UP] etc."""
+
+    def __init__(self, pressed):
+        self._pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self._pressed
+
+
+class GPIOInput:
+
+    def __init__(self, device, keymap=KEYMAP, debounce=DEBOUNCE):
+        """Attach edge callbacks to the key pins of `device` (a config.RaspberryPi)."""
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._pressed = set()
+        self._last_change = {}
+        self._timers = {}
+
+        self.edges = 0
+        self.bounces_ignored = 0
+        self.events_posted = 0
+        self.post_latencies = deque(maxlen=256)  # edge -> posted, seconds
+        self.handled_latencies = deque(maxlen=256)  # edge -> read by the game, seconds
+
+        self._buttons = []
+        for attribute, key in keymap:
+            button = getattr(device, attribute)
+            button.when_activated = lambda button, key=key: self._edge(button, key)
+            button.when_deactivated = lambda button, key=key: self._edge(button, key)
+            self._buttons.append(button)
+
+    def _edge(self, button, key):
+        edge_time = time.perf_counter()
+        with self._lock:
+            self.edges += 1
+            down = bool(button.value)
+            if down == (key in self._pressed):
+                self.bounces_ignored += 1
+                return
+            settled = self._last_change.get(key, -self.debounce) + self.debounce
+            if edge_time < settled:
+                # Too soon after the last change: look again once it has settled
+                self.bounces_ignored += 1
+                if key not in self._timers:
+                    timer = threading.Timer(settled - edge_time, self._recheck, (button, key))
+                    timer.daemon = True
+                    self._timers[key] = timer
+                    timer.start()
+                return
+            self._last_change[key] = edge_time
+            if down:
+                self._pressed.add(key)
+            else:
+                self._pressed.discard(key)
+        pygame.event.post(pygame.event.Event(
+            pygame.KEYDOWN if down else pygame.KEYUP,
+            key=key, mod=0, unicode="", scancode=0, edge_time=edge_time,
+        ))
+        self.events_posted += 1
+        self.post_latencies.append(time.perf_counter() - edge_time)
+
+    def _recheck(self, button, key):
+        with self._lock:
+            self._timers.pop(key, None)
+        self._edge(button, key)
+
+    def pressed(self):
+        """Current key state, indexed like pygame.key.get_pressed()."""
+        with self._lock:
+            return KeyState(frozenset(self._pressed))
+
+    def handled(self, events):
+        """Record edge-to-game latency for events returned by pygame.event.get()."""
+        now = time.perf_counter()
+        for event in events:
+            edge_time = getattr(event, "edge_time", None)
+            if edge_time is not None:
+                self.handled_latencies.append(now - edge_time)
+        return events
+
+    def close(self):
+        for button in self._buttons:
+            button.when_activated = None
+            button.when_deactivated = None
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
@@ -0,0 +1,401 @@
+# -*- coding:utf-8 -*-
+# Off-device benchmark for the handheld's LCD_1in44 frame path and GPIO keys.
+# Runs against fake_spi, so it works on any Linux box:
+#     python3 lcd_benchmark.py [frames]
+import os
+import sys
+import threading
+import time
+
+import fake_spi
+
+fake_spi.install()
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import LCD_1in44
+import lcd_sink
+
+
+def legacy_show_image(disp, image):
+    """The original LCD_ShowImage: fresh buffer, fancy indexing, Python list."""
+    img = np.asarray(image)
+    pix = np.zeros((disp.width, disp.height, 2), dtype=np.uint8)
+    pix[..., [0]] = np.add(np.bitwise_and(img[..., [0]], 0xF8), np.right_shift(img[..., [1]], 5))
+    pix[..., [1]] = np.add(np.bitwise_and(np.left_shift(img[..., [1]], 3), 0xE0), np.right_shift(img[..., [2]], 3))
+    pix = pix.flatten().tolist()
+    disp.LCD_SetWindows(0, 0, disp.width, disp.height)
+    disp.digital_write(disp.GPIO_DC_PIN, True)
+    for i in range(0, len(pix), 4096):
+        disp.spi_writebyte(pix[i:i + 4096])
+    return pix
+
+
+def legacy_init_reg(disp):
+    """The original LCD_InitReg: one DC toggle and one transfer per byte."""
+    for reg, data in LCD_1in44.INIT_SEQUENCE:
+        disp.LCD_WriteReg(reg)
+        for byte in data:
+            disp.LCD_WriteData_8bit(byte)
+
+
+def legacy_set_windows(disp, x0, y0, x1, y1):
+    disp.LCD_WriteReg(0x2A)
+    for byte in (0x00, (x0 & 0xff) + disp.LCD_X_Adjust, 0x00, ((x1 - 1) & 0xff) + disp.LCD_X_Adjust):
+        disp.LCD_WriteData_8bit(byte)
+    disp.LCD_WriteReg(0x2B)
+    for byte in (0x00, (y0 & 0xff) + disp.LCD_Y_Adjust, 0x00, ((y1 - 1) & 0xff) + disp.LCD_Y_Adjust):
+        disp.LCD_WriteData_8bit(byte)
+    disp.LCD_WriteReg(0x2C)
+
+
+def legacy_clear(disp):
+    buffer = [0xff] * (disp.width * disp.height * 2)
+    disp.LCD_SetWindows(0, 0, disp.width, disp.height)
+    disp.digital_write(disp.GPIO_DC_PIN, True)
+    for i in range(0, len(buffer), 4096):
+        disp.spi_writebyte(buffer[i:i + 4096])
+
+
+def legacy_write_nlen16bit(disp, data, count):
+    disp.digital_write(disp.GPIO_DC_PIN, True)
+    for i in range(0, count):
+        disp.spi_writebyte([data >> 8])
+        disp.spi_writebyte([data & 0xff])
+
+
+def wire_trace(disp, action):
+    """Run action() and return the (DC level, bytes) runs it put on the bus."""
+    runs = []
+
+    def record(data):
+        dc = disp.GPIO_DC_PIN.value
+        if runs and runs[-1][0] == dc:
+            runs[-1][1].extend(bytes(data))
+        else:
+            runs.append((dc, bytearray(bytes(data))))
+
+    disp.spi_writebyte = disp.spi_writebuffer = record
+    try:
+        action()
+    finally:
+        del disp.spi_writebyte, disp.spi_writebuffer
+    return runs
+
+
+def make_display():
+    disp = LCD_1in44.LCD()
+    disp.LCD_Init(LCD_1in44.SCAN_DIR_DFT)
+    return disp
+
+
+def test_image(disp, seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, (disp.height, disp.width, 3), dtype=np.uint8)
+    return Image.fromarray(pixels, "RGB")
+
+
+def frames_per_second(show, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        show()
+    return frames / (time.perf_counter() - start)
+
+
+def report(name, fps, spi):
+    print(f"{name:<28}{fps:10.1f} fps  {spi.bytes_written // max(spi.transfers, 1):6d} B/transfer")
+
+
+def bench_show_image(disp, frames):
+    image = test_image(disp)
+
+    # Both paths must put identical bytes on the wire
+    assert bytes(disp.LCD_PackImage(image)) == bytes(legacy_show_image(disp, image))
+
+    disp.SPI.reset_counters()
+    report("legacy ShowImage (PIL)", frames_per_second(lambda: legacy_show_image(disp, image), frames), disp.SPI)
+    disp.SPI.reset_counters()
+    report("packed ShowImage (PIL)", frames_per_second(lambda: disp.LCD_ShowImage(image, 0, 0), frames), disp.SPI)
+
+    try:
+        import pygame
+    except ImportError:
+        return
+    surface = pygame.image.frombytes(image.tobytes(), image.size, "RGB")
+    assert bytes(disp.LCD_PackImage(surface)) == bytes(disp.LCD_PackImage(image))
+    disp.SPI.reset_counters()
+    report("packed ShowImage (Surface)", frames_per_second(lambda: disp.LCD_ShowImage(surface, 0, 0), frames), disp.SPI)
+
+
+def dialogue_frames(disp, frames, sprite_step):
+    """A text_box-style scene: static dialogue box, one small sprite moving."""
+    for i in range(frames):
+        image = Image.new("RGB", (disp.width, disp.height))
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((8, 88, 120, 124), fill=(255, 255, 255))
+        draw.rectangle((12, 92, 116, 120), fill=(0, 0, 0))
+        draw.text((16, 96), "Let's get some", fill=(255, 255, 255))
+        x = 10 + (i * sprite_step) % 90
+        draw.rectangle((x, 40, x + 24, 74), fill=(200, 120, 40))
+        yield image
+
+
+def bench_dirty(disp, frames):
+    full = disp.width * disp.height * 2 + LCD_1in44.WINDOW_CMD_BYTES
+    for name, step in (("static dialogue", 0), ("sprite walking", 2)):
+        images = list(dialogue_frames(disp, frames, step))
+        disp.LCD_Clear()
+        disp.bytes_total = 0
+        disp.frames_total = 0
+        fps = frames_per_second(lambda it=iter(images): disp.LCD_ShowImageDirty(next(it)), frames)
+        per_frame = disp.bytes_total / disp.frames_total
+        print(f"dirty ShowImage, {name:<16}{fps:8.1f} fps  {per_frame:8.0f} B/frame  ({100 * per_frame / full:.1f}% of full)")
+
+
+def bench_commands(disp, repeats):
+    # Identical bytes, with identical DC levels, on the wire either way
+    assert wire_trace(disp, lambda: legacy_init_reg(disp)) == wire_trace(disp, disp.LCD_InitReg)
+    assert wire_trace(disp, lambda: legacy_set_windows(disp, 3, 5, 70, 90)) == \
+        wire_trace(disp, lambda: disp.LCD_SetWindows(3, 5, 70, 90))
+
+    fake_spi.FakeSpiDev.simulate_latency = True
+    cases = (
+        ("InitReg", lambda: legacy_init_reg(disp), disp.LCD_InitReg),
+        ("SetWindows", lambda: legacy_set_windows(disp, 0, 0, 128, 128), lambda: disp.LCD_SetWindows(0, 0, 128, 128)),
+    )
+    for name, legacy, batched in cases:
+        for label, action in (("per-byte", legacy), ("batched", batched)):
+            disp.SPI.reset_counters()
+            start = time.perf_counter()
+            for _ in range(repeats):
+                action()
+            elapsed = (time.perf_counter() - start) / repeats
+            print(f"{label:<9}{name:<19}{elapsed * 1000:8.2f} ms  {disp.SPI.transfers // repeats:4d} transfers")
+
+    for label, init_reg in (("per-byte", lambda: legacy_init_reg(disp)), ("batched", None)):
+        if init_reg:
+            disp.LCD_InitReg = init_reg
+        start = time.perf_counter()
+        disp.LCD_Init(LCD_1in44.SCAN_DIR_DFT)
+        print(f"{label:<9}LCD_Init           {(time.perf_counter() - start) * 1000:8.2f} ms  (incl. 350 ms of panel delays)")
+        if init_reg:
+            del disp.LCD_InitReg
+    fake_spi.FakeSpiDev.simulate_latency = False
+
+
+def bench_fill(disp, repeats):
+    assert wire_trace(disp, lambda: legacy_clear(disp)) == wire_trace(disp, disp.LCD_Clear)
+    assert wire_trace(disp, lambda: legacy_write_nlen16bit(disp, 0xF81F, 5000)) == \
+        wire_trace(disp, lambda: disp.LCD_WriteData_NLen16Bit(0xF81F, 5000))
+
+    count = disp.width * disp.height
+    cases = (
+        ("Clear", lambda: legacy_clear(disp), disp.LCD_Clear),
+        ("NLen16Bit full screen", lambda: legacy_write_nlen16bit(disp, 0x0000, count),
+         lambda: disp.LCD_WriteData_NLen16Bit(0x0000, count)),
+    )
+    for name, legacy, fast in cases:
+        for label, action in (("legacy", legacy), ("fill", fast)):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                action()
+            print(f"{label:<7}{name:<21}{(time.perf_counter() - start) / repeats * 1000:8.2f} ms")
+
+
+def bench_sink(disp, frames, render_ms=20):
+    """Game loop at 30 FPS with a simulated render cost, over a slow SPI bus."""
+    fake_spi.FakeSpiDev.simulate_latency = True
+    speed = disp.SPI.max_speed_hz
+    disp.SPI.max_speed_hz = 8000000  # what the panel sustains in practice
+    images = [np.asarray(image) for image in dialogue_frames(disp, frames, 3)]
+    budget = 1 / 30
+
+    def loop(show):
+        missed = 0
+        start = time.perf_counter()
+        for image in images:
+            frame_start = time.perf_counter()
+            time.sleep(render_ms / 1000)
+            show(image)
+            spare = budget - (time.perf_counter() - frame_start)
+            if spare > 0:
+                time.sleep(spare)
+            else:
+                missed += 1
+        return frames / (time.perf_counter() - start), missed
+
+    fps, missed = loop(lambda image: disp.LCD_ShowImage(image, 0, 0))
+    print(f"blocking ShowImage          {fps:8.1f} fps  {missed:4d}/{frames} ticks missed")
+    for policy in (lcd_sink.DROP_OLDEST, lcd_sink.BLOCK):
+        sink = lcd_sink.LCDSink(disp, policy=policy, dirty=False)
+        fps, missed = loop(sink.submit)
+        sink.close()
+        print(f"LCDSink {policy:<20}{fps:8.1f} fps  {missed:4d}/{frames} ticks missed  "
+              f"{sink.frames_sent} sent, {sink.frames_dropped} dropped")
+
+    disp.SPI.max_speed_hz = speed
+    fake_spi.FakeSpiDev.simulate_latency = False
+
+
+class FbcpModel:
+    """In-process stand-in for fbcp: poll the framebuffer at 60 Hz, downscale, push full frames."""
+
+    def __init__(self, disp, screen):
+        import pygame
+
+        self.disp = disp
+        self.framebuffer = screen.copy()  # what X shows, updated on flip
+        self.scaled = pygame.Surface((disp.width, disp.height), 0, screen)
+        self.frame_id = 0  # newest frame flipped by the game
+        self.shown = []  # (frame id, time the panel finished updating)
+        self.running = True
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        import pygame
+
+        while self.running:
+            with self.lock:
+                frame_id = self.frame_id
+                pygame.transform.smoothscale(self.framebuffer, self.scaled.get_size(), self.scaled)
+            self.disp.LCD_ShowImage(self.scaled, 0, 0)
+            self.shown.append((frame_id, time.perf_counter()))
+            time.sleep(1 / 60)
+
+    def flip(self, screen, frame_id):
+        with self.lock:
+            self.framebuffer.blit(screen, (0, 0))
+            self.frame_id = frame_id
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+
+
+def bench_renderer(disp, frames, render_ms=8):
+    """Input-to-photon latency and CPU use, direct LCD backend vs. an fbcp-style mirror."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((296, 300))
+    sprite = pygame.Surface((35, 49))
+    sprite.fill((200, 120, 40))
+    fake_spi.FakeSpiDev.simulate_latency = True
+    speed = disp.SPI.max_speed_hz
+    disp.SPI.max_speed_hz = 8000000
+
+    def run(name, present, first_photon, stop):
+        """Move the sprite on a key press every 10 frames at 30 FPS."""
+        clock = pygame.time.Clock()
+        inputs = {}
+        last_input = None
+        x = 20
+        wall, cpu = time.perf_counter(), time.process_time()
+        for frame_id in range(1, frames + 1):
+            if frame_id % 10 == 0 and frame_id <= frames - 10:
+                last_input = inputs[frame_id] = time.perf_counter()
+                x = 20 + (x + 30) % 220
+            screen.fill((0, 0, 0))
+            screen.blit(sprite, (x, 120))
+            time.sleep(render_ms / 1000)  # rest of the scene
+            present(frame_id, last_input)
+            clock.tick(30)
+        stop()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        latencies = [first_photon(frame_id, t) - t for frame_id, t in inputs.items()]
+        print(f"{name:<16}input-to-photon {1000 * sum(latencies) / len(latencies):6.1f} ms avg "
+              f"{1000 * max(latencies):6.1f} ms max   CPU {100 * cpu / wall:5.1f}%")
+
+    # Direct: what handheld/main.py present() does on the "lcd" backend
+    sink = lcd_sink.LCDSink(disp)
+    lcd_frame = pygame.Surface((disp.width, disp.height), 0, screen)
+    shown = []  # (input stamp carried by the frame, time it was on the panel)
+    show_dirty = disp.LCD_ShowImageDirty
+
+    def show_and_log(image, *args):
+        rects = show_dirty(image, *args)
+        shown.append((sink._front_stamp, time.perf_counter()))
+        return rects
+
+    def present_direct(frame_id, last_input):
+        pygame.transform.smoothscale(screen, lcd_frame.get_size(), lcd_frame)
+        sink.submit(lcd_frame, last_input)
+
+    disp.LCD_ShowImageDirty = show_and_log
+    run("direct LCD", present_direct,
+        lambda frame_id, t: min(done for stamp, done in shown if stamp == t), sink.close)
+    del disp.LCD_ShowImageDirty
+
+    # fbcp: the game flips, the mirror copies whatever is there on its own schedule
+    mirror = FbcpModel(disp, screen)
+
+    def present_fbcp(frame_id, last_input):
+        pygame.display.flip()
+        mirror.flip(screen, frame_id)
+
+    run("fbcp mirror", present_fbcp,
+        lambda frame_id, t: min(done for fid, done in mirror.shown if fid >= frame_id), mirror.stop)
+
+    disp.SPI.max_speed_hz = speed
+    fake_spi.FakeSpiDev.simulate_latency = False
+
+
+def bench_input(disp, presses, bounces=3):
+    """GPIO key presses with contact bounce -> pygame events, read by a 30 FPS loop."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from gpiozero import Device
+
+    import config
+    import gpio_input
+
+    pygame.display.init()
+    pygame.display.set_mode((296, 300))
+    keys = gpio_input.GPIOInput(disp)
+    pins = [Device.pin_factory.pin(pin) for pin in
+            (config.KEY_UP_PIN, config.KEY_LEFT_PIN, config.KEY1_PIN, config.KEY3_PIN)]
+    down = up = 0
+    clock = pygame.time.Clock()
+    pygame.event.clear()
+    for i in range(presses):
+        pin = pins[i % len(pins)]
+        for level in (pin.drive_low, pin.drive_high):  # pull-up: low is pressed
+            for _ in range(bounces):
+                level()
+                time.sleep(0.001)
+                (pin.drive_high if level == pin.drive_low else pin.drive_low)()
+                time.sleep(0.001)
+            level()
+            clock.tick(30)
+            for event in keys.handled(pygame.event.get((pygame.KEYDOWN, pygame.KEYUP))):
+                down += event.type == pygame.KEYDOWN
+                up += event.type == pygame.KEYUP
+    time.sleep(2 * keys.debounce)
+    for event in keys.handled(pygame.event.get((pygame.KEYDOWN, pygame.KEYUP))):
+        down += event.type == pygame.KEYDOWN
+        up += event.type == pygame.KEYUP
+    keys.close()
+
+    post, handled = list(keys.post_latencies), list(keys.handled_latencies)
+    print(f"gpio input      {presses} presses, {keys.edges} edges, {keys.bounces_ignored} bounces ignored, "
+          f"{down} KEYDOWN / {up} KEYUP")
+    print(f"                edge->queue {1e6 * sum(post) / len(post):6.1f} us avg "
+          f"{1e6 * max(post):6.1f} us max   edge->game {1000 * sum(handled) / len(handled):5.1f} ms avg "
+          f"{1000 * max(handled):5.1f} ms max")
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    disp = make_display()
+    bench_show_image(disp, frames)
+    bench_dirty(disp, frames)
+    bench_commands(disp, 20)
+    bench_fill(disp, 5)
+    bench_sink(disp, min(frames, 90))
+    bench_renderer(disp, min(frames, 90))
+    bench_input(disp, min(frames, 40))
+    disp.module_exit()
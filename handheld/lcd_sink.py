@@ -0,0 +1,133 @@
+# -*- coding:utf-8 -*-
+##
+ #  @filename   :   lcd_sink.py
+ #  @brief      :   Asynchronous, double-buffered frame sink for LCD_1in44
+ #
+ #  The game hands each finished frame to LCDSink.submit(), which copies it
+ #  into the back buffer and returns straight away. A transmit thread swaps
+ #  the buffers and streams the front one over SPI while the next frame is
+ #  rendered, so clock.tick() no longer waits on the transfer.
+ #
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# What submit() does when the previous frame has not been picked up yet
+DROP_OLDEST = "drop_oldest"  # overwrite the waiting frame with the new one
+DROP_NEWEST = "drop_newest"  # keep the waiting frame, discard the new one
+BLOCK = "block"  # wait for the transmitter to take the waiting frame
+
+
+class LCDSink:
+
+    def __init__(self, disp, policy=DROP_OLDEST, dirty=True):
+        """Start a transmit thread for `disp` (an initialised LCD_1in44.LCD)."""
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError("unknown frame-drop policy: {0}".format(policy))
+        self.disp = disp
+        self.policy = policy
+        self.dirty = dirty
+
+        shape = (disp.height, disp.width, 3)
+        self._front = np.zeros(shape, dtype=np.uint8)
+        self._back = np.zeros(shape, dtype=np.uint8)
+        self._front_stamp = self._back_stamp = None
+        self._pending = False
+        self._running = True
+        self._cond = threading.Condition()
+        self.error = None  # what stopped the transmit thread, raised by submit() and flush()
+
+        self.frames_submitted = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.transmit_time = 0.0  # seconds spent in SPI transfers
+        self.latencies = deque(maxlen=256)  # stamp -> last byte sent, seconds
+
+        self._thread = threading.Thread(target=self._transmit, name="lcd-sink", daemon=True)
+        self._thread.start()
+
+    def _copy_into_back(self, frame):
+        if hasattr(frame, "get_view"):  # pygame Surface, (w, h, 3) view
+            np.copyto(self._back, np.asarray(frame.get_view("3")).swapaxes(0, 1))
+        else:
+            np.copyto(self._back, np.asarray(frame))
+
+    def submit(self, frame, stamp=None):
+        """Queue a display-sized Surface, PIL image or array for transmission.
+
+        `stamp` is a time.perf_counter() value (e.g. when the input this frame
+        reacts to arrived); the delay until the frame is on the panel is then
+        recorded in `latencies`. Returns False when the frame was dropped
+        under the DROP_NEWEST policy. Raises the error that stopped the
+        transmit thread, if a transfer failed.
+        """
+        with self._cond:
+            self._raise_error()
+            self.frames_submitted += 1
+            if self._pending:
+                if self.policy == DROP_NEWEST:
+                    self.frames_dropped += 1
+                    return False
+                if self.policy == BLOCK:
+                    while self._pending and self._running:
+                        self._cond.wait()
+                    self._raise_error()
+                else:
+                    self.frames_dropped += 1  # the waiting frame is overwritten
+            self._copy_into_back(frame)
+            self._back_stamp = stamp
+            self._pending = True
+            self._cond.notify_all()
+        return True
+
+    def _transmit(self):
+        while True:
+            with self._cond:
+                while not self._pending and self._running:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                self._front, self._back = self._back, self._front
+                self._front_stamp, self._back_stamp = self._back_stamp, None
+                self._pending = False
+                self._cond.notify_all()
+
+            start = time.perf_counter()
+            try:
+                if self.dirty:
+                    self.disp.LCD_ShowImageDirty(self._front)
+                else:
+                    self.disp.LCD_ShowImage(self._front, 0, 0)
+            except Exception as error:
+                with self._cond:
+                    self.error = error
+                    self._running = False
+                    self._cond.notify_all()  # wake submit() and flush() so they raise it
+                return
+            done = time.perf_counter()
+            self.transmit_time += done - start
+            self.frames_sent += 1
+            if self._front_stamp is not None:
+                self.latencies.append(done - self._front_stamp)
+
+    def _raise_error(self):
+        # Called with the lock held
+        if self.error is not None:
+            raise self.error
+
+    def flush(self):
+        """Block until every submitted frame has been taken by the transmitter."""
+        with self._cond:
+            while self._pending and self._running:
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self):
+        """Send the last waiting frame, then stop the transmit thread."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
@@ -1,19 +1,52 @@
 import pygame
 import sys
 import random
-from PIL import Image
+from PIL import Image, ImageSequence
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 import textwrap
 import os
 import math
+import atexit
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import functools
+import hashlib
+import io
+import itertools
+import json
+import queue
+import struct
+import threading
+import time
 
 
 ### INITIALISATION
+# Display backend:
+#   "lcd"  - render off-screen (SDL dummy driver) and push frames straight to
+#            the Waveshare LCD over SPI from a background thread
+#   "fbcp" - draw to the X display and let fbcp mirror it onto the panel
+DISPLAY_BACKEND = os.environ.get("HANDHELD_DISPLAY", "fbcp")
+# Input:
+#   "gpio"     - HAT keys posted as pygame key events by gpio_input (no retrogame)
+#   "keyboard" - ordinary keyboard events (retrogame, or a desktop keyboard)
+INPUT_BACKEND = os.environ.get("HANDHELD_INPUT", "gpio" if DISPLAY_BACKEND == "lcd" else "keyboard")
+
+if DISPLAY_BACKEND == "lcd":
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+else:
+    os.environ["DISPLAY"] = ":0"
+
 # Pygame Initialization
 pygame.init()
 pygame.font.init()
 
-os.environ["DISPLAY"] = ":0"
-
 # If running as a script
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 
@@ -35,11 +68,240 @@ font_large = pygame.font.SysFont("Verdana", int(35 * SPRITE_SCALER))
 font_small = pygame.font.SysFont("Verdana", int(30 * SPRITE_SCALER))
 font = font_small
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
+if DISPLAY_BACKEND == "lcd":
+    import LCD_1in44
+    import lcd_sink
+
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    lcd = LCD_1in44.LCD()
+    lcd.LCD_Init(LCD_1in44.SCAN_DIR_DFT)
+    lcd.LCD_Clear()
+    lcd_output = lcd_sink.LCDSink(lcd)
+    lcd_frame = pygame.Surface((lcd.width, lcd.height), 0, screen)  # reused every frame
+    atexit.register(lcd.module_exit)
+    atexit.register(lcd_output.close)
+else:
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
+
+if INPUT_BACKEND == "gpio":
+    import gpio_input
+
+    if DISPLAY_BACKEND != "lcd":
+        import config
+    gpio_keys = gpio_input.GPIOInput(lcd if DISPLAY_BACKEND == "lcd" else config.RaspberryPi())
+    atexit.register(gpio_keys.close)
 pygame.display.set_caption("First Date Adventure")
 clock = pygame.time.Clock()
 
 pygame.mouse.set_visible(False)
+
+
+#--------------------PROFILING----------------------#
+# HANDHELD_PROFILE=1 times the hot paths of every frame and draws a rolling overlay;
+# HANDHELD_PROFILE_TRACE=trace.csv (or trace.json) also writes every frame's timings at exit.
+# On the lcd backend each frame also records spi_ms, the time the transmit thread spent
+# sending frames, so render-bound and SPI-bound frames can be told apart.
+PROFILE_TRACE = os.environ.get("HANDHELD_PROFILE_TRACE")
+PROFILE = os.environ.get("HANDHELD_PROFILE") == "1" or bool(PROFILE_TRACE)
+
+
+class FrameProfiler:
+    """
+    Wall-clock milliseconds per named section, collected per frame. A frame ends on every
+    present(), so the nested loops of text boxes and minigames are profiled as well.
+    """
+
+    def __init__(self, window=30, overlay=True):
+        self.window = window  # frames averaged by the overlay
+        self.overlay = overlay
+        self.frames = []  # one dict per presented frame
+        self.current = {}
+        self.open = []  # [name, start] of the sections still running, outermost first
+        self.frame_start = time.perf_counter()
+        self.font = None
+
+    @contextlib.contextmanager
+    def section(self, name):
+        entry = [name, time.perf_counter()]
+        self.open.append(entry)
+        try:
+            yield
+        finally:
+            self.open.pop()
+            self.add(name, entry[1])
+
+    def add(self, name, start):
+        self.current[name] = self.current.get(name, 0.0) + (time.perf_counter() - start) * 1000.0
+
+    def end_frame(self, scene, **counters):
+        now = time.perf_counter()
+        for entry in self.open:
+            # A section spanning several frames (a scene waiting in a text box) is split between them
+            self.add(entry[0], entry[1])
+            entry[1] = now
+        record = {"frame": len(self.frames), "scene": scene, "frame_ms": (now - self.frame_start) * 1000.0}
+        record.update(self.current)
+        record.update(counters)
+        self.frames.append(record)
+        self.current = {}
+        self.frame_start = now
+
+    def averages(self, frames=None):
+        """Mean value per frame of every section and counter over `frames`."""
+        frames = self.frames if frames is None else frames
+        totals = {}
+        for record in frames:
+            for name, value in record.items():
+                if name not in ("frame", "scene"):
+                    totals[name] = totals.get(name, 0.0) + value
+        return {name: total / max(len(frames), 1) for name, total in totals.items()}
+
+    def draw(self, surface):
+        """Draw the rolling averages in the top-left corner (small enough for the 128x128 panel)."""
+        if self.font is None:
+            self.font = pygame.font.SysFont("monospace", 9)
+        averages = self.averages(self.frames[-self.window:])
+        frame_ms = averages.pop("frame_ms", 0.0)
+        lines = ["{0:4.1f}fps {1:5.1f}ms".format(1000.0 / frame_ms if frame_ms else 0, frame_ms)]
+        lines += ["{0:<9}{1:5.1f}".format(name[:9], value) for name, value in sorted(averages.items())]
+        line_height = self.font.get_linesize()
+        width = max(self.font.size(line)[0] for line in lines) + 4
+        pygame.draw.rect(surface, BLACK, (0, 0, width, line_height * len(lines) + 4))
+        for i, line in enumerate(lines):
+            surface.blit(self.font.render(line, False, (0, 255, 0)), (2, 2 + i * line_height))
+
+    def dump(self, path):
+        """Write every frame's timings to `path`, as JSON if it ends in .json, otherwise CSV."""
+        if path.endswith(".json"):
+            with open(path, "w") as trace:
+                json.dump(self.frames, trace, indent=1)
+            return
+        columns = ["frame", "scene", "frame_ms"]
+        for record in self.frames:
+            columns += [name for name in record if name not in columns]
+        with open(path, "w", newline="") as trace:
+            writer = csv.DictWriter(trace, columns, restval=0.0)
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+
+class NullProfiler:
+    """Stands in for FrameProfiler when profiling is off."""
+
+    overlay = False
+
+    def section(self, name):
+        return NULL_SECTION
+
+    def end_frame(self, scene, **counters):
+        pass
+
+
+NULL_SECTION = contextlib.nullcontext()
+profiler = FrameProfiler() if PROFILE else NullProfiler()
+if PROFILE_TRACE:
+    atexit.register(lambda: profiler.dump(PROFILE_TRACE))
+
+
+def timed(name):
+    """Decorator adding every call of a function to the profiler's `name` section."""
+
+    def decorate(function):
+        if not PROFILE:
+            return function
+
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add(name, start)
+
+        return timed_function
+
+    return decorate
+
+
+lcd_seen = [0.0, 0]  # lcd_output transmit_time and frames_dropped already reported to the profiler
+
+
+def present():
+    """Show the finished frame: flip the display and, on the LCD backend, send it to the panel."""
+    if profiler.overlay and DISPLAY_BACKEND != "lcd":
+        with profiler.section("overlay"):
+            profiler.draw(screen)
+    with profiler.section("flip"):
+        pygame.display.flip()
+    if DISPLAY_BACKEND == "lcd":
+        with profiler.section("lcd"):
+            pygame.transform.smoothscale(screen, lcd_frame.get_size(), lcd_frame)
+            if profiler.overlay:
+                profiler.draw(lcd_frame)
+            lcd_output.submit(lcd_frame, time.perf_counter())
+        transmit_time, dropped = lcd_output.transmit_time, lcd_output.frames_dropped
+        profiler.end_frame(scene, spi_ms=(transmit_time - lcd_seen[0]) * 1000.0, frames_dropped=dropped - lcd_seen[1])
+        lcd_seen[:] = transmit_time, dropped
+    else:
+        profiler.end_frame(scene)
+
+
+def get_events():
+    """pygame.event.get(), recording key latency when the GPIO keys are in use."""
+    if INPUT_BACKEND == "gpio":
+        return gpio_keys.handled(pygame.event.get())
+    return pygame.event.get()
+
+
+def get_pressed():
+    """pygame.key.get_pressed(), or the GPIO key state when the HAT keys are in use."""
+    if INPUT_BACKEND == "gpio":
+        return gpio_keys.pressed()
+    return pygame.key.get_pressed()
+
+#--------------------TEXT----------------------#
+class TextCache:
+    """
+    Rendered text surfaces keyed by (font, text, antialias, colour), evicting the least
+    recently used once either limit is exceeded. The surfaces are shared: blit them, never
+    draw on them.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.surfaces = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, antialias, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        self.bytes += surface.get_bytesize() * surface.get_width() * surface.get_height()
+        while len(self.surfaces) > self.max_entries or (self.bytes > self.max_bytes and len(self.surfaces) > 1):
+            _, evicted = self.surfaces.popitem(last=False)
+            self.bytes -= evicted.get_bytesize() * evicted.get_width() * evicted.get_height()
+            self.evictions += 1
+        return surface
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, antialias, color):
+    """font.render() through the shared text cache."""
+    return text_cache.render(font, text, antialias, color)
+
+
 # Key State Initialization
 key_states = {"up_pressed": False, "down_pressed": False}
 
@@ -48,10 +310,37 @@ key_states = {"up_pressed": False, "down_pressed": False}
 
 #--------------------SPRITES----------------------#
 class SpriteManager:
+    """
+    Sprites by name. Sprites listed in a manifest are loaded lazily, on their first get(),
+    or ahead of time by prefetch(), which decodes and scales them in a thread pool and
+    leaves only convert_alpha() (which must run on the main thread) for get().
     
-    def __init__(self):
-        """Initialize the sprite manager with an empty dictionary."""
+    With a `cache_dir`, scaled manifest sprites are also written there as raw RGBA, keyed
+    by a hash of the source PNG, the target size and `scale`, and read back on later
+    starts instead of decoding and scaling the PNG again. A changed PNG or size simply
+    misses the cache and replaces the stale file.
+    """
+
+    def __init__(self, manifest=(), cache_dir=None, scale=1.0, variant_max_bytes=1024 * 1024):
+        """Initialize the sprite manager from a manifest of (name, path, size) entries.
+
+        `size` is (width, height) to scale to, or (None, height) to scale to that height
+        keeping the aspect ratio.
+        """
         self.sprites = {}
+        self.manifest = {name: (path, size) for name, path, size in manifest}
+        self.pending = {}  # name -> Future of the decoded, scaled but unconverted image
+        self.executor = None
+        self.cache_dir = cache_dir
+        self.scale = scale
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.variants = collections.OrderedDict()  # (name, size, flip, rotation) -> Surface
+        self.variant_max_bytes = variant_max_bytes
+        self.variant_bytes = 0
+        self.variant_hits = 0
+        self.variant_misses = 0
+        self.variant_evictions = 0
         
     def load(self, name, path, size=None):
         """Load and optionally scale a sprite."""
@@ -61,55 +350,165 @@ class SpriteManager:
             image = pygame.transform.scale(image, size)
         self.sprites[name] = image
         
-    def load_with_aspect_ratio(self, name, path, target_height):
-        """Load a sprite and scale it while maintaining the aspect ratio."""
-        full_path = os.path.join(BASE_PATH, path)  # Construct the full path
-        image = pygame.image.load(full_path).convert_alpha()
-        original_width, original_height = image.get_width(), image.get_height()
-        aspect_ratio = original_width / original_height
-        scaled_width = int(target_height * aspect_ratio)
-        scaled_image = pygame.transform.scale(image, (scaled_width, target_height))
-        self.sprites[name] = scaled_image
+    def decode(self, name):
+        """Load and scale a manifest entry without touching the display (safe in a worker thread)."""
+        path, (width, height) = self.manifest[name]
+        full_path = os.path.join(BASE_PATH, path)
+        if self.cache_dir is None:
+            image = pygame.image.load(full_path)
+        else:
+            with open(full_path, "rb") as source_file:
+                source = source_file.read()
+            cache_path = self.cache_path(name, source, (width, height))
+            cached = self.read_cache(cache_path)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+            image = pygame.image.load(io.BytesIO(source), path)
+        if width is None:
+            width = int(height * image.get_width() / image.get_height())
+        scaled_image = pygame.transform.scale(image, (width, height))
+        if self.cache_dir is not None:
+            self.write_cache(name, cache_path, scaled_image)
+        return scaled_image
+
+    def cache_path(self, name, source, size):
+        digest = hashlib.sha1(source).hexdigest()[:16]
+        size_key = "x".join("auto" if value is None else str(int(value)) for value in size)
+        return os.path.join(self.cache_dir, f"{name}-{digest}-{size_key}-{self.scale:g}.rgba")
+
+    def read_cache(self, cache_path):
+        """The cached sprite, or None if it is missing or unreadable."""
+        try:
+            with open(cache_path, "rb") as cache_file:
+                data = cache_file.read()
+        except OSError:
+            return None
+        if len(data) < SPRITE_CACHE_HEADER.size:
+            return None
+        width, height = SPRITE_CACHE_HEADER.unpack_from(data)
+        pixels = data[SPRITE_CACHE_HEADER.size:]
+        if len(pixels) != width * height * 4:
+            return None
+        return pygame.image.fromstring(pixels, (width, height), "RGBA")
+
+    def write_cache(self, name, cache_path, image):
+        """Store a scaled sprite, replacing any stale entry for the same name. Best effort."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for entry in os.listdir(self.cache_dir):
+                if entry.startswith(name + "-") and entry.endswith(".rgba"):
+                    os.remove(os.path.join(self.cache_dir, entry))
+            temporary_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as cache_file:
+                cache_file.write(SPRITE_CACHE_HEADER.pack(*image.get_size()))
+                cache_file.write(pygame.image.tostring(image, "RGBA"))
+            os.replace(temporary_path, cache_path)  # never leave a half-written entry behind
+        except OSError:
+            pass
+
+    def prefetch(self, names=None, workers=4):
+        """Start decoding manifest entries (all of them by default) in a thread pool."""
+        for name in self.manifest if names is None else names:
+            if name not in self.sprites and name not in self.pending:
+                if self.executor is None:
+                    self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sprite-decode")
+                self.pending[name] = self.executor.submit(self.decode, name)
+
+    def get_variant(self, name, size=None, flip=(False, False), rotation=0):
+        """
+        A scaled, flipped and/or rotated version of a manifest sprite, made once and kept in
+        a least-recently-used cache of at most variant_max_bytes. A new `size` is scaled from
+        the source PNG rather than the already-scaled sprite, so enlarging does not pixelate;
+        None keeps the sprite's own size. Variants are shared: blit them, never draw on them.
+        """
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        key = (name, size, (bool(flip[0]), bool(flip[1])), rotation % 360)
+        surface = self.variants.get(key)
+        if surface is not None:
+            self.variant_hits += 1
+            self.variants.move_to_end(key)
+            return surface
+        self.variant_misses += 1
+        if size is None:
+            surface = self.get(name)
+        else:
+            path, _ = self.manifest[name]
+            surface = pygame.transform.scale(pygame.image.load(os.path.join(BASE_PATH, path)).convert_alpha(), size)
+        if any(flip):
+            surface = pygame.transform.flip(surface, *key[2])
+        if key[3]:
+            surface = pygame.transform.rotate(surface, key[3])
+        self.variants[key] = surface
+        self.variant_bytes += self.variant_cost(key, surface)
+        while self.variant_bytes > self.variant_max_bytes and len(self.variants) > 1:
+            evicted_key, evicted = self.variants.popitem(last=False)
+            self.variant_bytes -= self.variant_cost(evicted_key, evicted)
+            self.variant_evictions += 1
+        return surface
+
+    def variant_cost(self, key, surface):
+        """Pixel bytes a cached variant adds; none if it is the sprite itself, which is only shared."""
+        if surface is self.sprites.get(key[0]):
+            return 0
+        return surface.get_bytesize() * surface.get_width() * surface.get_height()
 
     def get(self, name):
-        """Retrieve a sprite by name."""
+        """Retrieve a sprite by name, loading it first if it comes from the manifest."""
+        if name not in self.sprites:
+            if name in self.pending:
+                self.sprites[name] = self.pending.pop(name).result().convert_alpha()
+            elif name in self.manifest:
+                self.sprites[name] = self.decode(name).convert_alpha()
         return self.sprites.get(name)
 
-# Initialize Sprite Manager
-sprites = SpriteManager()
-
-# Load and scale sprites
-sprites.load("sam", "assets/sprites/sam_sprite.png", (SPRITE_WIDTH, SPRITE_HEIGHT))
-sprites.load("molly", "assets/sprites/molly_sprite.png", (SPRITE_WIDTH, SPRITE_HEIGHT))
-sprites.load("pub", "assets/sprites/LHA.png", (int(150 * SPRITE_SCALER), int(150 * SPRITE_SCALER)))
-sprites.load("bar", "assets/sprites/bar.png", (int(150 * SPRITE_SCALER), int(150 * SPRITE_SCALER)))
-sprites.load("table", "assets/sprites/table.png", (int(200 * SPRITE_SCALER), int(100 * SPRITE_SCALER)))
-sprites.load("door", "assets/sprites/door.png", (int(100 * SPRITE_SCALER), int(100 * SPRITE_SCALER)))
-sprites.load("house", "assets/sprites/house.png", (int(150 * SPRITE_SCALER), int(100 * SPRITE_SCALER)))
-sprites.load("maggie", "assets/sprites/mag.png", (int(SPRITE_WIDTH*1.5), int(SPRITE_HEIGHT*1.5)))
-sprites.load("mike", "assets/sprites/mike.png", (int(SPRITE_WIDTH*1.5), int(SPRITE_HEIGHT*1.5)))
-sprites.load("sofa", "assets/sprites/sofa.png", (int(200 * SPRITE_SCALER), int(100 * SPRITE_SCALER)))
-sprites.load("heart", "assets/sprites/heart.png", (SPRITE_WIDTH, SPRITE_HEIGHT))
-
-
-
-# Load the bike sprite with aspect ratio scaling
-sprites.load_with_aspect_ratio("bike", "assets/sprites/bike.png", SPRITE_HEIGHT)
-
-
-#call the sprites
-sam = sprites.get("sam")
-molly = sprites.get("molly")
-bike = sprites.get("bike")
-pub = sprites.get("pub")
-bar = sprites.get("bar")
-table = sprites.get("table")
-door = sprites.get("door")
-house = sprites.get("house")
-maggie = sprites.get("maggie")
-mike = sprites.get("mike")
-sofa = sprites.get("sofa")
-heart = sprites.get("heart")
+
+# (name, path, size): size is (width, height), or (None, height) to keep the aspect ratio
+SPRITE_MANIFEST = [
+    ("sam", "assets/sprites/sam_sprite.png", (SPRITE_WIDTH, SPRITE_HEIGHT)),
+    ("molly", "assets/sprites/molly_sprite.png", (SPRITE_WIDTH, SPRITE_HEIGHT)),
+    ("bike", "assets/sprites/bike.png", (None, SPRITE_HEIGHT)),
+    ("pub", "assets/sprites/LHA.png", (int(150 * SPRITE_SCALER), int(150 * SPRITE_SCALER))),
+    ("bar", "assets/sprites/bar.png", (int(150 * SPRITE_SCALER), int(150 * SPRITE_SCALER))),
+    ("table", "assets/sprites/table.png", (int(200 * SPRITE_SCALER), int(100 * SPRITE_SCALER))),
+    ("door", "assets/sprites/door.png", (int(100 * SPRITE_SCALER), int(100 * SPRITE_SCALER))),
+    ("house", "assets/sprites/house.png", (int(150 * SPRITE_SCALER), int(100 * SPRITE_SCALER))),
+    ("maggie", "assets/sprites/mag.png", (int(SPRITE_WIDTH*1.5), int(SPRITE_HEIGHT*1.5))),
+    ("mike", "assets/sprites/mike.png", (int(SPRITE_WIDTH*1.5), int(SPRITE_HEIGHT*1.5))),
+    ("sofa", "assets/sprites/sofa.png", (int(200 * SPRITE_SCALER), int(100 * SPRITE_SCALER))),
+    ("heart", "assets/sprites/heart.png", (SPRITE_WIDTH, SPRITE_HEIGHT)),
+]
+
+# Scaled sprites cached between boots; HANDHELD_SPRITE_CACHE picks the directory ("" turns it off).
+# Bump the version when the cache format or the scaling changes.
+SPRITE_CACHE_VERSION = 1
+SPRITE_CACHE_HEADER = struct.Struct("<II")  # width, height, then the RGBA pixels
+SPRITE_CACHE_DIR = os.environ.get(
+    "HANDHELD_SPRITE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "ourfirstdate-handheld", f"sprites-v{SPRITE_CACHE_VERSION}"),
+)
+
+# Initialize Sprite Manager; nothing is loaded yet, so the title screen shows straight away
+sprites = SpriteManager(SPRITE_MANIFEST, cache_dir=SPRITE_CACHE_DIR or None, scale=SPRITE_SCALER)
+
+
+def bind_sprites():
+    """Set the module-level sprites the scenes draw with; called when leaving the title screen."""
+    global sam, molly, bike, pub, bar, table, door, house, maggie, mike, sofa, heart
+    sam = sprites.get("sam")
+    molly = sprites.get("molly")
+    bike = sprites.get("bike")
+    pub = sprites.get("pub")
+    bar = sprites.get("bar")
+    table = sprites.get("table")
+    door = sprites.get("door")
+    house = sprites.get("house")
+    maggie = sprites.get("maggie")
+    mike = sprites.get("mike")
+    sofa = sprites.get("sofa")
+    heart = sprites.get("heart")
 
 # Adjusted starting positions for sprites on the 128x128 screen
 sam_pos = pygame.Vector2(int(30 * SPRITE_SCALER), HEIGHT // 2 - int(40 * SPRITE_SCALER))  # Sam's position, slightly left and vertically centered
@@ -124,6 +523,7 @@ bike_pos = pygame.Vector2(
 )
 
 # Function to draw sprites
+@timed("draw_sprite")
 def draw_sprite(sprite, position):
     """Draw a sprite at a given position."""
     screen.blit(sprite, position)
@@ -131,12 +531,159 @@ def draw_sprite(sprite, position):
 
 
 #--------------------GRAPHICS----------------------#
+class GifCache:
+    """
+    GIF frames decoded once and scaled to the size they are shown at, together with their
+    durations. prefetch() decodes in a background thread, so scene_1 can get LHA.gif ready
+    while the player cycles and scene_2 plays it straight away; get() decodes in place if
+    nothing was prefetched, and converts the frames to the display format on the main thread.
+    """
+
+    def __init__(self):
+        self.futures = {}  # (path, size) -> Future of (frames, durations), not yet converted
+        self.converted = {}  # (path, size) -> (frames, durations) in the display format
+        self.executor = None
+        self.decode_seconds = {}
+
+    def prefetch(self, path, size=None):
+        key = (path, size)
+        if key not in self.futures and key not in self.converted:
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gif-decode")
+            self.futures[key] = self.executor.submit(self.decode, path, size)
+
+    def get(self, path, size=None):
+        """(frames, durations) for the GIF at `path`, scaled to `size` (None keeps the GIF's own size)."""
+        key = (path, size)
+        if key not in self.converted:
+            if key not in self.futures:
+                future = concurrent.futures.Future()
+                future.set_result(self.decode(path, size))
+                self.futures[key] = future
+            frames, durations = self.futures.pop(key).result()
+            self.converted[key] = [frame.convert_alpha() for frame in frames], durations
+        return self.converted[key]
+
+    def decode(self, path, size):
+        """Decode and scale every frame; runs on the prefetch thread, so nothing here converts."""
+        start = time.perf_counter()
+        gif = Image.open(path)
+        frames = []
+        durations = []
+        for frame in range(gif.n_frames):
+            gif.seek(frame)
+            surface = pygame.image.fromstring(gif.tobytes(), gif.size, gif.mode)
+            if size is not None and surface.get_size() != size:
+                surface = pygame.transform.scale(surface, size)
+            frames.append(surface)
+            # Default 400ms per frame; zero-length frames would never let the playhead catch up
+            durations.append(max(gif.info.get("duration", 400), 10))
+        self.decode_seconds[(path, size)] = time.perf_counter() - start
+        return frames, durations
+
+    def memory_bytes(self):
+        """Pixel memory held by every finished decode."""
+        decoded = [frames for frames, _ in self.converted.values()]
+        decoded += [future.result()[0] for future in self.futures.values() if future.done()]
+        return sum(frame.get_bytesize() * frame.get_width() * frame.get_height() for frames in decoded for frame in frames)
+
+
+gif_cache = GifCache()
+
+
+class GifStream:
+    """
+    A GIF played without decoding it up front: frames come off PIL's ImageSequence iterator
+    in order and wait in a queue of at most `ahead` frames, so memory stays the same however
+    long the animation is and the first frame costs a single decode. With `threaded` a worker
+    thread keeps the queue topped up; without it each frame is decoded when the playhead
+    reaches it. Frames are converted to the display format on the main thread, in frame_at(),
+    and an error in the worker is raised there too. The animation loops until close().
+    """
+
+    def __init__(self, path, size=None, ahead=3, threaded=True):
+        self.path = path
+        self.size = size
+        self.frames = self.decode()
+        self.current = None
+        self.end = 0  # ms into playback at which the current frame stops being shown
+        self.decoded = 0
+        self.error = None  # what stopped the worker, raised again by frame_at()
+        self.running = True
+        self.queue = queue.Queue(maxsize=ahead) if threaded else None
+        self.worker = None
+        if threaded:
+            self.worker = threading.Thread(target=self.fill, name="gif-stream", daemon=True)
+            self.worker.start()
+
+    def decode(self):
+        """(surface, duration) for every frame, starting over at the end; the surfaces are not converted."""
+        while True:
+            with Image.open(self.path) as gif:
+                for frame in ImageSequence.Iterator(gif):
+                    surface = pygame.image.fromstring(frame.tobytes(), frame.size, frame.mode)
+                    if self.size is not None and surface.get_size() != self.size:
+                        surface = pygame.transform.scale(surface, self.size)
+                    self.decoded += 1
+                    # Default 400ms per frame; zero-length frames would never let the playhead catch up
+                    yield surface, max(frame.info.get("duration", 400), 10)
+
+    def fill(self):
+        try:
+            for item in self.frames:
+                if not self.put(item):
+                    return
+        except Exception as error:
+            self.error = error
+            self.put(None)  # tells frame_at() to raise the error rather than wait for a frame
+
+    def put(self, item):
+        """Queue `item` once there is room, unless close() is called first; True if it was queued."""
+        while self.running:
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def frame_at(self, elapsed):
+        """
+        The frame on show `elapsed` ms into playback and the ms until it changes. Frames
+        whose time has already passed are decoded and dropped rather than shown late.
+        """
+        frame = None
+        while frame is None and self.current is None or self.end <= elapsed:
+            item = self.queue.get() if self.queue else next(self.frames)
+            if item is None:
+                raise self.error
+            frame, frame_duration = item
+            self.end += frame_duration
+        if frame is not None:
+            self.current = frame.convert_alpha()
+        return self.current, self.end - elapsed
+
+    def close(self):
+        self.running = False
+        if self.worker is not None:
+            self.worker.join()
+        self.frames.close()
+
+
 # Function to load and display a GIF prior to actionable gameplay
 import pygame
 from PIL import Image
 import os
 
-def display_gif(screen, gif_path, duration=500, center=None):
+def gif_frame_at(frame_ends, elapsed):
+    """
+    Index of the frame on show `elapsed` ms into a looping animation, found by bisecting the
+    cumulative frame end times (itertools.accumulate of the durations) in O(log n). Frames
+    whose time has already passed are skipped rather than shown late.
+    """
+    return bisect.bisect_right(frame_ends, elapsed % frame_ends[-1])
+
+def display_gif(screen, gif_path, duration=500, center=None, stream=False):
     """
     Displays an animated GIF on the screen for a specified duration.
     
@@ -145,31 +692,25 @@ def display_gif(screen, gif_path, duration=500, center=None):
         gif_path (str): Path to the GIF file.
         duration (int): Duration to display the GIF in milliseconds.
         center (tuple): Center coordinates for the GIF display (default is screen center).
+        stream (bool): Decode frames just ahead of playback with a GifStream instead of
+            playing the whole GIF from the GifCache.
     
     Returns:
         None
     """
-    # Load the GIF using Pillow
-    gif = Image.open(gif_path)
-    frames = []
-    frame_durations = []
-
-    # Extract each frame and its duration
-    for frame in range(gif.n_frames):
-        gif.seek(frame)
-        frame_surface = pygame.image.fromstring(
-            gif.tobytes(), gif.size, gif.mode
-        ).convert_alpha()
-        frames.append(frame_surface)
-        frame_durations.append(gif.info.get("duration", 400))  # Default 400ms per frame
-
-    # Scale each frame to fit the screen size
-    scaled_frames = []
-    for frame in frames:
-        scaled_frame = pygame.transform.scale(frame, (screen.get_width(), screen.get_height()))
-        scaled_frames.append(scaled_frame)
-
-    current_frame = 0
+    if stream:
+        # Frames decoded and scaled a few ahead of the playhead, never all held at once
+        playback = GifStream(gif_path, screen.get_size())
+        frame_at = playback.frame_at
+    else:
+        # Frames decoded and scaled to fit the screen once, ahead of time if scene_1 prefetched them
+        scaled_frames, frame_durations = gif_cache.get(gif_path, screen.get_size())
+        frame_ends = list(itertools.accumulate(frame_durations))  # when each frame stops being shown
+
+        def frame_at(elapsed):
+            current_frame = gif_frame_at(frame_ends, elapsed)
+            return scaled_frames[current_frame], frame_ends[current_frame] - elapsed % frame_ends[-1]
+
     start_time = pygame.time.get_ticks()
     gif_displayed = False
 
@@ -178,51 +719,273 @@ def display_gif(screen, gif_path, duration=500, center=None):
         center = (screen.get_width() // 2, screen.get_height() // 2)
 
     # Display the animated GIF
-    while not gif_displayed:
-        current_time = pygame.time.get_ticks()
-
-        # Determine elapsed time
-        elapsed_time = current_time - start_time
-        if elapsed_time < duration:
-            # Determine the current frame to display
-            total_duration = sum(frame_durations[: current_frame + 1])
-            if elapsed_time > total_duration:
-                current_frame = (current_frame + 1) % len(scaled_frames)
-
-            # Display the current frame (scaled)
-            screen.fill((0, 0, 0))  # Clear the screen
-            screen.blit(scaled_frames[current_frame], (0, 0))  # Blit scaled frame to fill the screen
-            pygame.display.flip()
-        else:
-            gif_displayed = True  # Mark the GIF as displayed
+    try:
+        while not gif_displayed:
+            current_time = pygame.time.get_ticks()
+
+            # Determine elapsed time
+            elapsed_time = current_time - start_time
+            if elapsed_time < duration:
+                # Determine the current frame to display, skipping ahead if the loop fell behind
+                frame, _ = frame_at(elapsed_time)
+
+                # Display the current frame (scaled)
+                screen.fill((0, 0, 0))  # Clear the screen
+                screen.blit(frame, (0, 0))  # Blit scaled frame to fill the screen
+                present()
+            else:
+                gif_displayed = True  # Mark the GIF as displayed
 
-        # Handle events to allow quitting
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
+            # Handle events to allow quitting
+            for event in get_events():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    exit()
+    finally:
+        if stream:
+            playback.close()
 
 # Example usage
 gif_path = os.path.join(BASE_PATH,"assets", "GIFs", "LHA.gif")
 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
+# Transition engine
+class Transitions:
+    """
+    Scene transitions driven by elapsed time: a fade, wipe or crossfade lasts `duration`
+    seconds however slow the LCD path is; a slow frame just means fewer steps. Each step
+    is the outgoing snapshot with the cover (a colour, or the incoming scene) blended or
+    wiped over it. The snapshot and cover surfaces are allocated on first use and reused
+    by every later transition; `allocations` counts them.
+    """
+
+    def __init__(self, fps=30):
+        self.fps = fps
+        self.surfaces = {}
+        self.allocations = 0
+
+    def surface(self, name):
+        """The reusable screen-sized surface `name`."""
+        surface = self.surfaces.get(name)
+        if surface is None or surface.get_size() != screen.get_size():
+            surface = self.surfaces[name] = pygame.Surface(screen.get_size()).convert()
+            self.allocations += 1
+        return surface
+
+    def run(self, kind="fade", duration=0.85, color=BLACK, incoming=None):
+        """
+        Play a transition away from what is on the screen now.
+
+        Args:
+            kind (str): "fade" to `color`, "wipe" of `color` in from the left, or "crossfade" to `incoming`.
+            duration (float): Length in seconds.
+            color (tuple): Colour faded or wiped to.
+            incoming (pygame.Surface): The incoming scene, for a crossfade.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If `kind` is unknown, or a crossfade has no `incoming` scene.
+        """
+        if kind not in ("fade", "wipe", "crossfade"):
+            raise ValueError(f"unknown transition: {kind}")
+        if kind == "crossfade" and incoming is None:
+            raise ValueError("a crossfade needs the incoming scene")
+        outgoing = self.surface("outgoing")
+        outgoing.blit(screen, (0, 0))
+        cover = self.surface("cover")
+        if kind == "crossfade":
+            cover.blit(incoming, (0, 0))
+        else:
+            cover.fill(color)
+
+        start = pygame.time.get_ticks()
+        progress = 0.0
+        while progress < 1.0:
+            progress = min((pygame.time.get_ticks() - start) / (duration * 1000.0), 1.0)
+            screen.blit(outgoing, (0, 0))
+            if kind == "wipe":
+                screen.blit(cover, (0, 0), (0, 0, round(screen.get_width() * progress), screen.get_height()))
+            else:
+                cover.set_alpha(round(255 * progress))
+                screen.blit(cover, (0, 0))
+            present()
+            clock.tick(self.fps)  # waits out the rest of the frame, however long this one took
+        cover.set_alpha(None)
+
+
+transitions = Transitions()
+
+
 # Transition Function
-# Animated transition between scenes
-def scene_transition():
-    for alpha in range(0, 256, 10):
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(alpha)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
-        pygame.display.flip()
-        clock.tick(30)
+# Animated transition between scenes, a fade to black unless `kind` says otherwise
+def scene_transition(kind="fade", duration=0.85):
+    transitions.run(kind, duration)
+    
+class Bubbles:
+    """
+    The bubbles of a row of beers, pooled: every beer has `capacity` slots that are allocated
+    once, a free list of the slots it is not using, and a list of the live slots across all the
+    beers, so a bubble is never allocated or freed. spawn() is called per beer as its glass is
+    drawn; step() then moves, clamps, retires and draws the bubbles of every beer in one pass.
+    New bubbles come from `rng`, the `random` module unless a seeded random.Random is passed in,
+    so they repeat exactly.
+    """
 
-    # Clear screen at the end of the transition
-    screen.fill(BLACK)
-    pygame.display.flip()
-    clock.tick(30)
+    def __init__(self, count, capacity=32, rng=random, radius=int(4 * SPRITE_SCALER)):
+        self.capacity = capacity
+        self.rng = rng
+        self.radius = radius
+        self.dot = pygame.Surface((2 * radius + 1, 2 * radius + 1)).convert()
+        self.dot.set_colorkey(BLACK)
+        pygame.draw.circle(self.dot, WHITE, (radius, radius), radius)
+        # A bubble is the rect its dot is blitted to, and a drift; beer b owns slots b * capacity onwards
+        self.rects = [self.dot.get_rect() for _ in range(count * capacity)]
+        self.blits = [(self.dot, rect) for rect in self.rects]
+        self.dx = [0] * (count * capacity)
+        # Each beer's bounds for those rects
+        self.left = [0] * count
+        self.right = [0] * count
+        self.top = [0] * count
+        self.free = [list(range((beer + 1) * capacity - 1, beer * capacity - 1, -1)) for beer in range(count)]
+        self.live = []  # slots in use, oldest first
+        self.drawn = []  # their blits, kept in step with `live`
+        self.dropped = 0  # bubbles not spawned because their beer's pool was full
     
+    def clear(self, beer=None):
+        """Retire the bubbles of `beer`, or of every beer."""
+        if beer is None:
+            for beer in range(len(self.free)):
+                self.clear(beer)
+            return
+        if len(self.free[beer]) == self.capacity:
+            return  # Already empty
+        first = beer * self.capacity
+        keep = 0
+        for slot in self.live:
+            if first <= slot < first + self.capacity:
+                self.free[beer].append(slot)
+            else:
+                self.live[keep] = slot
+                self.drawn[keep] = self.blits[slot]
+                keep += 1
+        del self.live[keep:], self.drawn[keep:]
+
+    def spawn(self, beer, left, right, top, bottom):
+        """Maybe add a bubble to `beer`, whose bubbles stay within left..right and below `top`."""
+        radius = self.radius
+        self.left[beer], self.right[beer], self.top[beer] = left - radius, right - radius, top - radius
+        if self.rng.random() < 0.2:  # Probability of adding a bubble
+            x = self.rng.randint(left, right)
+            y = self.rng.randint(top, bottom)
+            dx = self.rng.choice((-1, 0, 1))  # Random horizontal drift
+            if self.free[beer]:
+                slot = self.free[beer].pop()
+                self.rects[slot].x, self.rects[slot].y = x - radius, y - radius
+                self.dx[slot] = dx
+                self.live.append(slot)
+                self.drawn.append(self.blits[slot])
+            else:
+                self.dropped += 1
+
+    def step(self, surface):
+        """Move every bubble up one pixel and along its drift, retire those that leave their beer, and draw the rest."""
+        rects, live, drawn = self.rects, self.live, self.drawn
+        keep = 0
+        for slot in live:
+            beer = slot // self.capacity
+            rect = rects[slot]
+            rect.y -= 1  # Move upward
+            if rect.y <= self.top[beer]:
+                self.free[beer].append(slot)  # Left the orange part
+                continue
+            # Apply horizontal drift, keeping bubbles within the beer width
+            rect.x = max(self.left[beer], min(rect.x + self.dx[slot], self.right[beer]))
+            live[keep] = slot
+            drawn[keep] = self.blits[slot]
+            keep += 1
+        del live[keep:], drawn[keep:]
+        surface.blits(drawn, doreturn=False)
+
+class BeerGlasses:
+    """
+    The scaled beer glasses: where each of a row of beers goes on the screen, and each glass in
+    its four fill states (0: full, 1: 2/3 full, 2: 1/3 full, 3: empty), worked out and drawn
+    once into a surface the size of the glass, so drawing a beer is one blit.
+    """
+
+    KEY = (255, 0, 255)  # transparent; not a colour any glass uses
+
+    def __init__(self):
+        self.layouts = {}  # number of beers -> their scaled rects
+        self.surfaces = {}  # (width, height, state) -> surface
+        self.renders = 0
+
+    def layout(self, count):
+        """The scaled rects of a row of `count` beers, centred on the screen."""
+        rects = self.layouts.get(count)
+        if rects is None:
+            # Positioning and scaling factors
+            beer_width = int(60 * SPRITE_SCALER)  # Increase beer width (scaled)
+            beer_height = int(120 * SPRITE_SCALER)  # Increase beer height (scaled)
+            gap_between_beers = int(20 * SPRITE_SCALER)  # Increase gap between beers
+
+            # Centering the beers horizontally
+            total_beer_width = count * (beer_width + gap_between_beers) - gap_between_beers  # Total width of all beers including gaps
+            start_x = (WIDTH - total_beer_width) // 2  # Starting x position to center the beers
+            beer_y = HEIGHT // 2 - beer_height // 2  # Vertically center the beers
+            rects = self.layouts[count] = [
+                pygame.Rect(start_x + i * (beer_width + gap_between_beers), beer_y, beer_width, beer_height)
+                for i in range(count)
+            ]
+        return rects
+
+    @staticmethod
+    def orange(beer, state):
+        """The (top, height) of the orange content of `beer` in `state`, or None when it is empty."""
+        if state == 0:  # Full beer
+            return beer.y, beer.height
+        if state == 1:  # 2/3 full beer
+            return beer.y + beer.height // 3, beer.height * 2 // 3
+        if state == 2:  # 1/3 full beer
+            return beer.y + beer.height * 2 // 3, beer.height // 3
+        return None  # Empty beer: no orange content
+
+    def render(self, surface, scaled_beer, state):
+        """Draw the glass `scaled_beer` in `state` onto `surface`."""
+        # Draw beer outline (scaled)
+        pygame.draw.rect(surface, BLACK, scaled_beer, 2)  # Black outline
+
+        # Draw orange content and white line (scaled based on state)
+        orange = self.orange(scaled_beer, state)
+        if state == 0:  # Full beer
+            pygame.draw.rect(surface, ORANGE, scaled_beer.inflate(-2 * SPRITE_SCALER, -2 * SPRITE_SCALER))
+            pygame.draw.rect(surface, WHITE, (scaled_beer.x + 2 * SPRITE_SCALER, scaled_beer.y + 2 * SPRITE_SCALER, scaled_beer.width - 4 * SPRITE_SCALER, 12 * SPRITE_SCALER))  # White line at the top
+        elif orange is not None:  # 2/3 or 1/3 full beer
+            orange_top, orange_height = orange
+            pygame.draw.rect(surface, ORANGE, (scaled_beer.x + 2 * SPRITE_SCALER, orange_top, scaled_beer.width - 4 * SPRITE_SCALER, orange_height))
+            pygame.draw.rect(surface, WHITE, (scaled_beer.x + 2 * SPRITE_SCALER, orange_top - 3 * SPRITE_SCALER, scaled_beer.width - 4 * SPRITE_SCALER, 12 * SPRITE_SCALER))  # White line just above orange
+        else:  # Empty beer
+            pygame.draw.rect(surface, BLACK, scaled_beer.inflate(-2 * SPRITE_SCALER, -2 * SPRITE_SCALER), 2)  # Thin black outline, no fill
+
+    def draw(self, scaled_beer, state):
+        """Draw the glass `scaled_beer` in `state` on the screen."""
+        key = (scaled_beer.width, scaled_beer.height, state)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = pygame.Surface(scaled_beer.size).convert()
+            surface.fill(self.KEY)
+            surface.set_colorkey(self.KEY)
+            self.render(surface, pygame.Rect((0, 0), scaled_beer.size), state)
+            self.renders += 1
+        screen.blit(surface, scaled_beer)
+
+
+beer_glasses = BeerGlasses()
+
+@timed("draw_beers")
 def draw_beers(beers, beer_states, bubbles):
     """
     Draws beers on the screen with their current states and animations.
@@ -230,86 +993,28 @@ def draw_beers(beers, beer_states, bubbles):
     Args:
         beers (list): List of beer rectangles.
         beer_states (list): List of states for each beer (0: full, 1: 2/3 full, 2: 1/3 full, 3: empty).
-        bubbles (list): List of bubble animations for each beer.
+        bubbles (Bubbles): The bubbles in each beer.
 
     Returns:
         None
     """
-    # Positioning and scaling factors
-    beer_width = int(60 * SPRITE_SCALER)  # Increase beer width (scaled)
-    beer_height = int(120 * SPRITE_SCALER)  # Increase beer height (scaled)
-    gap_between_beers = int(20 * SPRITE_SCALER)  # Increase gap between beers
-    
-    # Centering the beers horizontally
-    total_beer_width = len(beers) * (beer_width + gap_between_beers) - gap_between_beers  # Total width of all beers including gaps
-    start_x = (WIDTH - total_beer_width) // 2  # Starting x position to center the beers
-    
-    # Loop through each beer and draw it
-    for i, beer in enumerate(beers):
-        # Calculate the position for each beer
-        beer_x = start_x + i * (beer_width + gap_between_beers)
-        beer_y = HEIGHT // 2 - beer_height // 2  # Vertically center the beers
-        
-        # Scale the beer rectangle and its content
-        scaled_beer = pygame.Rect(beer_x, beer_y, beer_width, beer_height)
-        
-        # Draw beer outline (scaled)
-        pygame.draw.rect(screen, BLACK, scaled_beer, 2)  # Black outline
+    # Loop through each beer and draw it at its scaled place
+    for i, scaled_beer in enumerate(beer_glasses.layout(len(beers))):
         state = beer_states[i]
-
-        # Draw orange content and white line (scaled based on state)
-        if state == 0:  # Full beer
-            orange_top = scaled_beer.y
-            orange_height = scaled_beer.height
-            pygame.draw.rect(screen, ORANGE, scaled_beer.inflate(-2 * SPRITE_SCALER, -2 * SPRITE_SCALER))
-            pygame.draw.rect(screen, WHITE, (scaled_beer.x + 2 * SPRITE_SCALER, scaled_beer.y + 2 * SPRITE_SCALER, scaled_beer.width - 4 * SPRITE_SCALER, 12 * SPRITE_SCALER))  # White line at the top
-        elif state == 1:  # 2/3 full beer
-            orange_top = scaled_beer.y + scaled_beer.height // 3
-            orange_height = scaled_beer.height * 2 // 3
-            pygame.draw.rect(screen, ORANGE, (scaled_beer.x + 2 * SPRITE_SCALER, orange_top, scaled_beer.width - 4 * SPRITE_SCALER, orange_height))
-            pygame.draw.rect(screen, WHITE, (scaled_beer.x + 2 * SPRITE_SCALER, orange_top - 3 * SPRITE_SCALER, scaled_beer.width - 4 * SPRITE_SCALER, 12 * SPRITE_SCALER))  # White line just above orange
-        elif state == 2:  # 1/3 full beer
-            orange_top = scaled_beer.y + scaled_beer.height * 2 // 3
-            orange_height = scaled_beer.height // 3
-            pygame.draw.rect(screen, ORANGE, (scaled_beer.x + 2 * SPRITE_SCALER, orange_top, scaled_beer.width - 4 * SPRITE_SCALER, orange_height))
-            pygame.draw.rect(screen, WHITE, (scaled_beer.x + 2 * SPRITE_SCALER, orange_top - 3 * SPRITE_SCALER, scaled_beer.width - 4 * SPRITE_SCALER, 12 * SPRITE_SCALER))  # White line just above orange
-        elif state == 3:  # Empty beer
-            orange_top = None  # No orange content
-            orange_height = 0
-            pygame.draw.rect(screen, BLACK, scaled_beer.inflate(-2 * SPRITE_SCALER, -2 * SPRITE_SCALER), 2)  # Thin black outline, no fill
-
-        # Add and animate bubbles (scaled)
-        if orange_top is not None:  # Only beers with orange content have bubbles
-            # Add new bubbles randomly within the orange part
-            if random.random() < 0.2:  # Probability of adding a bubble
-                # Ensure bubbles spawn within the scaled beer bounds
-                x = random.randint(int(scaled_beer.x + 3 * SPRITE_SCALER), int(scaled_beer.x + scaled_beer.width - 3 * SPRITE_SCALER))
-                y = random.randint(int(orange_top), int(orange_top + orange_height - 3 * SPRITE_SCALER))
-                dx = random.choice([-1, 0, 1])  # Random horizontal drift
-                bubbles[i].append([x, y, dx])  # Bubble has x, y, and horizontal drift
-
-            # Move bubbles upward and horizontally, remove those that leave the orange part
-            for bubble in bubbles[i]:
-                bubble[0] += bubble[2]  # Apply horizontal drift
-                bubble[1] -= 1  # Move upward
-
-                # Keep bubbles within the beer width and height (bounds check)
-                if bubble[0] < scaled_beer.x + 3 * SPRITE_SCALER or bubble[0] > scaled_beer.x + scaled_beer.width - 3 * SPRITE_SCALER:
-                    bubble[0] = max(scaled_beer.x + 3 * SPRITE_SCALER, min(bubble[0], scaled_beer.x + scaled_beer.width - 3 * SPRITE_SCALER))
-
-                # Keep bubbles within the height of the beer's orange content
-                if bubble[1] < orange_top:
-                    bubble[1] = orange_top  # Stop bubbles from going below the orange content
-
-            # Remove bubbles that leave the orange part
-            bubbles[i] = [bubble for bubble in bubbles[i] if bubble[1] > orange_top]
-
-            # Draw bubbles (scaled and larger)
-            for x, y, _ in bubbles[i]:
-                pygame.draw.circle(screen, WHITE, (int(x), int(y)), int(4 * SPRITE_SCALER))  # Larger bubble size
+        beer_glasses.draw(scaled_beer, state)
+
+        # Add bubbles randomly within the orange part (scaled); only beers with orange content have bubbles
+        orange = beer_glasses.orange(scaled_beer, state)
+        if orange is not None:
+            orange_top, orange_height = orange
+            # Ensure bubbles spawn and stay within the scaled beer bounds
+            bubbles.spawn(i, int(scaled_beer.x + 3 * SPRITE_SCALER), int(scaled_beer.x + scaled_beer.width - 3 * SPRITE_SCALER),
+                          int(orange_top), int(orange_top + orange_height - 3 * SPRITE_SCALER))
         else:
-            # Clear bubbles if the beer is empty
-            bubbles[i] = []
+            bubbles.clear(i)  # Clear bubbles if the beer is empty
+
+    # Move and draw the bubbles of all the beers together (each stays inside its own glass)
+    bubbles.step(screen)
 
 beer_states = [1, 1, 1, 1, 1]  # All beers start as full
 
@@ -325,22 +1030,22 @@ def take_picture():
     - Displays the snapshot image on a white background with a black scene.
     """
     # Display the instruction (scaled font size)
-    instruction = font_small.render("Press KEY 3", True, WHITE)
+    instruction = render_text(font_small, "Press KEY 3", True, WHITE)
     screen.blit(instruction, (WIDTH // 2 - instruction.get_width() // 2, int(20 * SPRITE_SCALER)))  # Centered at the top (scaled)
 
-    pygame.display.flip()
+    present()
 
     # Wait for the ENTER key
     waiting = True
     while waiting:
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
                 # Flash the screen white
                 screen.fill(WHITE)
-                pygame.display.flip()
+                present()
                 pygame.time.wait(200)  # Wait 200ms
                 waiting = False  # Exit the loop
 
@@ -363,7 +1068,7 @@ def take_picture():
     snapshot_image = pygame.image.load(snapshot_path)
     snapshot_image = pygame.transform.scale(snapshot_image, (picture_width, picture_height))
     screen.blit(snapshot_image, (picture_x, picture_y))
-    pygame.display.flip()  # Update the screen to show the image
+    present()  # Update the screen to show the image
 
 
 #--------------------DIALOGUE----------------------#
@@ -393,42 +1098,44 @@ def text_box(*lines):
     box_active = True
 
     while box_active:
-        # Clear the dialog surface
-        dialog_surface.fill((0, 0, 0, 0))  # Transparent background
-
-        # Draw the box on the surface
-        pygame.draw.rect(dialog_surface, WHITE, (0, 0, box_width, box_height))
-        pygame.draw.rect(dialog_surface, BLACK, (int(10 * SPRITE_SCALER), int(10 * SPRITE_SCALER), box_width - int(20 * SPRITE_SCALER), box_height - int(20 * SPRITE_SCALER)))
-
-        # Render and display the current box's lines
-        if current_box_index < len(processed_boxes):
-            current_box = processed_boxes[current_box_index]
-            for i, line in enumerate(current_box):
-                text_surface = font.render(line, True, WHITE)
-                dialog_surface.blit(text_surface, (int(20 * SPRITE_SCALER), int(20 * SPRITE_SCALER) + i * line_height))
-
-        # Draw the down arrow if there are more boxes to display
-        # Coordinates for a downward-pointing triangle
-       # Smaller coordinates for the downward-pointing triangle (down arrow)
-        down_arrow_coords = [
-            (box_width - int(40 * SPRITE_SCALER), box_height - int((35 * SPRITE_SCALER) + 0)),  # Top point of the arrow
-            (box_width - int(30 * SPRITE_SCALER), box_height - int((45 * SPRITE_SCALER) + 0)),  # Left corner of the arrow
-            (box_width - int(50 * SPRITE_SCALER), box_height - int((45 * SPRITE_SCALER) + 0)),  # Right corner of the arrow
-        ]
-
-        # Draw the down arrow using a polygon
-        pygame.draw.polygon(dialog_surface, WHITE, down_arrow_coords)
+        # Only the drawing is profiled; the rest of the loop is waiting for a key
+        with profiler.section("text_box"):
+            # Clear the dialog surface
+            dialog_surface.fill((0, 0, 0, 0))  # Transparent background
+
+            # Draw the box on the surface
+            pygame.draw.rect(dialog_surface, WHITE, (0, 0, box_width, box_height))
+            pygame.draw.rect(dialog_surface, BLACK, (int(10 * SPRITE_SCALER), int(10 * SPRITE_SCALER), box_width - int(20 * SPRITE_SCALER), box_height - int(20 * SPRITE_SCALER)))
+
+            # Render and display the current box's lines
+            if current_box_index < len(processed_boxes):
+                current_box = processed_boxes[current_box_index]
+                for i, line in enumerate(current_box):
+                    text_surface = render_text(font, line, True, WHITE)
+                    dialog_surface.blit(text_surface, (int(20 * SPRITE_SCALER), int(20 * SPRITE_SCALER) + i * line_height))
+
+            # Draw the down arrow if there are more boxes to display
+            # Coordinates for a downward-pointing triangle
+           # Smaller coordinates for the downward-pointing triangle (down arrow)
+            down_arrow_coords = [
+                (box_width - int(40 * SPRITE_SCALER), box_height - int((35 * SPRITE_SCALER) + 0)),  # Top point of the arrow
+                (box_width - int(30 * SPRITE_SCALER), box_height - int((45 * SPRITE_SCALER) + 0)),  # Left corner of the arrow
+                (box_width - int(50 * SPRITE_SCALER), box_height - int((45 * SPRITE_SCALER) + 0)),  # Right corner of the arrow
+            ]
+
+            # Draw the down arrow using a polygon
+            pygame.draw.polygon(dialog_surface, WHITE, down_arrow_coords)
 
         
-        #down_arrow = font.render("↓", True, WHITE)
-        #dialog_surface.blit(down_arrow, (box_width - int(40 * SPRITE_SCALER), box_height - int((35 * SPRITE_SCALER)+5)))
+            #down_arrow = font.render("↓", True, WHITE)
+            #dialog_surface.blit(down_arrow, (box_width - int(40 * SPRITE_SCALER), box_height - int((35 * SPRITE_SCALER)+5)))
 
-        # Blit the dialog surface onto the main screen
-        screen.blit(dialog_surface, (box_x, box_y))
-        pygame.display.flip()
+            # Blit the dialog surface onto the main screen
+            screen.blit(dialog_surface, (box_x, box_y))
+        present()
 
         # Event handling
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
@@ -444,16 +1151,121 @@ def text_box(*lines):
                         current_box_index -= 1
 
     # Clear the dialog box by not blitting the surface after the loop ends
-    pygame.display.flip()
+    present()
 
 dialog_triggered = False  # Add a flag to control dialog triggering
 
+class Fireworks:
+    """
+    The finale's fireworks as one particle system. Rockets are few and stay in a list; the
+    particles of every burst share contiguous NumPy arrays (position, velocity, lifetime,
+    colour) that are updated together and compacted in place once some burn out, and are
+    drawn with one blits() call from a pre-drawn dot per colour. A colour not in the palette
+    passed in is added to it the first time a firework uses it.
+
+    Takes the same firework dicts as the list draw_fireworks() used to walk, via append().
+    """
+
+    def __init__(self, colors, burst=30, spread=7 * SPRITE_SCALER, lifetime=(10, 30),
+                 radius=int(4 * SPRITE_SCALER), rocket_radius=int(6 * SPRITE_SCALER), capacity=512):
+        self.burst = burst
+        self.spread = spread
+        self.lifetime_range = lifetime
+        self.radius = radius
+        self.rocket_radius = rocket_radius
+        # Seeded from `random` so a seeded run repeats exactly
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.colors = []
+        self.color_indices = {}  # colour -> its index in colors and dots
+        self.dots = np.empty(0, dtype=object)
+        for color in colors:
+            self.color_index(color)
+        self.rockets = []  # [x, y, speed, explosion height, colour index]
+        self.position = np.empty((capacity, 2), dtype=np.float64)
+        self.velocity = np.empty((capacity, 2), dtype=np.float64)
+        self.lifetime = np.empty(capacity, dtype=np.int16)
+        self.color = np.empty(capacity, dtype=np.intp)
+        self.count = 0
+        self.particle_frames = 0  # particles updated, summed over frames
+
+    def append(self, firework):
+        """Launch a rocket from a firework dict (position, speed, explosion_height, color)."""
+        x, y = firework["position"]
+        speed = firework["speed"] * 3 * SPRITE_SCALER  # Increase speed for faster ascent
+        self.rockets.append([x, y, speed, firework["explosion_height"], self.color_index(firework["color"])])
+
+    def color_index(self, color):
+        """The palette index of `color`, adding it and pre-drawing its dot on first use."""
+        color = tuple(color)
+        index = self.color_indices.get(color)
+        if index is None:
+            dot = pygame.Surface((2 * self.radius + 1, 2 * self.radius + 1)).convert()
+            dot.set_colorkey(BLACK)
+            pygame.draw.circle(dot, color, (self.radius, self.radius), self.radius)
+            index = self.color_indices[color] = len(self.colors)
+            self.colors.append(color)
+            dots = np.empty(index + 1, dtype=object)
+            dots[:index] = self.dots
+            dots[index] = dot
+            self.dots = dots
+        return index
+
+    def __len__(self):
+        return len(self.rockets) + self.count
+
+    def explode(self, x, y, color):
+        """Add a burst of particles at (x, y), growing the arrays if they are full."""
+        start, end = self.count, self.count + self.burst
+        if end > len(self.lifetime):
+            capacity = max(end, 2 * len(self.lifetime))
+            for name in ("position", "velocity", "lifetime", "color"):
+                old = getattr(self, name)
+                grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:start] = old[:start]
+                setattr(self, name, grown)
+        self.position[start:end] = (x, y)
+        self.velocity[start:end] = self.rng.uniform(-self.spread, self.spread, (self.burst, 2))
+        low, high = self.lifetime_range
+        self.lifetime[start:end] = self.rng.integers(low, high + 1, self.burst)
+        self.color[start:end] = color
+        self.count = end
+
+    def step(self, surface):
+        """Advance one frame and draw it: particles first, then rockets, then any new bursts."""
+        count = self.count
+        if count:
+            self.position[:count] += self.velocity[:count]
+            self.lifetime[:count] -= 1
+            self.particle_frames += count
+            corners = (self.position[:count].astype(np.int32) - self.radius).tolist()
+            surface.blits(zip(self.dots[self.color[:count]], corners), doreturn=False)
+
+            # Compact the survivors to the front, keeping their order
+            alive = self.lifetime[:count] > 0
+            if not alive.all():
+                keep = np.flatnonzero(alive)
+                for array in (self.position, self.velocity, self.lifetime, self.color):
+                    array[:len(keep)] = array[keep]
+                self.count = len(keep)
+
+        for rocket in self.rockets[:]:
+            rocket[1] -= rocket[2]
+            pygame.draw.circle(surface, self.colors[rocket[4]], (int(rocket[0]), int(rocket[1])), self.rocket_radius)
+            if rocket[1] <= rocket[3]:
+                self.rockets.remove(rocket)
+                self.explode(rocket[0], rocket[1], rocket[4])
+
+@timed("draw_fireworks")
 def draw_fireworks(fireworks):
     """
     Draw and update fireworks on the screen.
     Args:
-        fireworks (list): List of active fireworks, each with position, state, and particles.
+        fireworks (Fireworks or list): The particle system, or without NumPy a list of active
+            fireworks, each with position, state, and particles.
     """
+    if isinstance(fireworks, Fireworks):
+        fireworks.step(screen)
+        return
     for firework in fireworks[:]:
         if firework["state"] == "ascending":
             # Increase firework speed to make it ascend faster
@@ -604,16 +1416,16 @@ def minigame_scene_3():
 
     # Show instructions screen
     screen.fill(BLACK)
-    instructions = font_small.render("Follow directions to drink!", True, WHITE)
-    prompt = font_small.render("Press KEY 3 to start", True, WHITE)
+    instructions = render_text(font_small, "Follow directions to drink!", True, WHITE)
+    prompt = render_text(font_small, "Press KEY 3 to start", True, WHITE)
     screen.blit(instructions, (WIDTH // 2 - instructions.get_width() // 2, HEIGHT // 2 - 50 * SPRITE_SCALER))
     screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, HEIGHT // 2 + 10 * SPRITE_SCALER))
-    pygame.display.flip()
+    present()
 
     # Wait for ENTER to start
     waiting = True
     while waiting:
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -629,7 +1441,7 @@ def minigame_scene_3():
     reaction_time_limit = 2.0  # Seconds to press the correct key
 
     # Ensure bubbles and states are initialized
-    bubbles = [[] for _ in range(len(beers))]
+    bubbles.clear()
     beer_states = [0, 0, 0, 0, 0]  # All beers start as full
     
     # Mini-game loop
@@ -651,16 +1463,16 @@ def minigame_scene_3():
 
         # Draw sobriety bar (scaled width)
         pygame.draw.rect(screen, (0, 255, 0), (50 * SPRITE_SCALER, 20 * SPRITE_SCALER, sobriety_bar * 3 * SPRITE_SCALER, 20 * SPRITE_SCALER))
-        sobriety_text = font_small.render("Sobriety", True, WHITE)
+        sobriety_text = render_text(font_small, "Sobriety", True, WHITE)
         screen.blit(sobriety_text, (50 * SPRITE_SCALER, 50 * SPRITE_SCALER))
 
         # Draw the key prompt (scaled font size and position)
-        prompt_text = font_large.render(f"{pygame.key.name(target_key)}", True, WHITE)
+        prompt_text = render_text(font_large, f"{pygame.key.name(target_key)}", True, WHITE)
         screen.blit(prompt_text, (WIDTH // 2 - prompt_text.get_width() // 2, HEIGHT // 2 + 100 * SPRITE_SCALER))
-        pygame.display.flip()
+        present()
 
         # Check for events
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -688,7 +1500,7 @@ def minigame_scene_3():
         beer_states[i] = 3  # Fully empty (state 3)
 
     # Clear all bubbles after the game
-    bubbles = [[] for _ in range(len(beers))]
+    bubbles.clear()
 
     # Draw the final state with all beers empty
     screen.fill(BLACK)
@@ -696,7 +1508,7 @@ def minigame_scene_3():
     draw_beers(beers, beer_states, bubbles)
 
     # Display the final empty beer state before proceeding
-    pygame.display.flip()
+    present()
     pygame.time.delay(500)  # Optional: Small delay for visual clarity
 
     # All levels completed
@@ -704,19 +1516,19 @@ def minigame_scene_3():
     screen.fill(BLACK)
 
     
-    dialogue_text = font_large.render("Congratulations!", True, WHITE)
-    prompt_text = font_small.render("you finished all the beers!", True, WHITE)
-    prompt_text2 = font_small.render("Press KEY 3 to continue", True, WHITE)
+    dialogue_text = render_text(font_large, "Congratulations!", True, WHITE)
+    prompt_text = render_text(font_small, "you finished all the beers!", True, WHITE)
+    prompt_text2 = render_text(font_small, "Press KEY 3 to continue", True, WHITE)
     screen.blit(dialogue_text, (WIDTH // 2 - dialogue_text.get_width() // 2, HEIGHT // 2 - int(50 * SPRITE_SCALER)))
     screen.blit(prompt_text, (WIDTH // 2 - prompt_text.get_width() // 2, HEIGHT // 2 + (int((50 * SPRITE_SCALER)-10))))
     screen.blit(prompt_text2, (WIDTH // 2 - prompt_text.get_width() // 2, HEIGHT // 2 + (int((50 * SPRITE_SCALER)+10))))
 
 
-    pygame.display.flip()
+    present()
 
     # Wait for ENTER key to transition to Scene 2
     while True:
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -737,12 +1549,12 @@ def minigame_scene_5():
         "Arrow keys to move."
     ]
     for i, line in enumerate(instruction_lines):
-        rendered_line = font_small.render(line, True, WHITE)
+        rendered_line = render_text(font_small, line, True, WHITE)
         screen.blit(rendered_line, (WIDTH // 2 - rendered_line.get_width() // 2, HEIGHT // 2 - 60 * SPRITE_SCALER + i * int(30 * SPRITE_SCALER)))
     
-    prompt = font_small.render("Press KEY 3 to start", True, WHITE)
+    prompt = render_text(font_small, "Press KEY 3 to start", True, WHITE)
     screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, HEIGHT // 2 + 50 * SPRITE_SCALER))
-    pygame.display.flip()
+    present()
     # Initialize player and partner positions lower down
     sam_pos = pygame.Vector2(WIDTH - int(200 * SPRITE_SCALER), HEIGHT // 2 + int(150 * SPRITE_SCALER))  # Move Sam lower
     molly_pos = pygame.Vector2(WIDTH - int(250 * SPRITE_SCALER), HEIGHT // 2 + int(150 * SPRITE_SCALER))  # Move Molly lower
@@ -750,7 +1562,7 @@ def minigame_scene_5():
     # Wait for ENTER to start
     waiting = True
     while waiting:
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -777,7 +1589,7 @@ def minigame_scene_5():
         draw_sprite(molly, molly_pos)  # Draw Molly sprite at current position
         
         # Apply sway and following behavior for movement
-        keys = pygame.key.get_pressed()
+        keys = get_pressed()
         sam_pos, molly_pos, sway_timer, sway_direction = apply_idle_sway_with_follow(
             sam_pos, molly_pos, sway_timer, sway_direction, sway_magnitude, sway_frequency, keys
         )
@@ -787,10 +1599,10 @@ def minigame_scene_5():
         if sam_rect.colliderect(house_rect):
             break
 
-        pygame.display.flip()
+        present()
 
         # Handle quitting
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -813,14 +1625,14 @@ def minigame_scene_6():
             "Press KEY 3 to start."
         ]
         for i, line in enumerate(instructions):
-            rendered_line = font_small.render(line, True, WHITE)
+            rendered_line = render_text(font_small, line, True, WHITE)
             screen.blit(rendered_line, (WIDTH // 2 - rendered_line.get_width() // 2, HEIGHT // 2 - 40 + i * int(30 * SPRITE_SCALER)))
-        pygame.display.flip()
+        present()
 
         # Wait for ENTER to start
         waiting = True
         while waiting:
-            for event in pygame.event.get():
+            for event in get_events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
@@ -839,16 +1651,14 @@ def minigame_scene_6():
         heart_pos_y = (HEIGHT // 2) - 5 - heart_size[1] // 2  # Center the heart vertically
         heart_speed = int(15 * SPRITE_SCALER)  # Scale heart movement speed using the pre-defined SPRITE_SCALER
         heart_direction = 1  # 1 for moving right, -1 for moving left
-        full_path = os.path.join(BASE_PATH, "assets/sprites/heart.png")  # Construct the full path
-        heart_image = pygame.image.load(full_path).convert_alpha()
-        heart_image = pygame.transform.scale(heart_image, heart_size)
+        heart_image = sprites.get_variant("heart", size=heart_size)
 
         game_running = True
         success = False
 
         # Mini-game loop
         while game_running:
-            for event in pygame.event.get():
+            for event in get_events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
@@ -892,7 +1702,7 @@ def minigame_scene_6():
 
             pygame.draw.rect(screen, (255, 0, 0), (target_area_x_start, target_area_y, target_area_x_end - target_area_x_start, int(5 * SPRITE_SCALER)))  # Visual target
 
-            pygame.display.flip()
+            present()
             clock.tick(30)
 
         # Check result and handle restart if necessary
@@ -906,8 +1716,8 @@ def minigame_scene_6():
 ###########################################################################################
 # End the game
 def game_completed():
-    fireworks = []  # Active fireworks
     colors = [(128, 0, 128), (0, 255, 0), (0, 0, 255), (255, 255, 255)]  # Purple, green, blue, white
+    fireworks = Fireworks(colors) if HAS_NUMPY else []  # Active fireworks
 
     # Fireworks animation (scaled)
     fireworks_duration = 5  # Display fireworks for 5 seconds
@@ -928,7 +1738,7 @@ def game_completed():
 
         # Draw and update fireworks
         draw_fireworks(fireworks)
-        pygame.display.flip()
+        present()
         clock.tick(75)
 
     # Black screen with text box
@@ -949,7 +1759,7 @@ def game_completed():
     snapshot_image = pygame.image.load(snapshot_path)
     snapshot_image = pygame.transform.scale(snapshot_image, (picture_width, picture_height))
     screen.blit(snapshot_image, (picture_x, picture_y))
-    pygame.display.flip()  # Update the screen to show the image
+    present()  # Update the screen to show the image
 
     # Display the text box (scaled)
     text_box(
@@ -961,19 +1771,13 @@ def game_completed():
 
     # Happy Anniversary screen (scaled text)
     screen.fill(BLACK)
-    message = font_large.render("Happy Anniversary!", True, WHITE)
+    message = render_text(font_large, "Happy Anniversary!", True, WHITE)
     screen.blit(message, (WIDTH // 2 - message.get_width() // 2, HEIGHT // 2 - message.get_height() // 2))
-    pygame.display.flip()
+    present()
     pygame.time.wait(2000)  # Display for 2 seconds
 
-    # Fade to black (scaled overlay)
-    for alpha in range(0, 256, 10):  # Gradual fade to black
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(alpha)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
-        pygame.display.flip()
-        clock.tick(30)
+    # Fade to black
+    transitions.run("fade", duration=0.85)
 
     # End the game
     pygame.quit()
@@ -991,9 +1795,9 @@ def scene_0(keys):
     screen.fill(BLACK)
     
     # Scale font sizes and adjust text positioning based on the 128x128 screen
-    title_text = font_large.render("Where it all began", True, WHITE)
-    subtitle_text = font_small.render("Sam and Molly's first date", True, WHITE)
-    prompt_text = font_small.render("Press KEY 3 to start", True, WHITE)
+    title_text = render_text(font_large, "Where it all began", True, WHITE)
+    subtitle_text = render_text(font_small, "Sam and Molly's first date", True, WHITE)
+    prompt_text = render_text(font_small, "Press KEY 3 to start", True, WHITE)
 
     # Center text horizontally and adjust vertical spacing based on scaling
     screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 2 - int(100 * SPRITE_SCALER)))
@@ -1002,6 +1806,7 @@ def scene_0(keys):
 
     # Detect ENTER key press to transition to next scene
     if keys[pygame.K_RETURN]:
+        bind_sprites()
         scene = 1
 
 #---------------------------------------------------------------------------------------------------------#
@@ -1018,6 +1823,9 @@ def scene_1(keys):
     if not hasattr(scene_1, "pub_reached"):
         scene_1.pub_reached = False
     scene_1.molly_near_sam = False  # Track if Molly has caught up to Sam  
+    if not hasattr(scene_1, "gif_prefetched"):
+        gif_cache.prefetch(gif_path, screen.get_size())  # decoded while cycling, shown in scene_2
+        scene_1.gif_prefetched = True
 
     screen.fill(BLACK)
     
@@ -1073,7 +1881,7 @@ def scene_1(keys):
 
             if sam_rect.colliderect(molly_rect):
                 actionable = False
-                exclamation = font_small.render("!", True, WHITE)
+                exclamation = render_text(font_small, "!", True, WHITE)
                 screen.blit(exclamation, (sam_pos.x + int(15 * SPRITE_SCALER), sam_pos.y - int(30 * SPRITE_SCALER)))
                 screen.blit(exclamation, (molly_pos.x + int(15 * SPRITE_SCALER), molly_pos.y - int(30 * SPRITE_SCALER)))
 
@@ -1105,16 +1913,16 @@ def scene_1(keys):
                 screen.fill(BLACK)
 
                 # Display "You made it to the pub! Press ENTER to continue" (scaled text)
-                dialogue_text = font_large.render("You made it to the pub!", True, WHITE)
-                prompt_text = font_small.render("Press KEY 3 to continue", True, WHITE)
+                dialogue_text = render_text(font_large, "You made it to the pub!", True, WHITE)
+                prompt_text = render_text(font_small, "Press KEY 3 to continue", True, WHITE)
 
                 screen.blit(dialogue_text, (WIDTH // 2 - dialogue_text.get_width() // 2, HEIGHT // 2 - int(50 * SPRITE_SCALER)))
                 screen.blit(prompt_text, (WIDTH // 2 - prompt_text.get_width() // 2, HEIGHT // 2 + int(50 * SPRITE_SCALER)))
-                pygame.display.flip()
+                present()
 
                 # Wait for ENTER key to transition to Scene 2
                 while True:
-                    for event in pygame.event.get():
+                    for event in get_events():
                         if event.type == pygame.QUIT:
                             pygame.quit()
                             sys.exit()
@@ -1154,7 +1962,7 @@ def scene_2(keys):
     draw_sprite(bar, (bar_rect.x, bar_rect.y))
 
     # Render instructional text (scaled font)
-    instruction_text = font_small.render("Walk to the bar", True, WHITE)
+    instruction_text = render_text(font_small, "Walk to the bar", True, WHITE)
     screen.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, int(20 * SPRITE_SCALER)))  # Centered at the top (scaled)
 
     # Draw the Sam and Molly sprites (scaled)
@@ -1187,41 +1995,53 @@ def scene_2(keys):
 
 #----------------------------------SCENE 3-----------------------------#
  # Scene 3: Going to the bar
+class BarScene:
+    """
+    Scene 3's state, built once when the scene is entered: the table, door and beer geometry
+    (scaled) and the interaction zones around them, the beers' bubbles, and the story flags.
+    A frame only moves the sprites and draws.
+    """
+
+    def __init__(self):
+        # Set positions for the door and table (scaled)
+        self.table_rect = table.get_rect(center=(WIDTH // 2, HEIGHT // 2))  # Table centered
+        self.door_rect = door.get_rect(midtop=(WIDTH - int(75 * SPRITE_SCALER), int(50 * SPRITE_SCALER)))  # Adjusted door position
+        self.table_zone = self.table_rect.inflate(int(1 * SPRITE_SCALER), int(1 * SPRITE_SCALER))  # Expand interaction zone by 1 pixel
+        self.door_zone = self.door_rect.inflate(int(1 * SPRITE_SCALER), int(1 * SPRITE_SCALER))  # Expand interaction zone for the door
+
+        # The beers (scaled), and their bubbles
+        self.beers = [
+            pygame.Rect(self.table_rect.x + int(40 * SPRITE_SCALER) + i * int(30 * SPRITE_SCALER), self.table_rect.y - int(22 * SPRITE_SCALER), int(20 * SPRITE_SCALER), int(50 * SPRITE_SCALER))
+            for i in range(5)
+        ]
+        self.bubbles = Bubbles(len(self.beers))
+
+        self.sam_rect = pygame.Rect(0, 0, SPRITE_WIDTH, SPRITE_HEIGHT)  # moved to Sam every frame
+        self.game_played = False
+        self.molly_burped = False
+        self.molly_near_sam = False
+        self.door_interacted = False
+
+
 def scene_3(keys):
-    global scene, sam, molly, actionable, sam_pos, molly_pos, scene3, beers, beer_states, bubbles, table, table_rect
+    global scene, sam, molly, actionable, sam_pos, molly_pos, scene3, beers, beer_states, bubbles, table_rect
 
     # Initialize elements
     if not hasattr(scene_3, "initialized"):
         sam_pos = pygame.Vector2(int(30 * SPRITE_SCALER), HEIGHT // 2 - int(25 * SPRITE_SCALER))  # Player starting position (scaled)
         molly_pos = pygame.Vector2(int(50 * SPRITE_SCALER), HEIGHT // 2 - int(25 * SPRITE_SCALER))  # Partner starting position (scaled)
         actionable = True
-        scene_3.game_played = False
+        scene3 = BarScene()
+        beers, bubbles, table_rect = scene3.beers, scene3.bubbles, scene3.table_rect  # shared with the minigame
+        beer_states = [0, 0, 0, 0, 0]  # All beers are full initially
         scene_3.initialized = True
-        scene_3.molly_burped = False
-        scene_3.molly_near_sam = False	
-        scene_3.door_interacted = False
 
     # Fill the screen with black
     screen.fill(BLACK)
-    
-    # Set positions for the door and table (scaled)
-    table_rect = table.get_rect(center=(WIDTH // 2, HEIGHT // 2))  # Table centered
-    door_rect = door.get_rect(midtop=(WIDTH - int(75 * SPRITE_SCALER), int(50 * SPRITE_SCALER)))  # Adjusted door position
-    
-    # Initialize the beers (scaled)
-    beers =  [
-        pygame.Rect(table_rect.x + int(40 * SPRITE_SCALER) + i * int(30 * SPRITE_SCALER), table_rect.y - int(22 * SPRITE_SCALER), int(20 * SPRITE_SCALER), int(50 * SPRITE_SCALER))
-        for i in range(5)
-    ]
-    bubbles = [[] for _ in range(5)]  # List of bubbles for each beer
-
-    # Ensure beer states are initialized
-    if not hasattr(scene_3, "beer_states"):
-        beer_states = [0, 0, 0, 0, 0]  # All beers are full initially
 
     # Draw table and door sprites (scaled)
     draw_sprite(table, (table_rect.x, table_rect.y))
-    draw_sprite(door, (door_rect.x, door_rect.y))
+    draw_sprite(door, (scene3.door_rect.x, scene3.door_rect.y))
 
     # Draw beers on the table (scaled)
     #draw_beers(beers, beer_states, bubbles)
@@ -1237,48 +2057,46 @@ def scene_3(keys):
         
          # Check if Molly is near Sam (scaled proximity threshold)
         if molly_pos.distance_to(sam_pos) < int(50 * SPRITE_SCALER):  # Proximity threshold (scaled)
-            scene_3.molly_near_sam = True
+            scene3.molly_near_sam = True
         else:
-            scene_3.molly_near_sam = False 
+            scene3.molly_near_sam = False 
      
     # Interaction with table (scaled interaction zone)
-    interaction_zone = table_rect.inflate(int(1 * SPRITE_SCALER), int(1 * SPRITE_SCALER))  # Expand interaction zone by 1 pixel
-    if pygame.Rect(sam_pos.x, sam_pos.y, SPRITE_WIDTH, SPRITE_HEIGHT).colliderect(interaction_zone) and not scene_3.game_played and scene_3.molly_near_sam:
+    scene3.sam_rect.topleft = (sam_pos.x, sam_pos.y)
+    if scene3.sam_rect.colliderect(scene3.table_zone) and not scene3.game_played and scene3.molly_near_sam:
         actionable = False  # Disable movement during interaction
         text_box("Dutch courage....?")
         # Play mini-game
         minigame_scene_3()
-        scene_3.game_played = True
+        scene3.game_played = True
         
-    if scene_3.game_played and not scene_3.molly_burped:
+    if scene3.game_played and not scene3.molly_burped:
         actionable = False
         for i in range(len(beer_states)):
             beer_states[i] = 3  # All beers are empty
-        for i in range(len(bubbles)):
-            bubbles[i] = []  # Clear bubbles for each beer
+        bubbles.clear()  # Clear bubbles for each beer
         draw_beers(beers, beer_states, bubbles)
         
         # Redraw background and sprites before showing dialog
         screen.fill(BLACK)  # Ensure background is consistent
         draw_sprite(table, (table_rect.x, table_rect.y))
-        draw_sprite(door, (door_rect.x, door_rect.y))
+        draw_sprite(door, (scene3.door_rect.x, scene3.door_rect.y))
         draw_sprite(sam, (sam_pos.x, sam_pos.y))  # Draw Sam sprite
         draw_sprite(molly, (molly_pos.x, molly_pos.y))  # Draw Molly sprite
-        pygame.display.flip()  # Ensure everything is rendered before dialog
+        present()  # Ensure everything is rendered before dialog
         
         # Show the dialog box
         text_box("Molly: BURRPPPP!!", "Sam: Fancy some fresh air?")
-        scene_3.molly_burped = True
+        scene3.molly_burped = True
         actionable = True
     
    
         # Interaction with door (scaled interaction zone for door)
-    interaction_zone_door = door_rect.inflate(int(1 * SPRITE_SCALER), int(1 * SPRITE_SCALER))  # Expand interaction zone for the door
-    if pygame.Rect(sam_pos.x, sam_pos.y, SPRITE_WIDTH, SPRITE_HEIGHT).colliderect(interaction_zone_door) and not scene_3.door_interacted:
+    if scene3.sam_rect.colliderect(scene3.door_zone) and not scene3.door_interacted:
         actionable = False  # Disable movement during interaction
 
         # If the mini-game has been completed
-        if scene_3.game_played:
+        if scene3.game_played:
             # Transition to Scene 4
             text_box("Molly: Let's go outside!")
             scene_transition()  # Trigger transition
@@ -1287,7 +2105,7 @@ def scene_3(keys):
             actionable = False
             # Show dialogue indicating the mini-game needs to be played first
             text_box("Maybe we should have a drink first?")
-            scene_3.door_interacted = True
+            scene3.door_interacted = True
             actionable = True  # Re-enable movement
 
 #---------------------------------------------------------------------------------------------------------#
@@ -1346,9 +2164,9 @@ def scene_4(keys):
         sam_size = (SPRITE_WIDTH, SPRITE_HEIGHT)  # Normal Sam size
         molly_size = (SPRITE_WIDTH, SPRITE_HEIGHT)  # Normal Molly size
 
-    # Manually scale Sam and Molly
-    scaled_sam = pygame.transform.scale(sam, sam_size)
-    scaled_molly = pygame.transform.scale(molly, molly_size)
+    # Scaled Sam and Molly, made once and reused every frame
+    scaled_sam = sprites.get_variant("sam", size=sam_size)
+    scaled_molly = sprites.get_variant("molly", size=molly_size)
 
     # Draw sam and molly sprites with updated size
     screen.blit(sam, (sam_pos.x, sam_pos.y))
@@ -1373,8 +2191,8 @@ def scene_4(keys):
     if scene_4.choose_bird and not scene_4.molly_opinion_done:
         
         screen.fill(BLACK)
-        choice_text = font_small.render("Press KEY 1 for seagull", True, WHITE)
-        choice_text2 = font_small.render("Press KEY 2 for pigeon", True, WHITE)
+        choice_text = render_text(font_small, "Press KEY 1 for seagull", True, WHITE)
+        choice_text2 = render_text(font_small, "Press KEY 2 for pigeon", True, WHITE)
         screen.blit(choice_text2, (WIDTH // 2 - choice_text.get_width() // 2, HEIGHT - (150*SPRITE_SCALER)))
         screen.blit(choice_text, (WIDTH // 2 - choice_text.get_width() // 2, HEIGHT - ((150*SPRITE_SCALER)+50)))
 
@@ -1557,7 +2375,7 @@ def scene_6(keys):
 
     # Draw exclamation mark above Maggie if required
     if scene_6.maggie_exclamation:
-        exclamation = font_small.render("!", True, WHITE)
+        exclamation = render_text(font_small, "!", True, WHITE)
         screen.blit(exclamation, (scene_6.maggie_pos.x + 5, scene_6.maggie_pos.y - 5))
 
     # Check if Sam has started moving
@@ -1651,8 +2469,11 @@ def scene_6(keys):
 #-----------------------------------------
 # Game loop
 running = True
+sprites_prefetched = False
 while running:
-    for event in pygame.event.get():
+    with profiler.section("events"):
+        events = get_events()
+    for event in events:
         if event.type == pygame.QUIT:
             pygame.quit()
             sys.exit()
@@ -1669,27 +2490,33 @@ while running:
             if event.key == pygame.K_DOWN:
                 key_states["down_pressed"] = False
 
-    keys = pygame.key.get_pressed()
-
-    if scene == 0:
-        scene_0(keys)
-    elif scene == 1:
-        scene_1(keys)
-    elif scene == 2:
-        scene_2(keys)
-    elif scene == 3:
-        scene_3(keys)
-    elif scene == 4:
-        scene_4(keys)
-    elif scene == 5:
-        scene_5(keys)
-    elif scene == 6:
-        scene_6(keys)
-    elif scene == 7:
-        scene_7(keys)
-
-
-
-    pygame.display.flip()
-    clock.tick(30)
+    keys = get_pressed()
+
+    with profiler.section("scene_update"):
+        if scene == 0:
+            scene_0(keys)
+        elif scene == 1:
+            scene_1(keys)
+        elif scene == 2:
+            scene_2(keys)
+        elif scene == 3:
+            scene_3(keys)
+        elif scene == 4:
+            scene_4(keys)
+        elif scene == 5:
+            scene_5(keys)
+        elif scene == 6:
+            scene_6(keys)
+        elif scene == 7:
+            scene_7(keys)
+
+
+
+    present()
+    if not sprites_prefetched:
+        # Decode the sprites in the background once the title screen is up, while it waits for KEY 3
+        sprites.prefetch()
+        sprites_prefetched = True
+    with profiler.section("tick"):
+        clock.tick(30)
     
@@ -1,4 +1,4 @@
 # set up the pi environment to play the game on the waveshare
-sudo fbcp &
-sudo retrogame &
-python3 /home/moja/ourfirstdate/handheld/main.py
+# frames go straight to the LCD over SPI and the HAT keys are read via GPIO,
+# so fbcp and retrogame are no longer needed
+HANDHELD_DISPLAY=lcd python3 /home/moja/ourfirstdate/handheld/main.py
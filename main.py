@@ -2,16 +2,42 @@ import pygame
 import sys
 import random
 try:
-    from PIL import Image
+    from PIL import Image, ImageSequence
     HAS_PIL = True
 except ImportError:
     HAS_PIL = False
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 import textwrap
 import os
 import asyncio
+import collections
+import concurrent.futures
+import atexit
+import bisect
+import contextlib
+import csv
+import functools
+import hashlib
+import io
+import itertools
+import json
+import queue
+import struct
+import threading
+import time
 
 
 ### INITIALISATION
+# Headless mode: no window, a virtual clock and scripted input (see run_headless)
+HEADLESS = os.environ.get("FIRSTDATE_HEADLESS") == "1"
+if HEADLESS:
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
 # Pygame Initialization
 pygame.init()
 pygame.font.init()
@@ -52,7 +78,428 @@ font = font_small
 
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("First Date Adventure")
-clock = pygame.time.Clock()
+
+
+# --------------------TIME & INPUT----------------------#
+class RealClock:
+    """Wall-clock time, used when the game is played normally."""
+
+    def __init__(self):
+        self.clock = pygame.time.Clock()
+
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+    def tick(self, fps):
+        frame_scheduler.flush()
+        return self.clock.tick(fps)
+
+    async def sleep(self, seconds):
+        frame_scheduler.flush()
+        await asyncio.sleep(seconds)
+
+    def frame_presented(self):
+        pass
+
+    def input_polled(self):
+        pass
+
+
+class VirtualClock:
+    """
+    Simulated time for headless runs. Nothing actually waits: every presented frame
+    costs one frame period, every sleep its duration, and an input poll that is not
+    paired with a presented frame (a "wait for ENTER" loop) also costs one frame.
+    """
+
+    def __init__(self, fps=FPS):
+        self.frame_ms = 1000.0 / fps
+        self.ticks = 0.0
+        self.frames = 0
+        self.presented = False
+
+    def get_ticks(self):
+        return int(self.ticks)
+
+    def tick(self, fps):
+        frame_scheduler.flush()
+        return 0
+
+    async def sleep(self, seconds):
+        frame_scheduler.flush()
+        self.ticks += seconds * 1000.0
+        await asyncio.sleep(0)
+
+    def frame_presented(self):
+        self.ticks += self.frame_ms
+        self.frames += 1
+        self.presented = True
+
+    def input_polled(self):
+        if not self.presented:
+            self.ticks += self.frame_ms
+        self.presented = False
+
+
+class ScriptedKeys:
+    """Key state returned by get_pressed() during a scripted run."""
+
+    def __init__(self, held):
+        self.held = held
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class ScriptedInput:
+    """
+    Replays a list of (time_ms, key, hold_ms) key presses against the virtual clock,
+    then posts QUIT once `linger` ms have passed after the last key is released.
+    """
+
+    def __init__(self, script, clock, linger=5000):
+        self.clock = clock
+        self.timeline = []
+        for time_ms, key, hold_ms in script:
+            self.timeline.append((time_ms, pygame.KEYDOWN, key))
+            self.timeline.append((time_ms + hold_ms, pygame.KEYUP, key))
+        self.timeline.sort(key=lambda entry: (entry[0], entry[1] == pygame.KEYDOWN))
+        self.end = (self.timeline[-1][0] if self.timeline else 0) + linger
+        self.position = 0
+        self.held = set()
+        self.pending = []
+
+    def update(self):
+        """Apply every key press or release that is due by now."""
+        now = self.clock.get_ticks()
+        while self.position < len(self.timeline) and self.timeline[self.position][0] <= now:
+            _, kind, key = self.timeline[self.position]
+            self.position += 1
+            if kind == pygame.KEYDOWN:
+                self.held.add(key)
+            else:
+                self.held.discard(key)
+            self.pending.append(pygame.event.Event(kind, key=key, mod=0, unicode="", scancode=0))
+        return now >= self.end
+
+    def get_events(self):
+        if self.update():
+            self.pending.append(pygame.event.Event(pygame.QUIT))
+        events, self.pending = self.pending, []
+        return events
+
+    def get_pressed(self):
+        if self.update():
+            # Loops that only read the key state never see QUIT
+            raise SystemExit("input script finished")
+        return ScriptedKeys(frozenset(self.held))
+
+
+clock = VirtualClock() if HEADLESS else RealClock()
+scripted_input = None  # set by run_headless
+
+
+# --------------------PROFILING----------------------#
+# FIRSTDATE_PROFILE=1 times the hot paths of every frame and draws a rolling overlay;
+# FIRSTDATE_PROFILE_TRACE=trace.csv (or trace.json) also writes every frame's timings at exit.
+PROFILE_TRACE = os.environ.get("FIRSTDATE_PROFILE_TRACE")
+PROFILE = os.environ.get("FIRSTDATE_PROFILE") == "1" or bool(PROFILE_TRACE)
+
+
+class FrameProfiler:
+    """
+    Wall-clock milliseconds per named section, collected per frame. A frame ends on every
+    present(), so the nested loops of text boxes and minigames are profiled as well.
+    """
+
+    def __init__(self, window=30, overlay=True):
+        self.window = window  # frames averaged by the overlay
+        self.overlay = overlay
+        self.frames = []  # one dict per presented frame
+        self.current = {}
+        self.open = []  # [name, start] of the sections still running, outermost first
+        self.frame_start = time.perf_counter()
+        self.font = None
+
+    @contextlib.contextmanager
+    def section(self, name):
+        entry = [name, time.perf_counter()]
+        self.open.append(entry)
+        try:
+            yield
+        finally:
+            self.open.pop()
+            self.add(name, entry[1])
+
+    def add(self, name, start):
+        self.current[name] = self.current.get(name, 0.0) + (time.perf_counter() - start) * 1000.0
+
+    def end_frame(self, scene):
+        now = time.perf_counter()
+        for entry in self.open:
+            # A section spanning several frames (a scene waiting in a text box) is split between them
+            self.add(entry[0], entry[1])
+            entry[1] = now
+        record = {"frame": len(self.frames), "scene": scene, "frame_ms": (now - self.frame_start) * 1000.0}
+        record.update(self.current)
+        self.frames.append(record)
+        self.current = {}
+        self.frame_start = now
+
+    def averages(self, frames=None):
+        """Mean milliseconds per frame of every section (and frame_ms) over `frames`."""
+        frames = self.frames if frames is None else frames
+        totals = {}
+        for record in frames:
+            for name, value in record.items():
+                if name not in ("frame", "scene"):
+                    totals[name] = totals.get(name, 0.0) + value
+        return {name: total / max(len(frames), 1) for name, total in totals.items()}
+
+    def draw(self, surface):
+        """Draw the rolling averages in the top-left corner."""
+        if self.font is None:
+            self.font = pygame.font.SysFont("monospace", 14)
+        averages = self.averages(self.frames[-self.window :])
+        frame_ms = averages.pop("frame_ms", 0.0)
+        lines = [f"{1000.0 / frame_ms if frame_ms else 0:5.1f} fps {frame_ms:6.2f} ms"]
+        lines += [f"{name:<14}{value:6.2f}" for name, value in sorted(averages.items())]
+        line_height = self.font.get_linesize()
+        width = max(self.font.size(line)[0] for line in lines) + 8
+        area = pygame.draw.rect(surface, BLACK, (0, 0, width, line_height * len(lines) + 8))
+        for i, line in enumerate(lines):
+            surface.blit(self.font.render(line, False, (0, 255, 0)), (4, 4 + i * line_height))
+        return area
+
+    def dump(self, path):
+        """Write every frame's timings to `path`, as JSON if it ends in .json, otherwise CSV."""
+        if path.endswith(".json"):
+            with open(path, "w") as trace:
+                json.dump(self.frames, trace, indent=1)
+            return
+        columns = ["frame", "scene", "frame_ms"]
+        for record in self.frames:
+            columns += [name for name in record if name not in columns]
+        with open(path, "w", newline="") as trace:
+            writer = csv.DictWriter(trace, columns, restval=0.0)
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+
+class NullProfiler:
+    """Stands in for FrameProfiler when profiling is off."""
+
+    overlay = False
+
+    def section(self, name):
+        return NULL_SECTION
+
+    def end_frame(self, scene):
+        pass
+
+
+NULL_SECTION = contextlib.nullcontext()
+profiler = FrameProfiler() if PROFILE else NullProfiler()
+if PROFILE_TRACE:
+    atexit.register(lambda: profiler.dump(PROFILE_TRACE))
+
+
+def timed(name):
+    """Decorator adding every call of a function (or coroutine) to the profiler's `name` section."""
+
+    def decorate(function):
+        if not PROFILE:
+            return function
+        if asyncio.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def timed_coroutine(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    profiler.add(name, start)
+
+            return timed_coroutine
+
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add(name, start)
+
+        return timed_function
+
+    return decorate
+
+
+class DirtyRects:
+    """
+    The parts of the screen drawn since the last frame, so present(partial=True) can push
+    only those to the display with pygame.display.update(rects) instead of flipping all of
+    it (in the browser build, uploading the whole canvas).
+
+    Only frames drawn over a cached background layer (see BackgroundLayers) that the
+    previous frame also showed go out partially, and everything drawn over the layer must
+    be add()ed: draw_sprite, draw_beers and the scenes' own text do. Each frame pushes its
+    own regions and the previous frame's, which uncovers where the sprites were. Any
+    other frame is flipped whole: a new layer, a text box, a minigame or a transition.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.rects = []  # drawn this frame
+        self.previous = []  # drawn last frame
+        self.layer = None  # the cached background this frame is drawn on, if any
+        self.previous_layer = None
+        self.partial_frames = 0
+        self.full_frames = 0
+        self.pixels = 0  # pushed to the display over all frames
+
+    def add(self, rect):
+        """Record a drawn region; returns it, so it can wrap a blit."""
+        self.rects.append(rect)
+        return rect
+
+    def on_layer(self, layer):
+        """The whole screen was just covered by the cached background `layer`."""
+        self.layer = layer
+        self.rects = []
+
+    def present(self, partial=False):
+        screen_rect = screen.get_rect()
+        if partial and self.enabled and self.layer is not None and self.layer is self.previous_layer:
+            rects = [rect.clip(screen_rect) for rect in self.previous + self.rects]
+            pygame.display.update(rects)
+            self.partial_frames += 1
+            self.pixels += sum(rect.width * rect.height for rect in rects)
+        else:
+            pygame.display.flip()
+            self.full_frames += 1
+            self.pixels += screen_rect.width * screen_rect.height
+        self.previous, self.rects = self.rects, []
+        self.previous_layer, self.layer = self.layer, None
+
+
+# FIRSTDATE_DIRTY_RECTS=0 flips the whole screen every frame instead, for comparison
+dirty = DirtyRects(enabled=os.environ.get("FIRSTDATE_DIRTY_RECTS", "1") == "1")
+
+
+class FrameScheduler:
+    """
+    The one owner of presentation. present() only asks for the frame to be shown; it goes
+    to the display once, at flush(), which runs wherever the game next waits or reads
+    input (clock.sleep, clock.tick, get_events, get_pressed). A second request before
+    then, such as scene_3 presenting just before its text box draws and presents, or a
+    text box presenting on exit just before main() does, replaces the first instead of
+    flipping a frame nobody gets to see; `redundant` counts those.
+    """
+
+    def __init__(self):
+        self.pending = False
+        self.partial = True  # every request since the last flush allowed a partial update
+        self.requests = 0
+        self.presents = 0
+        self.redundant = 0
+
+    def request(self, partial=False):
+        self.requests += 1
+        if self.pending:
+            self.redundant += 1
+        self.pending = True
+        self.partial = self.partial and partial
+
+    def flush(self):
+        """Present the requested frame, if there is one."""
+        if not self.pending:
+            return
+        partial = self.partial
+        self.pending = False
+        self.partial = True
+        self.presents += 1
+        show_frame(partial)
+
+
+frame_scheduler = FrameScheduler()
+
+
+def present(partial=False):
+    """Ask for the finished frame to be shown; `partial` lets main()'s frames push just what changed."""
+    frame_scheduler.request(partial)
+
+
+def show_frame(partial):
+    """Put the frame on the display; only FrameScheduler.flush() calls this."""
+    if profiler.overlay:
+        with profiler.section("overlay"):
+            dirty.add(profiler.draw(screen))
+    with profiler.section("flip"):
+        dirty.present(partial)
+    profiler.end_frame(scene)
+    clock.frame_presented()
+
+
+def get_events():
+    """pygame.event.get(), or the scripted key presses during a headless run."""
+    frame_scheduler.flush()
+    clock.input_polled()
+    if scripted_input is not None:
+        return pygame.event.get() + scripted_input.get_events()
+    return pygame.event.get()
+
+
+def get_pressed():
+    """pygame.key.get_pressed(), or the scripted key state during a headless run."""
+    frame_scheduler.flush()
+    if scripted_input is not None:
+        return scripted_input.get_pressed()
+    return pygame.key.get_pressed()
+
+
+# --------------------TEXT----------------------#
+class TextCache:
+    """
+    Rendered text surfaces keyed by (font, text, antialias, colour), evicting the least
+    recently used once either limit is exceeded. The surfaces are shared: blit them, never
+    draw on them.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=4 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.surfaces = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, antialias, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        self.bytes += surface.get_bytesize() * surface.get_width() * surface.get_height()
+        while len(self.surfaces) > self.max_entries or (self.bytes > self.max_bytes and len(self.surfaces) > 1):
+            _, evicted = self.surfaces.popitem(last=False)
+            self.bytes -= evicted.get_bytesize() * evicted.get_width() * evicted.get_height()
+            self.evictions += 1
+        return surface
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, antialias, color):
+    """font.render() through the shared text cache."""
+    return text_cache.render(font, text, antialias, color)
+
 
 # Key State Initialization
 key_states = {"up_pressed": False, "down_pressed": False}
@@ -63,10 +510,44 @@ key_states = {"up_pressed": False, "down_pressed": False}
 
 # --------------------SPRITES----------------------#
 class SpriteManager:
+    """
+    Sprites by name. Sprites listed in a manifest are loaded lazily, on their first get(),
+    or ahead of time by prefetch(), which decodes and scales them in a thread pool and
+    leaves only convert_alpha() (which must run on the main thread) for get().
 
-    def __init__(self):
-        """Initialize the sprite manager with an empty dictionary."""
+    With a `cache_dir`, scaled manifest sprites are also written there as raw RGBA, keyed
+    by a hash of the source PNG, the target size and `scale`, and read back on later
+    starts instead of decoding and scaling the PNG again. A changed PNG or size simply
+    misses the cache and replaces the stale file.
+
+    use_atlas() serves the manifest sprites found in an atlas index (see build_atlas.py)
+    as sub-surfaces of one atlas image, so they all come from a single decode.
+    """
+
+    def __init__(self, manifest=(), cache_dir=None, scale=1.0, variant_max_bytes=8 * 1024 * 1024):
+        """Initialize the sprite manager from a manifest of (name, path, size) entries.
+
+        `size` is (width, height) to scale to, or (None, height) to scale to that height
+        keeping the aspect ratio.
+        """
         self.sprites = {}
+        self.manifest = {name: (path, size) for name, path, size in manifest}
+        self.pending = {}  # name -> Future of the decoded, scaled but unconverted image
+        self.executor = None
+        self.cache_dir = cache_dir
+        self.scale = scale
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.variants = collections.OrderedDict()  # (name, size, flip, rotation) -> Surface
+        self.variant_max_bytes = variant_max_bytes
+        self.variant_bytes = 0
+        self.variant_hits = 0
+        self.variant_misses = 0
+        self.variant_evictions = 0
+        self.atlas = None
+        self.atlas_path = None
+        self.atlas_rects = {}  # name -> Rect of the sprite in the atlas image
+        self.atlas_pending = None  # Future of the decoded, unconverted atlas image
 
     def load(self, name, path, size=None):
         """Load and optionally scale a sprite."""
@@ -76,54 +557,213 @@ class SpriteManager:
             image = pygame.transform.scale(image, size)
         self.sprites[name] = image
 
-    def load_with_aspect_ratio(self, name, path, target_height):
-        """Load a sprite and scale it while maintaining the aspect ratio."""
-        image = pygame.image.load(path).convert_alpha()
-        original_width, original_height = image.get_width(), image.get_height()
-        aspect_ratio = original_width / original_height
-        scaled_width = int(target_height * aspect_ratio)
-        scaled_image = pygame.transform.scale(image, (scaled_width, target_height))
-        self.sprites[name] = scaled_image
+    def decode(self, name):
+        """Load and scale a manifest entry without touching the display (safe in a worker thread)."""
+        path, (width, height) = self.manifest[name]
+        full_path = os.path.join(BASE_PATH, path)
+        if self.cache_dir is None:
+            image = pygame.image.load(full_path)
+        else:
+            with open(full_path, "rb") as source_file:
+                source = source_file.read()
+            cache_path = self.cache_path(name, source, (width, height))
+            cached = self.read_cache(cache_path)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+            image = pygame.image.load(io.BytesIO(source), path)
+        if width is None:
+            width = int(height * image.get_width() / image.get_height())
+        scaled_image = pygame.transform.scale(image, (width, height))
+        if self.cache_dir is not None:
+            self.write_cache(name, cache_path, scaled_image)
+        return scaled_image
+
+    @staticmethod
+    def size_key(size):
+        """A manifest size as text, e.g. "55x77" or "autox77", the way pygame truncates it."""
+        return "x".join("auto" if value is None else str(int(value)) for value in size)
+
+    @staticmethod
+    def source_digest(source):
+        """Short content hash of a source PNG, naming its cache entries and recorded in the atlas index."""
+        return hashlib.sha1(source).hexdigest()[:16]
+
+    def cache_path(self, name, source, size):
+        digest = self.source_digest(source)
+        return os.path.join(self.cache_dir, f"{name}-{digest}-{self.size_key(size)}-{self.scale:g}.rgba")
+
+    def read_cache(self, cache_path):
+        """The cached sprite, or None if it is missing or unreadable."""
+        try:
+            with open(cache_path, "rb") as cache_file:
+                data = cache_file.read()
+        except OSError:
+            return None
+        if len(data) < SPRITE_CACHE_HEADER.size:
+            return None
+        width, height = SPRITE_CACHE_HEADER.unpack_from(data)
+        pixels = data[SPRITE_CACHE_HEADER.size:]
+        if len(pixels) != width * height * 4:
+            return None
+        return pygame.image.fromstring(pixels, (width, height), "RGBA")
+
+    def write_cache(self, name, cache_path, image):
+        """Store a scaled sprite, replacing any stale entry for the same name. Best effort."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for entry in os.listdir(self.cache_dir):
+                if entry.startswith(name + "-") and entry.endswith(".rgba"):
+                    os.remove(os.path.join(self.cache_dir, entry))
+            temporary_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as cache_file:
+                cache_file.write(SPRITE_CACHE_HEADER.pack(*image.get_size()))
+                cache_file.write(pygame.image.tostring(image, "RGBA"))
+            os.replace(temporary_path, cache_path)  # never leave a half-written entry behind
+        except OSError:
+            pass
+
+    def use_atlas(self, index_path):
+        """
+        Take the sprites in the atlas index at `index_path` from its atlas image. The index
+        is trusted, so no source PNG is read here: `build_atlas.py --check` verifies it
+        against the PNGs before a deploy. Sprites missing from the index, or whose path or
+        size no longer match the manifest, load from their own PNGs.
+        """
+        with open(index_path) as index_file:
+            index = json.load(index_file)
+        self.atlas_path = os.path.join(os.path.dirname(index_path), index["image"])
+        for name, entry in index["sprites"].items():
+            if name in self.manifest:
+                path, size = self.manifest[name]
+                if entry["path"] == path and entry["size"] == self.size_key(size):
+                    self.atlas_rects[name] = pygame.Rect(entry["rect"])
+
+    def atlas_sprite(self, name):
+        if self.atlas is None:
+            image = self.atlas_pending.result() if self.atlas_pending else pygame.image.load(self.atlas_path)
+            self.atlas = image.convert_alpha()
+        return self.atlas.subsurface(self.atlas_rects[name])
+
+    def prefetch(self, names=None, workers=4):
+        """Start decoding manifest entries (all of them by default) in a thread pool."""
+        for name in self.manifest if names is None else names:
+            if name not in self.sprites and name not in self.pending:
+                if self.executor is None:
+                    self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sprite-decode")
+                if name not in self.atlas_rects:
+                    self.pending[name] = self.executor.submit(self.decode, name)
+                elif self.atlas is None and self.atlas_pending is None:
+                    self.atlas_pending = self.executor.submit(pygame.image.load, self.atlas_path)
+
+    def get_variant(self, name, size=None, flip=(False, False), rotation=0):
+        """
+        A scaled, flipped and/or rotated version of a manifest sprite, made once and kept in
+        a least-recently-used cache of at most variant_max_bytes. A new `size` is scaled from
+        the source PNG rather than the already-scaled sprite, so enlarging does not pixelate
+        (the web build ships only the atlas, so there it is scaled from the sprite); None
+        keeps the sprite's own size. Variants are shared: blit them, never draw on them.
+        """
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        key = (name, size, (bool(flip[0]), bool(flip[1])), rotation % 360)
+        surface = self.variants.get(key)
+        if surface is not None:
+            self.variant_hits += 1
+            self.variants.move_to_end(key)
+            return surface
+        self.variant_misses += 1
+        if size is None:
+            surface = self.get(name)
+        else:
+            full_path = os.path.join(BASE_PATH, self.manifest[name][0])
+            source = pygame.image.load(full_path).convert_alpha() if os.path.exists(full_path) else self.get(name)
+            surface = pygame.transform.scale(source, size)
+        if any(flip):
+            surface = pygame.transform.flip(surface, *key[2])
+        if key[3]:
+            surface = pygame.transform.rotate(surface, key[3])
+        self.variants[key] = surface
+        self.variant_bytes += self.variant_cost(key, surface)
+        while self.variant_bytes > self.variant_max_bytes and len(self.variants) > 1:
+            evicted_key, evicted = self.variants.popitem(last=False)
+            self.variant_bytes -= self.variant_cost(evicted_key, evicted)
+            self.variant_evictions += 1
+        return surface
+
+    def variant_cost(self, key, surface):
+        """Pixel bytes a cached variant adds; none if it is the sprite itself, which is only shared."""
+        if surface is self.sprites.get(key[0]):
+            return 0
+        return surface.get_bytesize() * surface.get_width() * surface.get_height()
 
     def get(self, name):
-        """Retrieve a sprite by name."""
+        """Retrieve a sprite by name, loading it first if it comes from the manifest."""
+        if name not in self.sprites:
+            if name in self.atlas_rects:
+                self.sprites[name] = self.atlas_sprite(name)
+            elif name in self.pending:
+                self.sprites[name] = self.pending.pop(name).result().convert_alpha()
+            elif name in self.manifest:
+                self.sprites[name] = self.decode(name).convert_alpha()
         return self.sprites.get(name)
 
 
-# Initialize Sprite Manager
-sprites = SpriteManager()
-
-# Load and scale sprites
-sprites.load("sam", "assets/sprites/sam_sprite.png", (SPRITE_WIDTH, SPRITE_HEIGHT))
-sprites.load("molly", "assets/sprites/molly_sprite.png", (SPRITE_WIDTH, SPRITE_HEIGHT))
-sprites.load("pub", "assets/sprites/LHA.png", (150, 150))
-sprites.load("bar", "assets/sprites/bar.png", (150, 150))
-sprites.load("table", "assets/sprites/table.png", (200, 100))
-sprites.load("door", "assets/sprites/door.png", (100, 100))
-sprites.load("house", "assets/sprites/house.png", (200, 150))
-sprites.load("maggie", "assets/sprites/mag.png", (SPRITE_WIDTH, SPRITE_HEIGHT))
-sprites.load("mike", "assets/sprites/mike.png", (SPRITE_WIDTH, SPRITE_HEIGHT))
-sprites.load("sofa", "assets/sprites/sofa.png", (200, 100))
-sprites.load("heart", "assets/sprites/heart.png", (SPRITE_WIDTH, SPRITE_HEIGHT))
-
-
-# Load the bike sprite with aspect ratio scaling
-sprites.load_with_aspect_ratio("bike", "assets/sprites/bike.png", SPRITE_HEIGHT)
-
-
-# call the sprites
-sam = sprites.get("sam")
-molly = sprites.get("molly")
-bike = sprites.get("bike")
-pub = sprites.get("pub")
-bar = sprites.get("bar")
-table = sprites.get("table")
-door = sprites.get("door")
-house = sprites.get("house")
-maggie = sprites.get("maggie")
-mike = sprites.get("mike")
-sofa = sprites.get("sofa")
-heart = sprites.get("heart")
+# (name, path, size): size is (width, height), or (None, height) to keep the aspect ratio
+SPRITE_MANIFEST = [
+    ("sam", "assets/sprites/sam_sprite.png", (SPRITE_WIDTH, SPRITE_HEIGHT)),
+    ("molly", "assets/sprites/molly_sprite.png", (SPRITE_WIDTH, SPRITE_HEIGHT)),
+    ("bike", "assets/sprites/bike.png", (None, SPRITE_HEIGHT)),
+    ("pub", "assets/sprites/LHA.png", (150, 150)),
+    ("bar", "assets/sprites/bar.png", (150, 150)),
+    ("table", "assets/sprites/table.png", (200, 100)),
+    ("door", "assets/sprites/door.png", (100, 100)),
+    ("house", "assets/sprites/house.png", (200, 150)),
+    ("maggie", "assets/sprites/mag.png", (SPRITE_WIDTH, SPRITE_HEIGHT)),
+    ("mike", "assets/sprites/mike.png", (SPRITE_WIDTH, SPRITE_HEIGHT)),
+    ("sofa", "assets/sprites/sofa.png", (200, 100)),
+    ("heart", "assets/sprites/heart.png", (SPRITE_WIDTH, SPRITE_HEIGHT)),
+]
+
+# Scaled sprites cached between runs; FIRSTDATE_SPRITE_CACHE picks the directory ("" turns it off).
+# Bump the version when the cache format or the scaling changes. No cache in the browser build.
+SPRITE_CACHE_VERSION = 1
+SPRITE_CACHE_HEADER = struct.Struct("<II")  # width, height, then the RGBA pixels
+SPRITE_CACHE_DIR = os.environ.get(
+    "FIRSTDATE_SPRITE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "ourfirstdate", f"sprites-v{SPRITE_CACHE_VERSION}"),
+)
+if sys.platform == "emscripten":
+    SPRITE_CACHE_DIR = ""
+
+# Initialize Sprite Manager; nothing is loaded yet, so the title screen shows straight away
+sprites = SpriteManager(SPRITE_MANIFEST, cache_dir=SPRITE_CACHE_DIR or None, scale=SPRITE_SCALER)
+
+# All the sprites packed into one image by build_atlas.py, so the browser build fetches and decodes
+# one file instead of twelve (the deploy leaves the PNGs it covers out of the bundle);
+# FIRSTDATE_SPRITE_ATLAS=0 loads the individual PNGs instead
+SPRITE_ATLAS_INDEX = os.path.join(BASE_PATH, "assets/sprites/atlas.json")
+if os.environ.get("FIRSTDATE_SPRITE_ATLAS", "1") == "1" and os.path.exists(SPRITE_ATLAS_INDEX):
+    sprites.use_atlas(SPRITE_ATLAS_INDEX)
+
+
+def bind_sprites():
+    """Set the module-level sprites the scenes draw with; called when leaving the title screen."""
+    global sam, molly, bike, pub, bar, table, door, house, maggie, mike, sofa, heart
+    sam = sprites.get("sam")
+    molly = sprites.get("molly")
+    bike = sprites.get("bike")
+    pub = sprites.get("pub")
+    bar = sprites.get("bar")
+    table = sprites.get("table")
+    door = sprites.get("door")
+    house = sprites.get("house")
+    maggie = sprites.get("maggie")
+    mike = sprites.get("mike")
+    sofa = sprites.get("sofa")
+    heart = sprites.get("heart")
+
 
 # Set starting positions for sprites in the first scene they are visible
 sam_pos = pygame.Vector2(100, HEIGHT // 2 - 25)  # Use a vector for the sam's position
@@ -136,14 +776,196 @@ bike_pos = pygame.Vector2(
 
 
 # Function to draw sprites
+@timed("draw_sprite")
 def draw_sprite(sprite, position):
     """Draw a sprite at a given position."""
-    screen.blit(sprite, position)
+    dirty.add(screen.blit(sprite, position))
+
+
+class BackgroundLayers:
+    """
+    Each scene's static layer (the black fill and the props that never move) composed once
+    into a screen-sized surface, so a frame is one blit of that layer plus the moving
+    sprites. A scene whose props can change passes what they depend on as `key`
+    (scene_4 passes whether the door is showing); a different key recomposes the layer.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.layers = {}  # name -> (key, surface)
+        self.builds = 0
+
+    @timed("background")
+    def draw(self, name, compose, key=None):
+        """Blit the layer `name`, first calling compose(surface) to draw it if it is missing or stale."""
+        if not self.enabled:
+            compose(screen)  # every prop drawn straight to the screen, every frame
+            return
+        entry = self.layers.get(name)
+        if entry is None or entry[0] != key:
+            layer = pygame.Surface(screen.get_size()).convert()
+            compose(layer)
+            entry = self.layers[name] = (key, layer)
+            self.builds += 1
+        screen.blit(entry[1], (0, 0))
+        dirty.on_layer(entry[1])
+
+
+# FIRSTDATE_BACKGROUND_CACHE=0 draws the props every frame instead, for comparison
+backgrounds = BackgroundLayers(enabled=os.environ.get("FIRSTDATE_BACKGROUND_CACHE", "1") == "1")
 
 
 # --------------------GRAPHICS----------------------#
+class GifCache:
+    """
+    GIF frames decoded once and scaled to the size they are shown at, together with their
+    durations. prefetch() decodes in a background thread, so scene_1 can get LHA.gif ready
+    while the player cycles and scene_2 plays it straight away; get() decodes in place if
+    nothing was prefetched, and converts the frames to the display format on the main thread.
+    """
+
+    def __init__(self):
+        self.futures = {}  # (path, size) -> Future of (frames, durations), not yet converted
+        self.converted = {}  # (path, size) -> (frames, durations) in the display format
+        self.executor = None
+        self.decode_seconds = {}
+
+    def prefetch(self, path, size=None):
+        key = (path, size)
+        if key not in self.futures and key not in self.converted:
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gif-decode")
+            self.futures[key] = self.executor.submit(self.decode, path, size)
+
+    def get(self, path, size=None):
+        """(frames, durations) for the GIF at `path`, scaled to `size` (None keeps the GIF's own size)."""
+        key = (path, size)
+        if key not in self.converted:
+            if key not in self.futures:
+                future = concurrent.futures.Future()
+                future.set_result(self.decode(path, size))
+                self.futures[key] = future
+            frames, durations = self.futures.pop(key).result()
+            self.converted[key] = [frame.convert_alpha() for frame in frames], durations
+        return self.converted[key]
+
+    def decode(self, path, size):
+        """Decode and scale every frame; runs on the prefetch thread, so nothing here converts."""
+        start = time.perf_counter()
+        gif = Image.open(path)
+        frames = []
+        durations = []
+        for frame in range(gif.n_frames):
+            gif.seek(frame)
+            surface = pygame.image.fromstring(gif.tobytes(), gif.size, gif.mode)
+            if size is not None and surface.get_size() != size:
+                surface = pygame.transform.scale(surface, size)
+            frames.append(surface)
+            # Default 400ms per frame; zero-length frames would never let the playhead catch up
+            durations.append(max(gif.info.get("duration", 400), 10))
+        self.decode_seconds[(path, size)] = time.perf_counter() - start
+        return frames, durations
+
+    def memory_bytes(self):
+        """Pixel memory held by every finished decode."""
+        decoded = [frames for frames, _ in self.converted.values()]
+        decoded += [future.result()[0] for future in self.futures.values() if future.done()]
+        return sum(frame.get_bytesize() * frame.get_width() * frame.get_height() for frames in decoded for frame in frames)
+
+
+gif_cache = GifCache()
+
+
+class GifStream:
+    """
+    A GIF played without decoding it up front: frames come off PIL's ImageSequence iterator
+    in order and wait in a queue of at most `ahead` frames, so memory stays the same however
+    long the animation is and the first frame costs a single decode. With `threaded` a worker
+    thread keeps the queue topped up; without it each frame is decoded when the playhead
+    reaches it. Frames are converted to the display format on the main thread, in frame_at(),
+    and an error in the worker is raised there too. The animation loops until close().
+    """
+
+    def __init__(self, path, size=None, ahead=3, threaded=True):
+        self.path = path
+        self.size = size
+        self.frames = self.decode()
+        self.current = None
+        self.end = 0  # ms into playback at which the current frame stops being shown
+        self.decoded = 0
+        self.error = None  # what stopped the worker, raised again by frame_at()
+        self.running = True
+        self.queue = queue.Queue(maxsize=ahead) if threaded else None
+        self.worker = None
+        if threaded:
+            self.worker = threading.Thread(target=self.fill, name="gif-stream", daemon=True)
+            self.worker.start()
+
+    def decode(self):
+        """(surface, duration) for every frame, starting over at the end; the surfaces are not converted."""
+        while True:
+            with Image.open(self.path) as gif:
+                for frame in ImageSequence.Iterator(gif):
+                    surface = pygame.image.fromstring(frame.tobytes(), frame.size, frame.mode)
+                    if self.size is not None and surface.get_size() != self.size:
+                        surface = pygame.transform.scale(surface, self.size)
+                    self.decoded += 1
+                    # Default 400ms per frame; zero-length frames would never let the playhead catch up
+                    yield surface, max(frame.info.get("duration", 400), 10)
+
+    def fill(self):
+        try:
+            for item in self.frames:
+                if not self.put(item):
+                    return
+        except Exception as error:
+            self.error = error
+            self.put(None)  # tells frame_at() to raise the error rather than wait for a frame
+
+    def put(self, item):
+        """Queue `item` once there is room, unless close() is called first; True if it was queued."""
+        while self.running:
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def frame_at(self, elapsed):
+        """
+        The frame on show `elapsed` ms into playback and the ms until it changes. Frames
+        whose time has already passed are decoded and dropped rather than shown late.
+        """
+        frame = None
+        while frame is None and self.current is None or self.end <= elapsed:
+            item = self.queue.get() if self.queue else next(self.frames)
+            if item is None:
+                raise self.error
+            frame, frame_duration = item
+            self.end += frame_duration
+        if frame is not None:
+            self.current = frame.convert_alpha()
+        return self.current, self.end - elapsed
+
+    def close(self):
+        self.running = False
+        if self.worker is not None:
+            self.worker.join()
+        self.frames.close()
+
+
+def gif_frame_at(frame_ends, elapsed):
+    """
+    Index of the frame on show `elapsed` ms into a looping animation, found by bisecting the
+    cumulative frame end times (itertools.accumulate of the durations) in O(log n). Frames
+    whose time has already passed are skipped rather than shown late.
+    """
+    return bisect.bisect_right(frame_ends, elapsed % frame_ends[-1])
+
+
 # Function to load and display a GIF prior to actionable gameplay
-async def display_gif(screen, gif_path, duration=3000, center=None):
+async def display_gif(screen, gif_path, duration=3000, center=None, stream=False):
     """
     Displays an animated GIF on the screen for a specified duration asynchronously.
 
@@ -152,6 +974,8 @@ async def display_gif(screen, gif_path, duration=3000, center=None):
         gif_path (str): Path to the GIF file.
         duration (int): Duration to display the GIF in milliseconds.
         center (tuple): Center coordinates for the GIF display (default is screen center).
+        stream (bool): Decode frames just ahead of playback with a GifStream instead of
+            playing the whole GIF from the GifCache.
 
     Returns:
         None
@@ -159,52 +983,53 @@ async def display_gif(screen, gif_path, duration=3000, center=None):
     if not HAS_PIL:
         # PIL not available (e.g. web/Pyodide) — skip GIF, just wait
         screen.fill((0, 0, 0))
-        pygame.display.flip()
-        await asyncio.sleep(duration / 1000.0)
+        present()
+        await clock.sleep(duration / 1000.0)
         return
 
-    # Load the GIF using Pillow
-    gif = Image.open(gif_path)
-    frames = []
-    frame_durations = []
+    if stream:
+        # Frames decoded a few ahead of the playhead, never all held at once
+        playback = GifStream(gif_path)
+        frame_at = playback.frame_at
+    else:
+        # Frames decoded once, ahead of time if scene_1 prefetched them
+        frames, frame_durations = gif_cache.get(gif_path)
+        frame_ends = list(itertools.accumulate(frame_durations))  # when each frame stops being shown
 
-    # Extract each frame and its duration
-    for frame in range(gif.n_frames):
-        gif.seek(frame)
-        frame_surface = pygame.image.fromstring(gif.tobytes(), gif.size, gif.mode).convert_alpha()
-        frames.append(frame_surface)
-        frame_durations.append(gif.info.get("duration", 400))  # Default 400ms per frame
+        def frame_at(elapsed):
+            current_frame = gif_frame_at(frame_ends, elapsed)
+            return frames[current_frame], frame_ends[current_frame] - elapsed % frame_ends[-1]
 
-    current_frame = 0
-    start_time = pygame.time.get_ticks()
+    start_time = clock.get_ticks()
 
     # Set center to screen center if not specified
     if center is None:
         center = (screen.get_width() // 2, screen.get_height() // 2)
 
     # Display the animated GIF asynchronously
-    while pygame.time.get_ticks() - start_time < duration:
-        # Determine the current frame to display
-        elapsed_time = pygame.time.get_ticks() - start_time
-        total_duration = sum(frame_durations[: current_frame + 1])
-
-        if elapsed_time > total_duration:
-            current_frame = (current_frame + 1) % len(frames)
-
-        # Display the current frame
-        screen.fill((0, 0, 0))  # Clear the screen
-        gif_rect = frames[current_frame].get_rect(center=center)
-        screen.blit(frames[current_frame], gif_rect)
-        pygame.display.flip()
-
-        # Handle events to allow quitting
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
+    try:
+        while clock.get_ticks() - start_time < duration:
+            # Determine the current frame to display, skipping ahead if the loop fell behind
+            elapsed_time = clock.get_ticks() - start_time
+            frame, frame_remaining = frame_at(elapsed_time)
+
+            # Display the current frame
+            screen.fill((0, 0, 0))  # Clear the screen
+            gif_rect = frame.get_rect(center=center)
+            screen.blit(frame, gif_rect)
+            present()
+
+            # Handle events to allow quitting
+            for event in get_events():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    exit()
 
-        # Pause asynchronously to allow other tasks to run
-        await asyncio.sleep(frame_durations[current_frame] / 1000.0)
+            # Pause asynchronously until the next frame is due
+            await clock.sleep(frame_remaining / 1000.0)
+    finally:
+        if stream:
+            playback.close()
 
 
 # Construct the full path to the GIF
@@ -213,25 +1038,236 @@ gif_path = os.path.join(BASE_PATH, "assets/GIFs/LHA.gif")
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 
+# Transition engine
+class Transitions:
+    """
+    Scene transitions driven by elapsed time on the game clock: a fade, wipe or crossfade
+    lasts `duration` seconds however slow the device is; a slow one just shows fewer steps.
+    Each step is the outgoing snapshot with the cover (a colour, or the incoming scene)
+    blended or wiped over it. The snapshot and cover surfaces are allocated on first use
+    and reused by every later transition; `allocations` counts them.
+    """
+
+    def __init__(self, fps=FPS):
+        self.frame_seconds = 1.0 / fps
+        self.surfaces = {}
+        self.allocations = 0
+
+    def surface(self, name):
+        """The reusable screen-sized surface `name`."""
+        surface = self.surfaces.get(name)
+        if surface is None or surface.get_size() != screen.get_size():
+            surface = self.surfaces[name] = pygame.Surface(screen.get_size()).convert()
+            self.allocations += 1
+        return surface
+
+    async def run(self, kind="fade", duration=0.85, color=BLACK, incoming=None):
+        """
+        Play a transition away from what is on the screen now.
+
+        Args:
+            kind (str): "fade" to `color`, "wipe" of `color` in from the left, or "crossfade" to `incoming`.
+            duration (float): Length in seconds.
+            color (tuple): Colour faded or wiped to.
+            incoming (pygame.Surface): The incoming scene, for a crossfade.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If `kind` is unknown, or a crossfade has no `incoming` scene.
+        """
+        if kind not in ("fade", "wipe", "crossfade"):
+            raise ValueError(f"unknown transition: {kind}")
+        if kind == "crossfade" and incoming is None:
+            raise ValueError("a crossfade needs the incoming scene")
+        outgoing = self.surface("outgoing")
+        outgoing.blit(screen, (0, 0))
+        cover = self.surface("cover")
+        if kind == "crossfade":
+            cover.blit(incoming, (0, 0))
+        else:
+            cover.fill(color)
+
+        start = clock.get_ticks()
+        step = 0
+        progress = 0.0
+        while progress < 1.0:
+            progress = min((clock.get_ticks() - start) / (duration * 1000.0), 1.0)
+            screen.blit(outgoing, (0, 0))
+            if kind == "wipe":
+                screen.blit(cover, (0, 0), (0, 0, round(screen.get_width() * progress), screen.get_height()))
+            else:
+                cover.set_alpha(round(255 * progress))
+                screen.blit(cover, (0, 0))
+            present()
+            frame_scheduler.flush()
+
+            # Wait for the next step on the frame grid, less however long this one took
+            step += 1
+            await clock.sleep(max(0.0, (start + step * self.frame_seconds * 1000.0 - clock.get_ticks()) / 1000.0))
+        cover.set_alpha(None)
+
+
+transitions = Transitions()
+
+
 # Asynchronous Transition Function
-async def scene_transition():
+async def scene_transition(kind="fade", duration=0.85):
     """
-    Animated transition between scenes with a fade-in effect.
+    Animated transition between scenes, a fade to black unless `kind` says otherwise.
     """
-    for alpha in range(0, 256, 10):
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(alpha)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
-        pygame.display.flip()
-        await asyncio.sleep(0.033)  # Approximately 30 FPS (1/30 seconds per frame)
-
-    # Clear screen at the end of the transition
-    screen.fill(BLACK)
-    pygame.display.flip()
-    await asyncio.sleep(0.033)  # Small delay to ensure smooth transition
+    await transitions.run(kind, duration)
+
+
+class Bubbles:
+    """
+    The bubbles of a row of beers, pooled: every beer has `capacity` slots that are allocated
+    once, a free list of the slots it is not using, and a list of the live slots across all the
+    beers, so a bubble is never allocated or freed. spawn() is called per beer as its glass is
+    drawn; step() then moves, clamps, retires and draws the bubbles of every beer in one pass.
+    New bubbles come from `rng`, the `random` module unless a seeded random.Random is passed in,
+    so they repeat exactly.
+    """
+
+    def __init__(self, count, capacity=32, rng=random, radius=2):
+        self.capacity = capacity
+        self.rng = rng
+        self.radius = radius
+        self.dot = pygame.Surface((2 * radius + 1, 2 * radius + 1)).convert()
+        self.dot.set_colorkey(BLACK)
+        pygame.draw.circle(self.dot, WHITE, (radius, radius), radius)
+        # A bubble is the rect its dot is blitted to, and a drift; beer b owns slots b * capacity onwards
+        self.rects = [self.dot.get_rect() for _ in range(count * capacity)]
+        self.blits = [(self.dot, rect) for rect in self.rects]
+        self.dx = [0] * (count * capacity)
+        # Each beer's bounds for those rects
+        self.left = [0] * count
+        self.right = [0] * count
+        self.top = [0] * count
+        self.free = [list(range((beer + 1) * capacity - 1, beer * capacity - 1, -1)) for beer in range(count)]
+        self.live = []  # slots in use, oldest first
+        self.drawn = []  # their blits, kept in step with `live`
+        self.dropped = 0  # bubbles not spawned because their beer's pool was full
+
+    def clear(self, beer=None):
+        """Retire the bubbles of `beer`, or of every beer."""
+        if beer is None:
+            for beer in range(len(self.free)):
+                self.clear(beer)
+            return
+        if len(self.free[beer]) == self.capacity:
+            return  # Already empty
+        first = beer * self.capacity
+        keep = 0
+        for slot in self.live:
+            if first <= slot < first + self.capacity:
+                self.free[beer].append(slot)
+            else:
+                self.live[keep] = slot
+                self.drawn[keep] = self.blits[slot]
+                keep += 1
+        del self.live[keep:], self.drawn[keep:]
+
+    def spawn(self, beer, left, right, top, bottom):
+        """Maybe add a bubble to `beer`, whose bubbles stay within left..right and below `top`."""
+        radius = self.radius
+        self.left[beer], self.right[beer], self.top[beer] = left - radius, right - radius, top - radius
+        if self.rng.random() < 0.2:  # Probability of adding a bubble
+            x = self.rng.randint(left, right)
+            y = self.rng.randint(top, bottom)
+            dx = self.rng.choice((-1, 0, 1))  # Random horizontal drift
+            if self.free[beer]:
+                slot = self.free[beer].pop()
+                self.rects[slot].x, self.rects[slot].y = x - radius, y - radius
+                self.dx[slot] = dx
+                self.live.append(slot)
+                self.drawn.append(self.blits[slot])
+            else:
+                self.dropped += 1
+
+    def step(self, surface):
+        """Move every bubble up one pixel and along its drift, retire those that leave their beer, and draw the rest."""
+        rects, live, drawn = self.rects, self.live, self.drawn
+        keep = 0
+        for slot in live:
+            beer = slot // self.capacity
+            rect = rects[slot]
+            rect.y -= 1  # Move upward
+            if rect.y <= self.top[beer]:
+                self.free[beer].append(slot)  # Left the orange part
+                continue
+            # Apply horizontal drift, keeping bubbles within the beer width
+            rect.x = max(self.left[beer], min(rect.x + self.dx[slot], self.right[beer]))
+            live[keep] = slot
+            drawn[keep] = self.blits[slot]
+            keep += 1
+        del live[keep:], drawn[keep:]
+        surface.blits(drawn, doreturn=False)
+
+
+class BeerGlasses:
+    """
+    A beer glass in each of its four fill states (0: full, 1: 2/3 full, 2: 1/3 full, 3: empty),
+    drawn once per glass size into a surface the size of the glass, so drawing a beer is one
+    blit. With `enabled` off every glass is drawn rect by rect, every frame, as it used to be.
+    """
+
+    KEY = (255, 0, 255)  # transparent; not a colour any glass uses
 
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.surfaces = {}  # (width, height, state) -> surface
+        self.renders = 0
 
+    @staticmethod
+    def orange(beer, state):
+        """The (top, height) of the orange content of `beer` in `state`, or None when it is empty."""
+        if state == 0:  # Full beer
+            return beer.y, beer.height
+        if state == 1:  # 2/3 full beer
+            return beer.y + beer.height // 3, beer.height * 2 // 3
+        if state == 2:  # 1/3 full beer
+            return beer.y + beer.height * 2 // 3, beer.height // 3
+        return None  # Empty beer: no orange content
+
+    def render(self, surface, beer, state):
+        """Draw the glass `beer` in `state` onto `surface`."""
+        # Draw beer outline
+        pygame.draw.rect(surface, BLACK, beer, 2)  # Black outline
+
+        # Draw orange content and white line
+        orange = self.orange(beer, state)
+        if state == 0:  # Full beer
+            pygame.draw.rect(surface, ORANGE, beer.inflate(-2, -2))
+            pygame.draw.rect(surface, WHITE, (beer.x + 2, beer.y + 2, beer.width - 4, 5))  # White line at the top
+        elif orange is not None:  # 2/3 or 1/3 full beer
+            orange_top, orange_height = orange
+            pygame.draw.rect(surface, ORANGE, (beer.x + 2, orange_top, beer.width - 4, orange_height))
+            pygame.draw.rect(surface, WHITE, (beer.x + 2, orange_top - 3, beer.width - 4, 5))  # White line just above orange
+        else:  # Empty beer
+            pygame.draw.rect(surface, BLACK, beer.inflate(-2, -2), 2)  # Thin black outline, no fill
+
+    def draw(self, beer, state):
+        """Draw the glass `beer` in `state` on the screen."""
+        if not self.enabled:
+            self.render(screen, beer, state)
+            return
+        key = (beer.width, beer.height, state)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = pygame.Surface(beer.size).convert()
+            surface.fill(self.KEY)
+            surface.set_colorkey(self.KEY)
+            self.render(surface, pygame.Rect((0, 0), beer.size), state)
+            self.renders += 1
+        screen.blit(surface, beer)
+
+
+beer_glasses = BeerGlasses(enabled=os.environ.get("FIRSTDATE_BEER_GLASSES", "1") == "1")
+
+
+@timed("draw_beers")
 def draw_beers(beers, beer_states, bubbles):
     """
     Draws beers on the screen with their current states and animations.
@@ -239,62 +1275,27 @@ def draw_beers(beers, beer_states, bubbles):
     Args:
         beers (list): List of beer rectangles.
         beer_states (list): List of states for each beer (0: full, 1: 2/3 full, 2: 1/3 full, 3: empty).
-        bubbles (list): List of bubble animations for each beer.
+        bubbles (Bubbles): The bubbles in each beer.
 
     Returns:
         None
     """
     for i, beer in enumerate(beers):
-        # Draw beer outline
-        pygame.draw.rect(screen, BLACK, beer, 2)  # Black outline
+        dirty.add(beer.inflate(6, 6))  # the glass and the bubbles at its edges
+
         state = beer_states[i]
+        beer_glasses.draw(beer, state)
 
-        # Draw orange content and white line
-        if state == 0:  # Full beer
-            orange_top = beer.y
-            orange_height = beer.height
-            pygame.draw.rect(screen, ORANGE, beer.inflate(-2, -2))
-            pygame.draw.rect(screen, WHITE, (beer.x + 2, beer.y + 2, beer.width - 4, 5))  # White line at the top
-        elif state == 1:  # 2/3 full beer
-            orange_top = beer.y + beer.height // 3
-            orange_height = beer.height * 2 // 3
-            pygame.draw.rect(screen, ORANGE, (beer.x + 2, orange_top, beer.width - 4, orange_height))
-            pygame.draw.rect(screen, WHITE, (beer.x + 2, orange_top - 3, beer.width - 4, 5))  # White line just above orange
-        elif state == 2:  # 1/3 full beer
-            orange_top = beer.y + beer.height * 2 // 3
-            orange_height = beer.height // 3
-            pygame.draw.rect(screen, ORANGE, (beer.x + 2, orange_top, beer.width - 4, orange_height))
-            pygame.draw.rect(screen, WHITE, (beer.x + 2, orange_top - 3, beer.width - 4, 5))  # White line just above orange
-        elif state == 3:  # Empty beer
-            orange_top = None  # No orange content
-            orange_height = 0
-            pygame.draw.rect(screen, BLACK, beer.inflate(-2, -2), 2)  # Thin black outline, no fill
-
-        # Add and animate bubbles
-        if orange_top is not None:  # Only beers with orange content have bubbles
-            # Add new bubbles randomly within the orange part
-            if random.random() < 0.2:  # Probability of adding a bubble
-                x = random.randint(beer.x + 3, beer.x + beer.width - 3)
-                y = random.randint(orange_top, orange_top + orange_height - 3)
-                dx = random.choice([-1, 0, 1])  # Random horizontal drift
-                bubbles[i].append([x, y, dx])  # Bubble has x, y, and horizontal drift
-
-            # Move bubbles upward and horizontally, remove those that leave the orange part
-            for bubble in bubbles[i]:
-                bubble[0] += bubble[2]  # Apply horizontal drift
-                bubble[1] -= 1  # Move upward
-                # Keep bubbles within the beer width
-                if bubble[0] < beer.x + 3 or bubble[0] > beer.x + beer.width - 3:
-                    bubble[0] = max(beer.x + 3, min(bubble[0], beer.x + beer.width - 3))
-            # Remove bubbles that leave the orange part
-            bubbles[i] = [bubble for bubble in bubbles[i] if bubble[1] > orange_top]
-
-            # Draw bubbles
-            for x, y, _ in bubbles[i]:
-                pygame.draw.circle(screen, WHITE, (x, y), 2)
+        # Add bubbles randomly within the orange part; only beers with orange content have bubbles
+        orange = beer_glasses.orange(beer, state)
+        if orange is not None:
+            orange_top, orange_height = orange
+            bubbles.spawn(i, beer.x + 3, beer.x + beer.width - 3, orange_top, orange_top + orange_height - 3)
         else:
-            # Clear bubbles if the beer is empty
-            bubbles[i] = []
+            bubbles.clear(i)  # Clear bubbles if the beer is empty
+
+    # Move and draw the bubbles of all the beers together (each stays inside its own glass)
+    bubbles.step(screen)
 
 
 beer_states = [1, 1, 1, 1, 1]  # All beers start as full
@@ -309,25 +1310,25 @@ async def take_picture():
     - Displays the snapshot image on a white background with a black scene.
     """
     # Display the instruction
-    instruction = font_small.render("Press ENTER to take the picture!", True, WHITE)
+    instruction = render_text(font_small, "Press ENTER to take the picture!", True, WHITE)
     screen.blit(instruction, (WIDTH // 2 - instruction.get_width() // 2, HEIGHT - 200))
-    pygame.display.flip()
+    present()
 
     # Wait for the ENTER key asynchronously
     waiting = True
     while waiting:
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
                 # Flash the screen white
                 screen.fill(WHITE)
-                pygame.display.flip()
-                await asyncio.sleep(0.2)  # Wait asynchronously
+                present()
+                await clock.sleep(0.2)  # Wait asynchronously
                 waiting = False  # Exit the loop
 
-        await asyncio.sleep(0)  # Allow other tasks to run
+        await clock.sleep(0)  # Allow other tasks to run
 
     # Display the scene with a black background
     screen.fill(BLACK)
@@ -348,7 +1349,7 @@ async def take_picture():
     snapshot_image = pygame.image.load(snapshot_path)
     snapshot_image = pygame.transform.scale(snapshot_image, (picture_width, picture_height))
     screen.blit(snapshot_image, (picture_x, picture_y))
-    pygame.display.flip()  # Update the screen to show the image
+    present()  # Update the screen to show the image
 
 
 # --------------------DIALOGUE----------------------#
@@ -381,30 +1382,32 @@ async def text_box(*lines):
     box_active = True
 
     while box_active:
-        # Clear the dialog surface
-        dialog_surface.fill((0, 0, 0, 0))  # Transparent background
-
-        # Draw the box on the surface
-        pygame.draw.rect(dialog_surface, WHITE, (0, 0, box_width, box_height))
-        pygame.draw.rect(dialog_surface, BLACK, (10, 10, box_width - 20, box_height - 20))
-
-        # Render and display the current box's lines
-        if current_box_index < len(processed_boxes):
-            current_box = processed_boxes[current_box_index]
-            for i, line in enumerate(current_box):
-                text_surface = font.render(line, True, WHITE)
-                dialog_surface.blit(text_surface, (20, 20 + i * line_height))
-
-        # Draw the down arrow if there are more boxes to display
-        down_arrow = font.render("\u25BC", True, WHITE)
-        dialog_surface.blit(down_arrow, (box_width - 40, box_height - 35))
-
-        # Blit the dialog surface onto the main screen
-        screen.blit(dialog_surface, (box_x, box_y))
-        pygame.display.flip()
+        # Only the drawing is profiled; the rest of the loop is waiting for a key
+        with profiler.section("text_box"):
+            # Clear the dialog surface
+            dialog_surface.fill((0, 0, 0, 0))  # Transparent background
+
+            # Draw the box on the surface
+            pygame.draw.rect(dialog_surface, WHITE, (0, 0, box_width, box_height))
+            pygame.draw.rect(dialog_surface, BLACK, (10, 10, box_width - 20, box_height - 20))
+
+            # Render and display the current box's lines
+            if current_box_index < len(processed_boxes):
+                current_box = processed_boxes[current_box_index]
+                for i, line in enumerate(current_box):
+                    text_surface = render_text(font, line, True, WHITE)
+                    dialog_surface.blit(text_surface, (20, 20 + i * line_height))
+
+            # Draw the down arrow if there are more boxes to display
+            down_arrow = render_text(font, "\u25BC", True, WHITE)
+            dialog_surface.blit(down_arrow, (box_width - 40, box_height - 35))
+
+            # Blit the dialog surface onto the main screen
+            screen.blit(dialog_surface, (box_x, box_y))
+        present()
 
         # Event handling
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -419,21 +1422,127 @@ async def text_box(*lines):
                     current_box_index -= 1
 
         # Yield control to the event loop
-        await asyncio.sleep(0)
+        await clock.sleep(0)
 
     # Clear the dialog box by not blitting the surface after the loop ends
-    pygame.display.flip()
+    present()
 
 
 dialog_triggered = False  # Add a flag to control dialog triggering
+game_finished = False  # Set once game_completed has played out
+
 
+class Fireworks:
+    """
+    The finale's fireworks as one particle system. Rockets are few and stay in a list; the
+    particles of every burst share contiguous NumPy arrays (position, velocity, lifetime,
+    colour) that are updated together and compacted in place once some burn out, and are
+    drawn with one blits() call from a pre-drawn dot per colour. A colour not in the palette
+    passed in is added to it the first time a firework uses it.
 
+    Takes the same firework dicts as the list draw_fireworks() used to walk, via append().
+    """
+
+    def __init__(self, colors, burst=60, spread=8, lifetime=(20, 40), radius=3, rocket_radius=4, capacity=1024):
+        self.burst = burst
+        self.spread = spread
+        self.lifetime_range = lifetime
+        self.radius = radius
+        self.rocket_radius = rocket_radius
+        # Seeded from `random` so a seeded run repeats exactly
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.colors = []
+        self.color_indices = {}  # colour -> its index in colors and dots
+        self.dots = np.empty(0, dtype=object)
+        for color in colors:
+            self.color_index(color)
+        self.rockets = []  # [x, y, speed, explosion height, colour index]
+        self.position = np.empty((capacity, 2), dtype=np.float64)
+        self.velocity = np.empty((capacity, 2), dtype=np.float64)
+        self.lifetime = np.empty(capacity, dtype=np.int16)
+        self.color = np.empty(capacity, dtype=np.intp)
+        self.count = 0
+        self.particle_frames = 0  # particles updated, summed over frames
+
+    def append(self, firework):
+        """Launch a rocket from a firework dict (position, speed, explosion_height, color)."""
+        x, y = firework["position"]
+        self.rockets.append([x, y, firework["speed"], firework["explosion_height"], self.color_index(firework["color"])])
+
+    def color_index(self, color):
+        """The palette index of `color`, adding it and pre-drawing its dot on first use."""
+        color = tuple(color)
+        index = self.color_indices.get(color)
+        if index is None:
+            dot = pygame.Surface((2 * self.radius + 1, 2 * self.radius + 1)).convert()
+            dot.set_colorkey(BLACK)
+            pygame.draw.circle(dot, color, (self.radius, self.radius), self.radius)
+            index = self.color_indices[color] = len(self.colors)
+            self.colors.append(color)
+            dots = np.empty(index + 1, dtype=object)
+            dots[:index] = self.dots
+            dots[index] = dot
+            self.dots = dots
+        return index
+
+    def __len__(self):
+        return len(self.rockets) + self.count
+
+    def explode(self, x, y, color):
+        """Add a burst of particles at (x, y), growing the arrays if they are full."""
+        start, end = self.count, self.count + self.burst
+        if end > len(self.lifetime):
+            capacity = max(end, 2 * len(self.lifetime))
+            for name in ("position", "velocity", "lifetime", "color"):
+                old = getattr(self, name)
+                grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:start] = old[:start]
+                setattr(self, name, grown)
+        self.position[start:end] = (x, y)
+        self.velocity[start:end] = self.rng.uniform(-self.spread, self.spread, (self.burst, 2))
+        low, high = self.lifetime_range
+        self.lifetime[start:end] = self.rng.integers(low, high + 1, self.burst)
+        self.color[start:end] = color
+        self.count = end
+
+    def step(self, surface):
+        """Advance one frame and draw it: particles first, then rockets, then any new bursts."""
+        count = self.count
+        if count:
+            self.position[:count] += self.velocity[:count]
+            self.lifetime[:count] -= 1
+            self.particle_frames += count
+            corners = (self.position[:count].astype(np.int32) - self.radius).tolist()
+            surface.blits(zip(self.dots[self.color[:count]], corners), doreturn=False)
+
+            # Compact the survivors to the front, keeping their order
+            alive = self.lifetime[:count] > 0
+            if not alive.all():
+                keep = np.flatnonzero(alive)
+                for array in (self.position, self.velocity, self.lifetime, self.color):
+                    array[:len(keep)] = array[keep]
+                self.count = len(keep)
+
+        for rocket in self.rockets[:]:
+            rocket[1] -= rocket[2]
+            pygame.draw.circle(surface, self.colors[rocket[4]], (int(rocket[0]), int(rocket[1])), self.rocket_radius)
+            if rocket[1] <= rocket[3]:
+                self.rockets.remove(rocket)
+                self.explode(rocket[0], rocket[1], rocket[4])
+
+
+@timed("draw_fireworks")
 async def draw_fireworks(fireworks):
     """
     Draw and update fireworks on the screen asynchronously with faster and more explosive effects.
     Args:
-        fireworks (list): List of active fireworks, each with position, state, and particles.
+        fireworks (Fireworks or list): The particle system, or without NumPy a list of active
+            fireworks, each with position, state, and particles.
     """
+    if isinstance(fireworks, Fireworks):
+        fireworks.step(screen)
+        await clock.sleep(0)
+        return
     for firework in fireworks[:]:
         if firework["state"] == "ascending":
             # Update the firework's position
@@ -473,7 +1582,7 @@ async def draw_fireworks(fireworks):
                 fireworks.remove(firework)
 
     # Yield control to the asyncio loop
-    await asyncio.sleep(0)
+    await clock.sleep(0)
 
 
 # --------------------MOVEMENT----------------------#
@@ -572,7 +1681,7 @@ async def apply_idle_sway_with_follow(
         molly_pos.x += follow_speed * (dx / distance)
         molly_pos.y += follow_speed * (dy / distance)
 
-    await asyncio.sleep(0)  # Allow other tasks to run
+    await clock.sleep(0)  # Allow other tasks to run
     return sam_pos, molly_pos, sway_timer, sway_direction
 
 
@@ -586,26 +1695,26 @@ async def minigame_scene_3():
 
     # Show instructions screen
     screen.fill(BLACK)
-    instructions = font_small.render("Match the keys to drink the beers!", True, WHITE)
-    prompt = font_small.render("Press ENTER to start", True, WHITE)
+    instructions = render_text(font_small, "Match the keys to drink the beers!", True, WHITE)
+    prompt = render_text(font_small, "Press ENTER to start", True, WHITE)
     screen.blit(instructions, (WIDTH // 2 - instructions.get_width() // 2, HEIGHT // 2 - 50))
     screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, HEIGHT // 2 + 10))
-    pygame.display.flip()
+    present()
 
     # Wait for ENTER to start
     waiting = True
     while waiting:
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
                 waiting = False
-        await asyncio.sleep(0)  # Yield control to the event loop
+        await clock.sleep(0)  # Yield control to the event loop
 
     # Initialize game state
     target_key = None
-    prompt_time = pygame.time.get_ticks()
+    prompt_time = clock.get_ticks()
     sobriety_bar = 100  # Full at start
     beer_index = 0  # Current beer being consumed
     state_index = 0  # Current state of the beer (0: full, 1: two-thirds full, 2: one-third full, 3: empty)
@@ -615,13 +1724,13 @@ async def minigame_scene_3():
 
     # Mini-game loop
     while beer_index < len(beers):
-        current_time = pygame.time.get_ticks()
+        current_time = clock.get_ticks()
         elapsed_time = (current_time - prompt_time) / 1000.0  # In seconds
 
         # Generate a new key sequence if none is active
         if target_key is None:
             target_key = random.choice([pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT])
-            prompt_time = pygame.time.get_ticks()
+            prompt_time = clock.get_ticks()
 
         # Clear the screen
         screen.fill(BLACK)
@@ -630,16 +1739,16 @@ async def minigame_scene_3():
         # Draw beers and the sobriety bar
         draw_beers(beers, beer_states, bubbles)
         pygame.draw.rect(screen, (0, 255, 0), (50, 20, sobriety_bar * 3, 20))
-        sobriety_text = font_small.render("Sobriety", True, WHITE)
+        sobriety_text = render_text(font_small, "Sobriety", True, WHITE)
         screen.blit(sobriety_text, (50, 50))
 
         # Draw the key prompt
-        prompt_text = font_small.render(f"Press: {pygame.key.name(target_key)}", True, WHITE)
+        prompt_text = render_text(font_small, f"Press: {pygame.key.name(target_key)}", True, WHITE)
         screen.blit(prompt_text, (WIDTH // 2 - prompt_text.get_width() // 2, HEIGHT // 2 + 50))
-        pygame.display.flip()
+        present()
 
         # Check for events
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -650,7 +1759,7 @@ async def minigame_scene_3():
                     if state_index == 2:
                         # Last sip of the current beer
                         beer_states[beer_index] = 3  # Empty the current beer
-                        bubbles[beer_index] = []  # Clear bubbles for the current beer
+                        bubbles.clear(beer_index)  # Clear bubbles for the current beer
                         beer_index += 1  # Move to the next beer
                         state_index = 0  # Reset state for the next beer
                     else:
@@ -660,24 +1769,24 @@ async def minigame_scene_3():
                 elif event.key != target_key:
                     sobriety_bar = max(0, sobriety_bar - 5)  # Incorrect key press reduces the bar
 
-        await asyncio.sleep(0)  # Yield control to the event loop
+        await clock.sleep(0)  # Yield control to the event loop
 
     # Ensure all beers are empty before displaying the message
     for i in range(len(beer_states)):
         beer_states[i] = 3
-    bubbles = [[] for _ in range(len(beers))]
+    bubbles.clear()
 
     # Final display update for the last sip
     screen.fill(BLACK)
     screen.blit(table, (table_rect.x, table_rect.y))
     draw_beers(beers, beer_states, bubbles)
     pygame.draw.rect(screen, (0, 255, 0), (50, 20, sobriety_bar * 3, 20))
-    sobriety_text = font_small.render("Sobriety", True, WHITE)
+    sobriety_text = render_text(font_small, "Sobriety", True, WHITE)
     screen.blit(sobriety_text, (50, 50))
-    pygame.display.flip()
+    present()
 
     # Show congratulations message
-    await asyncio.sleep(0.5)  # Pause briefly for the final update
+    await clock.sleep(0.5)  # Pause briefly for the final update
     await text_box("Congratulations! You finished all the beers!")
     actionable = True
 
@@ -692,22 +1801,22 @@ async def minigame_scene_5():
     screen.fill(BLACK)
     instruction_lines = ["Get to the house!", "Arrow keys to move."]
     for i, line in enumerate(instruction_lines):
-        rendered_line = font_small.render(line, True, WHITE)
+        rendered_line = render_text(font_small, line, True, WHITE)
         screen.blit(rendered_line, (WIDTH // 2 - rendered_line.get_width() // 2, HEIGHT // 2 - 60 + i * 30))
-    prompt = font_small.render("Press ENTER to start", True, WHITE)
+    prompt = render_text(font_small, "Press ENTER to start", True, WHITE)
     screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, HEIGHT // 2 + 50))
-    pygame.display.flip()
+    present()
 
     # Wait for ENTER to start asynchronously
     waiting = True
     while waiting:
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
                 waiting = False
-        await asyncio.sleep(0)  # Allow the event loop to continue processing
+        await clock.sleep(0)  # Allow the event loop to continue processing
 
     # Initialize sway parameters
     sway_timer = 0
@@ -728,7 +1837,7 @@ async def minigame_scene_5():
         draw_sprite(molly, (molly_pos.x, molly_pos.y))
 
         # Apply sway and following behavior
-        keys = pygame.key.get_pressed()
+        keys = get_pressed()
         sam_pos, molly_pos, sway_timer, sway_direction = await apply_idle_sway_with_follow(
             sam_pos, molly_pos, sway_timer, sway_direction, sway_magnitude, sway_frequency, keys
         )
@@ -738,8 +1847,8 @@ async def minigame_scene_5():
         if sam_rect.colliderect(house_rect):
             break
 
-        pygame.display.flip()
-        await asyncio.sleep(0)  # Allow other tasks to run
+        present()
+        await clock.sleep(0)  # Allow other tasks to run
 
 
 # ------------------------------------------------------------------
@@ -755,20 +1864,20 @@ async def minigame_scene_6():
             "Press ENTER to start.",
         ]
         for i, line in enumerate(instructions):
-            rendered_line = font_small.render(line, True, WHITE)
+            rendered_line = render_text(font_small, line, True, WHITE)
             screen.blit(rendered_line, (WIDTH // 2 - rendered_line.get_width() // 2, HEIGHT // 2 - 60 + i * 30))
-        pygame.display.flip()
+        present()
 
         # Wait for ENTER to start
         waiting = True
         while waiting:
-            for event in pygame.event.get():
+            for event in get_events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
                     waiting = False
-            await asyncio.sleep(0)  # Allow event loop to continue
+            await clock.sleep(0)  # Allow event loop to continue
 
     # Show instructions once
     if not hasattr(minigame_scene_6, "instructions_shown"):
@@ -780,8 +1889,7 @@ async def minigame_scene_6():
     heart_speed = 13
     heart_direction = 1
     heart_size = (80, 80)  # Larger heart size
-    heart_image = pygame.image.load(os.path.join(BASE_PATH, "assets/sprites/heart.png"))
-    heart_image = pygame.transform.scale(heart_image, heart_size)
+    heart_image = sprites.get_variant("heart", size=heart_size)
 
     # Define the target area for the heart
     target_area_width = 100  # Width of the target area
@@ -794,7 +1902,7 @@ async def minigame_scene_6():
 
         # Mini-game loop
         while not success:
-            for event in pygame.event.get():
+            for event in get_events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
@@ -824,8 +1932,8 @@ async def minigame_scene_6():
             # Draw the heart
             screen.blit(heart_image, (heart_pos_x, target_area_y - heart_size[1] // 2))  # Center heart over the line
 
-            pygame.display.flip()
-            await asyncio.sleep(0)  # Allow event loop to process
+            present()
+            await clock.sleep(0)  # Allow event loop to process
 
         # Post-mini-game outcome
         if success:
@@ -840,13 +1948,13 @@ async def game_completed():
     """
     End the game with a faster and more explosive fireworks animation, display a thank-you message, and fade to black.
     """
-    fireworks = []  # Active fireworks
     colors = [(128, 0, 128), (0, 255, 0), (0, 0, 255), (255, 255, 255)]  # Purple, green, blue, white
+    fireworks = Fireworks(colors) if HAS_NUMPY else []  # Active fireworks
 
     # Fireworks animation
     fireworks_duration = 5  # Display fireworks for 3 seconds
-    start_time = pygame.time.get_ticks()
-    while (pygame.time.get_ticks() - start_time) / 1000 < fireworks_duration:
+    start_time = clock.get_ticks()
+    while (clock.get_ticks() - start_time) / 1000 < fireworks_duration:
         screen.fill(BLACK)
 
         # Launch new fireworks more frequently
@@ -864,12 +1972,12 @@ async def game_completed():
 
         # Draw and update fireworks
         await draw_fireworks(fireworks)
-        pygame.display.flip()
-        await asyncio.sleep(0.016)  # ~60 FPS
+        present()
+        await clock.sleep(0.016)  # ~60 FPS
 
     # Proceed to thank-you message
     screen.fill(BLACK)
-    await asyncio.sleep(0.5)  # Brief pause before showing the picture
+    await clock.sleep(0.5)  # Brief pause before showing the picture
 
     # Display the picture
     box_width, box_height = int(WIDTH * 0.6), int(HEIGHT * 0.6)
@@ -884,8 +1992,8 @@ async def game_completed():
     snapshot_image = pygame.image.load(snapshot_path)
     snapshot_image = pygame.transform.scale(snapshot_image, (picture_width, picture_height))
     screen.blit(snapshot_image, (picture_x, picture_y))
-    pygame.display.flip()
-    await asyncio.sleep(0.2)  # Display the picture for 2 seconds
+    present()
+    await clock.sleep(0.2)  # Display the picture for 2 seconds
 
     # Display the text box
     await text_box(
@@ -897,21 +2005,17 @@ async def game_completed():
 
     # Happy Anniversary screen
     screen.fill(BLACK)
-    message = font_large.render("Happy Anniversary!", True, WHITE)
+    message = render_text(font_large, "Happy Anniversary!", True, WHITE)
     screen.blit(message, (WIDTH // 2 - message.get_width() // 2, HEIGHT // 2 - message.get_height() // 2))
-    pygame.display.flip()
-    await asyncio.sleep(2)
+    present()
+    await clock.sleep(2)
 
     # Fade to black
-    for alpha in range(0, 256, 10):
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(alpha)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
-        pygame.display.flip()
-        await asyncio.sleep(0.03)
+    await transitions.run("fade", duration=0.8)
 
     # End the game
+    global game_finished
+    game_finished = True
     pygame.quit()
     sys.exit()
 
@@ -928,9 +2032,9 @@ async def scene_0(keys, event):
     screen.fill(BLACK)
 
     # Render text
-    title_text = font_large.render("Where it all began", True, WHITE)
-    subtitle_text = font_small.render("Sam and Molly's first date", True, WHITE)
-    prompt_text = font_small.render("Press ENTER to start", True, WHITE)
+    title_text = render_text(font_large, "Where it all began", True, WHITE)
+    subtitle_text = render_text(font_small, "Sam and Molly's first date", True, WHITE)
+    prompt_text = render_text(font_small, "Press ENTER to start", True, WHITE)
 
     # Center text on the screen
     screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 2 - 100))
@@ -939,7 +2043,8 @@ async def scene_0(keys, event):
 
     # Handle key press for scene transition
     if event and event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
-        await asyncio.sleep(0.2)  # Optional delay for smoother transition
+        await clock.sleep(0.2)  # Optional delay for smoother transition
+        bind_sprites()
         scene = 1
 
 
@@ -958,8 +2063,9 @@ async def scene_1(keys):
     if not hasattr(scene_1, "pub_reached"):
         scene_1.pub_reached = False
     scene_1.molly_near_sam = False  # Track if Molly has caught up to Sam
-
-    screen.fill(BLACK)
+    if not hasattr(scene_1, "gif_prefetched") and HAS_PIL and sys.platform != "emscripten":
+        gif_cache.prefetch(gif_path)  # decoded while cycling, shown in scene_2
+        scene_1.gif_prefetched = True
 
     # Get the sprites for the scene
     sam = sprites.get("sam")
@@ -971,8 +2077,12 @@ async def scene_1(keys):
     pub_rect = pub.get_rect(midright=(WIDTH - 40, HEIGHT // 2))
     sam_rect = pygame.Rect(sam_pos.x, sam_pos.y, SPRITE_WIDTH, SPRITE_HEIGHT)
 
-    # Draw the pub
-    screen.blit(pub, (pub_rect.x, pub_rect.y))
+    # Draw the background and the pub
+    def compose(layer):
+        layer.fill(BLACK)
+        layer.blit(pub, (pub_rect.x, pub_rect.y))
+
+    backgrounds.draw("scene_1", compose)
 
     # Draw the player sprite
     draw_sprite(sam, (sam_pos.x, sam_pos.y))
@@ -1010,9 +2120,9 @@ async def scene_1(keys):
 
             if sam_rect.colliderect(molly_rect):
                 actionable = False
-                exclamation = font_small.render("!", True, WHITE)
-                screen.blit(exclamation, (sam_pos.x + 15, sam_pos.y - 30))
-                screen.blit(exclamation, (molly_pos.x + 15, molly_pos.y - 30))
+                exclamation = render_text(font_small, "!", True, WHITE)
+                dirty.add(screen.blit(exclamation, (sam_pos.x + 15, sam_pos.y - 30)))
+                dirty.add(screen.blit(exclamation, (molly_pos.x + 15, molly_pos.y - 30)))
 
                 if not scene_1.interacted:
                     await text_box(
@@ -1043,12 +2153,12 @@ async def scene_1(keys):
                 screen.fill(BLACK)
 
                 # Display "You made it to the pub! Press ENTER to continue"
-                dialogue_text = font_large.render("You made it to the pub!", True, WHITE)
-                prompt_text = font_small.render("Press ENTER to continue", True, WHITE)
+                dialogue_text = render_text(font_large, "You made it to the pub!", True, WHITE)
+                prompt_text = render_text(font_small, "Press ENTER to continue", True, WHITE)
 
                 screen.blit(dialogue_text, (WIDTH // 2 - dialogue_text.get_width() // 2, HEIGHT // 2 - 50))
                 screen.blit(prompt_text, (WIDTH // 2 - prompt_text.get_width() // 2, HEIGHT // 2 + 50))
-                pygame.display.flip()
+                present()
 
                 # Wait for ENTER key to transition to Scene 2
                 if keys[pygame.K_RETURN]:
@@ -1079,16 +2189,16 @@ async def scene_2(keys):
         actionable = True
         scene_2.gif_displayed = True
 
-    # Fill the screen with black
-    screen.fill(BLACK)
-
-    # Draw the bar sprite
+    # Draw the background: the bar sprite and the instructions
     bar_rect = bar.get_rect(midtop=(WIDTH - 150, HEIGHT // 2 - 100))  # Adjusted to center vertically
-    draw_sprite(bar, (bar_rect.x, bar_rect.y))
 
-    # Render instructional text
-    instruction_text = font_small.render("Walk to the bar", True, WHITE)
-    screen.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, 20))  # Centered at the top
+    def compose(layer):
+        layer.fill(BLACK)
+        layer.blit(bar, (bar_rect.x, bar_rect.y))
+        instruction_text = render_text(font_small, "Walk to the bar", True, WHITE)
+        layer.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, 20))  # Centered at the top
+
+    backgrounds.draw("scene_2", compose)
 
     # Draw the sam and molly sprites
     draw_sprite(sam, (sam_pos.x, sam_pos.y))
@@ -1122,33 +2232,50 @@ async def scene_2(keys):
 # ----------------------------------SCENE 3-----------------------------#
 
 
+class BarScene:
+    """
+    Scene 3's state, built once when the scene is entered: the table, door and beer geometry
+    and the interaction zones around them, the beers' bubbles (which carry on from frame to
+    frame), and the story flags. A frame only moves the sprites and draws.
+    """
+
+    def __init__(self):
+        # Set positions for the door and table
+        self.table_rect = table.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+        self.door_rect = door.get_rect(midtop=(WIDTH - 75, 50))
+        self.table_zone = self.table_rect.inflate(1, 1)  # Expand interaction zone by 1 pixel on all sides
+        self.door_zone = self.door_rect.inflate(1, 1)  # Expand interaction zone for the door
+
+        # The beers on the table, and their bubbles
+        self.beers = [pygame.Rect(self.table_rect.x + 40 + i * 30, self.table_rect.y - 22, 20, 50) for i in range(5)]
+        self.bubbles = Bubbles(len(self.beers))
+
+        self.sam_rect = pygame.Rect(0, 0, SPRITE_WIDTH, SPRITE_HEIGHT)  # moved to Sam every frame
+        self.game_played = False
+        self.molly_burped = False
+        self.molly_near_sam = False
+
+    def compose(self, layer):
+        """The background: table and door sprites."""
+        layer.fill(BLACK)
+        layer.blit(table, (self.table_rect.x, self.table_rect.y))
+        layer.blit(door, (self.door_rect.x, self.door_rect.y))
+
+
 async def scene_3(keys):
-    global scene, sam, molly, actionable, sam_pos, molly_pos, scene3, beers, beer_states, bubbles, table, table_rect
+    global scene, sam, molly, actionable, sam_pos, molly_pos, scene3, beers, beer_states, bubbles, table_rect
 
     # Initialize elements
     if not hasattr(scene_3, "initialized"):
         sam_pos = pygame.Vector2(100, HEIGHT // 2)
         molly_pos = pygame.Vector2(200, HEIGHT // 2)
         actionable = True
-        scene_3.game_played = False
+        scene3 = BarScene()
+        beers, bubbles, table_rect = scene3.beers, scene3.bubbles, scene3.table_rect  # shared with the minigame
         scene_3.initialized = True
-        scene_3.molly_burped = False
-        scene_3.molly_near_sam = False
-
-    # Fill the screen with black
-    screen.fill(BLACK)
-
-    # Set positions for the door and table
-    table_rect = table.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-    door_rect = door.get_rect(midtop=(WIDTH - 75, 50))
 
-    # Initialize the beers
-    beers = [pygame.Rect(table_rect.x + 40 + i * 30, table_rect.y - 22, 20, 50) for i in range(5)]
-    bubbles = [[] for _ in range(5)]  # List of bubbles for each beer
-
-    # Draw table and door sprites
-    draw_sprite(table, (table_rect.x, table_rect.y))
-    draw_sprite(door, (door_rect.x, door_rect.y))
+    # Draw the background: table and door sprites
+    backgrounds.draw("scene_3", scene3.compose)
 
     # Draw beers on the table
     draw_beers(beers, beer_states, bubbles)
@@ -1164,58 +2291,49 @@ async def scene_3(keys):
 
         # Check if Molly is near Sam
         if molly_pos.distance_to(sam_pos) < 50:  # Proximity threshold
-            scene_3.molly_near_sam = True
+            scene3.molly_near_sam = True
         else:
-            scene_3.molly_near_sam = False
+            scene3.molly_near_sam = False
 
     # Interaction with table
-    interaction_zone = table_rect.inflate(1, 1)  # Expand interaction zone by 1 pixel on all sides
-    if (
-        pygame.Rect(sam_pos.x, sam_pos.y, SPRITE_WIDTH, SPRITE_HEIGHT).colliderect(interaction_zone)
-        and not scene_3.game_played
-        and scene_3.molly_near_sam
-    ):
+    scene3.sam_rect.topleft = (sam_pos.x, sam_pos.y)
+    if scene3.sam_rect.colliderect(scene3.table_zone) and not scene3.game_played and scene3.molly_near_sam:
         actionable = False  # Disable movement during interaction
         await text_box("Dutch courage...?")
         await minigame_scene_3()  # Await the asynchronous mini-game function
-        scene_3.game_played = True
+        scene3.game_played = True
 
-    if scene_3.game_played and not scene_3.molly_burped:
+    if scene3.game_played and not scene3.molly_burped:
         actionable = False
         for i in range(len(beer_states)):
             beer_states[i] = 3  # All beers are empty
-        for i in range(len(bubbles)):
-            bubbles[i] = []  # Clear bubbles for each beer
+        bubbles.clear()  # Clear bubbles for each beer
         draw_beers(beers, beer_states, bubbles)
 
         # Redraw background and sprites before showing dialog
-        screen.fill(BLACK)  # Ensure background is consistent
-        draw_sprite(table, (table_rect.x, table_rect.y))
-        draw_sprite(door, (door_rect.x, door_rect.y))
+        backgrounds.draw("scene_3", scene3.compose)  # Ensure background is consistent
         draw_beers(beers, beer_states, bubbles)
         draw_sprite(sam, (sam_pos.x, sam_pos.y))  # Draw sam sprite
         draw_sprite(molly, (molly_pos.x, molly_pos.y))  # Draw molly sprite
-        pygame.display.flip()  # Ensure everything is rendered before dialog
+        present()  # Ensure everything is rendered before dialog
 
         # Show the dialog box
         await text_box("Molly: BURRPPPP!!", "Sam: Fancy some fresh air?")
-        scene_3.molly_burped = True
+        scene3.molly_burped = True
         actionable = True
 
-    if scene_3.molly_burped:
+    if scene3.molly_burped:
         for i in range(len(beer_states)):
             beer_states[i] = 3  # All beers are empty
-        for i in range(len(bubbles)):
-            bubbles[i] = []  # Clear bubbles for each beer
+        bubbles.clear()  # Clear bubbles for each beer
         draw_beers(beers, beer_states, bubbles)
 
     # Interaction with door
-    interaction_zone_door = door_rect.inflate(1, 1)  # Expand interaction zone for the door
-    if pygame.Rect(sam_pos.x, sam_pos.y, SPRITE_WIDTH, SPRITE_HEIGHT).colliderect(interaction_zone_door):
+    if scene3.sam_rect.colliderect(scene3.door_zone):
         actionable = False  # Disable movement during interaction
 
         # If the mini-game has been completed
-        if scene_3.game_played:
+        if scene3.game_played:
             # Transition to Scene 4
             await text_box("Molly: Let's go outside!")
             await scene_transition()  # Trigger transition asynchronously
@@ -1254,15 +2372,16 @@ async def scene_4(keys):
         actionable = False
         scene_4.initialized = True
 
-    # Fill the screen with black
-    screen.fill(BLACK)
-
     # Set door position
     door_rect = door.get_rect(midtop=(WIDTH - 75, 50))  # Door at the top right
 
-    # Draw door only if it's visible
-    if scene_4.door_visible:
-        draw_sprite(door, door_rect)
+    # Draw the background, with the door only if it's visible
+    def compose(layer):
+        layer.fill(BLACK)
+        if scene_4.door_visible:
+            layer.blit(door, door_rect)
+
+    backgrounds.draw("scene_4", compose, key=scene_4.door_visible)
 
     # Automatic movement of characters into position
     if not scene_4.movement_complete:
@@ -1290,8 +2409,8 @@ async def scene_4(keys):
         scene_4.choose_bird = True
 
     if scene_4.choose_bird and not scene_4.molly_opinion_done:
-        choice_text = font_small.render("Press 1 for Seagull or 2 for Pigeon", True, WHITE)
-        screen.blit(choice_text, (WIDTH // 2 - choice_text.get_width() // 2, HEIGHT - 150))
+        choice_text = render_text(font_small, "Press 1 for Seagull or 2 for Pigeon", True, WHITE)
+        dirty.add(screen.blit(choice_text, (WIDTH // 2 - choice_text.get_width() // 2, HEIGHT - 150)))
 
         # Check for keypresses
         if keys[pygame.K_1]:
@@ -1335,14 +2454,13 @@ async def scene_4(keys):
             scene_4.pic_taken = True
 
         if scene_4.pic_taken:  # Proceed to the next dialogue
-            # Fill the screen with black
-            screen.fill(BLACK)
+            # Redraw the background with the door back in place
             scene_4.door_visible = True
+            backgrounds.draw("scene_4", compose, key=scene_4.door_visible)
 
             # Redraw sam and molly sprites
             draw_sprite(sam, (sam_pos.x, sam_pos.y))
             draw_sprite(molly, (molly_pos.x, molly_pos.y))
-            draw_sprite(door, (door_rect.x, door_rect.y))
 
             await text_box(
                 "Molly: Hey, you fancy coming back to mine?",
@@ -1388,12 +2506,15 @@ async def scene_5(keys):
         pub_rect = pub.get_rect(midright=(WIDTH - 40, HEIGHT // 2))
         house_rect = house.get_rect(midleft=(40, HEIGHT // 5))
 
-    # Fill screen
-    screen.fill(BLACK)
+    # Draw the background: the pub and the house
+    def compose(layer):
+        layer.fill(BLACK)
+        layer.blit(pub, pub_rect)
+        layer.blit(house, house_rect)
+
+    backgrounds.draw("scene_5", compose)
 
     # Draw sprites
-    draw_sprite(pub, pub_rect)
-    draw_sprite(house, house_rect)
     draw_sprite(sam, (sam_pos.x, sam_pos.y))
     draw_sprite(molly, (molly_pos.x, molly_pos.y))
 
@@ -1450,12 +2571,15 @@ async def scene_6(keys):
         scene_6.sofa_unlocked = False
         scene_6.initialized = True
 
-    # Fill the screen with a background color (e.g., black)
-    screen.fill(BLACK)
+    # Draw the background: the door and the sofa
+    def compose(layer):
+        layer.fill(BLACK)
+        layer.blit(door, scene_6.door_rect)
+        layer.blit(sofa, scene_6.sofa_rect)
+
+    backgrounds.draw("scene_6", compose)
 
     # Draw sprites
-    draw_sprite(door, scene_6.door_rect)
-    draw_sprite(sofa, scene_6.sofa_rect)
     draw_sprite(maggie, (scene_6.maggie_pos.x, scene_6.maggie_pos.y))
     draw_sprite(mike, (scene_6.mike_pos.x, scene_6.mike_pos.y))
     draw_sprite(molly, (molly_pos.x, molly_pos.y))
@@ -1463,8 +2587,8 @@ async def scene_6(keys):
 
     # Draw exclamation mark above Maggie if required
     if scene_6.maggie_exclamation:
-        exclamation = font_small.render("!", True, WHITE)
-        screen.blit(exclamation, (scene_6.maggie_pos.x + 10, scene_6.maggie_pos.y - 20))
+        exclamation = render_text(font_small, "!", True, WHITE)
+        dirty.add(screen.blit(exclamation, (scene_6.maggie_pos.x + 10, scene_6.maggie_pos.y - 20)))
 
     # Handle movement logic for Sam and Molly
     if actionable:
@@ -1549,8 +2673,13 @@ async def scene_6(keys):
 # Game loop
 async def main():
     running = True
+    event = None  # scene_0 looks at the last event of the frame, which may be none
+    # The browser build has no threads, so there the sprites load on first use instead
+    sprites_prefetched = sys.platform == "emscripten"
     while running:
-        for event in pygame.event.get():
+        with profiler.section("events"):
+            events = get_events()
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -1567,30 +2696,72 @@ async def main():
                 if event.key == pygame.K_DOWN:
                     key_states["down_pressed"] = False
 
-        keys = pygame.key.get_pressed()
+        keys = get_pressed()
 
         # Handle asynchronous scenes with await
-        if scene == 0:
-            await scene_0(keys, event)
-        elif scene == 1:
-            await scene_1(keys)
-        elif scene == 2:
-            await scene_2(keys)
-        elif scene == 3:
-            await scene_3(keys)
-        elif scene == 4:
-            await scene_4(keys)
-        elif scene == 5:
-            await scene_5(keys)
-        elif scene == 6:
-            await scene_6(keys)
-        elif scene == 7:
-            await scene_7(keys)
-
-        # Refresh the display and enforce frame rate
-        pygame.display.flip()
-        clock.tick(30)
-        await asyncio.sleep(0)  # Allow the event loop to run
+        with profiler.section("scene_update"):
+            if scene == 0:
+                await scene_0(keys, event)
+            elif scene == 1:
+                await scene_1(keys)
+            elif scene == 2:
+                await scene_2(keys)
+            elif scene == 3:
+                await scene_3(keys)
+            elif scene == 4:
+                await scene_4(keys)
+            elif scene == 5:
+                await scene_5(keys)
+            elif scene == 6:
+                await scene_6(keys)
+            elif scene == 7:
+                await scene_7(keys)
+
+        # Refresh the display (just the parts that changed, where possible) and enforce frame rate
+        present(partial=True)
+        frame_scheduler.flush()  # the end of the tick: this frame goes out now
+        if not sprites_prefetched:
+            # Decode the sprites in the background once the title screen is up, while it waits for ENTER
+            sprites.prefetch()
+            sprites_prefetched = True
+        with profiler.section("tick"):
+            clock.tick(30)
+        await clock.sleep(0)  # Allow the event loop to run
+
+
+def run_headless(script, seed=0, linger=5000):
+    """
+    Play the game without a window from a scripted input sequence, as fast as the CPU allows.
+
+    Requires FIRSTDATE_HEADLESS=1 in the environment before this module is imported. The
+    game state lives in module globals, so reload the module before running another script.
+
+    Args:
+        script (list): (time_ms, key, hold_ms) key presses, in virtual milliseconds.
+        seed (int): Seed for `random`, so bubbles, fireworks and key prompts repeat exactly.
+        linger (int): Virtual ms to keep running after the last key is released before quitting.
+
+    Returns:
+        dict: Scene reached, whether the game finished, frames presented, virtual and wall time.
+    """
+    global scripted_input
+    if not HEADLESS:
+        raise RuntimeError("run_headless needs FIRSTDATE_HEADLESS=1 set before main is imported")
+
+    random.seed(seed)
+    scripted_input = ScriptedInput(script, clock, linger)
+    start = time.perf_counter()
+    try:
+        asyncio.run(main())
+    except SystemExit:
+        pass  # QUIT at the end of the script, or the end of the game
+    return {
+        "scene": scene,
+        "finished": game_finished,
+        "frames": clock.frames,
+        "virtual_seconds": clock.ticks / 1000.0,
+        "wall_seconds": time.perf_counter() - start,
+    }
 
 
 # Start the game loop